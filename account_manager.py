@@ -5,6 +5,7 @@ from tkinter import ttk, messagebox, filedialog
 import threading
 
 from config_utils import ConfigManager
+from account_records import AccountRecord, data_from_records
 from ui_components import (
     WoWThemedFrame as ThemedFrame,  # Create alias for backward compatibility
     WoWStatusBar as StatusBar,      # Create alias for backward compatibility
@@ -13,11 +14,25 @@ from ui_components import (
     WOW_COLORS
 )
 from login_automation import LoginAutomation, CoordinatesTool
+from launch_queue import (
+    LaunchQueue, LaunchRequest, LaunchQueueDialog,
+    PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, PRIORITY_NAMES
+)
+from launch_metrics import LaunchStatisticsDialog
+from launcher_daemon import RemoteSupervisor
+from profiling import profiled
+from performance_profiles import get_profiles, launch_settings, placement_policy
+from cpu_placement import placement_engine, CpuPlacementDialog
+from memory_admission import MemoryAdmission, format_bytes
+from resource_sampler import get_sampler, stop_sampler, sparkline
+from page_cache import prewarmer
 
 class AccountManagerScreen:
     """Screen for managing accounts for a specific server and expansion"""
     
-    def __init__(self, root, server_name, expansion_name, expansion_data, config_manager, on_close_callback=None):
+    def __init__(self, root, server_name, expansion_name, expansion_data, config_manager, on_close_callback=None,
+                 launch_queue=None, supervisor=None, warm_pools=None, daemon_client=None,
+                 remote_supervisor=None):
         self.root = root
         self.server_name = server_name
         self.expansion_name = expansion_name
@@ -27,7 +42,7 @@ class AccountManagerScreen:
         
         # Configure window
         self.root.title(f"{server_name} - {expansion_name} Account Manager")
-        self.root.geometry("600x500")
+        self.root.geometry("820x520")
         self.root.resizable(True, True)
         
         # Set minimum size
@@ -40,9 +55,9 @@ class AccountManagerScreen:
             pass
         
         # Account configuration
-        self.accounts_file = expansion_data.get("accounts_file", f"accounts_{server_name.lower()}_{expansion_name.lower().replace(' ', '_')}.json")
+        self.accounts_file = config_manager.get_accounts_file(server_name, expansion_name, expansion_data)
         self.wow_path = expansion_data.get("path", "")
-        self.coords_file = expansion_data.get("coords_file", f"login_coords_{server_name.lower()}_{expansion_name.lower().replace(' ', '_')}.json")
+        self.coords_file = config_manager.get_coords_file(server_name, expansion_name, expansion_data)
         
         # Load accounts
         self.accounts_data = self.config_manager.load_accounts(self.accounts_file)
@@ -60,11 +75,54 @@ class AccountManagerScreen:
         # Initialize login automation
         self.login_automation = LoginAutomation(
             self.root,
-            lambda msg: self.status_bar.set_status(msg)
+            lambda msg: self.status_bar.set_status(msg),
+            supervisor,
+            warm_pools=warm_pools,
+            input_mode=config_manager.global_config.get("input_mode")
+        )
+        placement_engine.configure(config_manager.global_config.get("cpu_placement"))
+        self.supervisor = self.login_automation.supervisor
+        
+        # When attached to the launcher daemon, launches and client states go
+        # through it; the daemon's client list is mirrored by the (normally
+        # shared) RemoteSupervisor, which this window stops only if it made it
+        self.daemon_client = daemon_client
+        self.owns_remote_supervisor = False
+        if daemon_client:
+            if remote_supervisor is None:
+                remote_supervisor = RemoteSupervisor(daemon_client)
+                self.owns_remote_supervisor = True
+            self.supervisor = remote_supervisor
+        
+        # Start filling this expansion's warm pool if it has one
+        self.warm_pools = warm_pools
+        self.configure_warm_pool()
+        self.shown_supervisor_version = None
+        
+        # Launches go through the (normally shared) rate-limited queue
+        if launch_queue is None:
+            launch_queue = LaunchQueue(
+                self.config_manager.get_launch_limits,
+                lambda msg: self.status_bar.set_status(msg),
+                admission_callback=MemoryAdmission(
+                    self.login_automation.supervisor, config_manager.global_config.get("memory_admission")
+                ).check
+            )
+        self.launch_queue = launch_queue
+        self.shown_hold_reason = None
+        
+        # Per-client CPU, memory and disk usage, shared by windows on the same supervisor
+        sampler_settings = config_manager.global_config.get("resource_sampler", {})
+        self.resource_sampler = get_sampler(
+            self.supervisor, sampler_settings.get("interval", 2.0), sampler_settings.get("history", 60)
         )
+        self.shown_sampler_version = None
         
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Keep the client state column up to date
+        self.refresh_client_states()
     
     def create_layout(self):
         """Create the main layout for the account manager"""
@@ -101,9 +159,20 @@ class AccountManagerScreen:
         self.account_dropdown = ttk.Combobox(dropdown_container, textvariable=self.account_var, state="readonly")
         self.account_dropdown.grid(row=0, column=0, padx=(0,5), sticky=tk.EW)
         
+        # Launch priority
+        self.priority_var = tk.StringVar(value=PRIORITY_NAMES[PRIORITY_NORMAL])
+        self.priority_dropdown = ttk.Combobox(
+            dropdown_container,
+            textvariable=self.priority_var,
+            values=[PRIORITY_NAMES[p] for p in (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)],
+            state="readonly",
+            width=8
+        )
+        self.priority_dropdown.grid(row=0, column=1, padx=(0,5))
+        
         # Launch button
         self.launch_button = ttk.Button(dropdown_container, text="Launch", command=self.launch_game)
-        self.launch_button.grid(row=0, column=1)
+        self.launch_button.grid(row=0, column=2)
         
         # Update account dropdown
         self.update_account_dropdown()
@@ -117,7 +186,7 @@ class AccountManagerScreen:
         
         # Enable grid resizing
         manage_content.columnconfigure(1, weight=1)
-        manage_content.rowconfigure(6, weight=1)  # For the account list
+        manage_content.rowconfigure(7, weight=1)  # For the account list
         
         # Username field
         ttk.Label(manage_content, text="Username:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
@@ -137,9 +206,21 @@ class AccountManagerScreen:
         self.alias_entry = ttk.Entry(manage_content, textvariable=self.alias_var)
         self.alias_entry.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=5)
         
+        # Performance profile applied to the client's Config.wtf at launch
+        # (empty: the expansion's default profile)
+        ttk.Label(manage_content, text="Performance Profile:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.profile_var = tk.StringVar()
+        self.profile_combo = ttk.Combobox(
+            manage_content,
+            textvariable=self.profile_var,
+            values=[""] + sorted(get_profiles(self.expansion_data)),
+            state="readonly"
+        )
+        self.profile_combo.grid(row=3, column=1, sticky=tk.EW, padx=5, pady=5)
+        
         # Account action buttons
         action_frame = ttk.Frame(manage_content)
-        action_frame.grid(row=3, column=0, columnspan=2, pady=10, sticky=tk.EW)
+        action_frame.grid(row=4, column=0, columnspan=2, pady=10, sticky=tk.EW)
         
         # Configure columns for button layout
         action_frame.columnconfigure(0, weight=1)
@@ -160,17 +241,17 @@ class AccountManagerScreen:
         
         # Separator
         ttk.Separator(manage_content, orient="horizontal").grid(
-            row=4, column=0, columnspan=2, sticky=tk.EW, pady=10
+            row=5, column=0, columnspan=2, sticky=tk.EW, pady=10
         )
         
         # Account list section
         ttk.Label(manage_content, text="All Accounts:", font=("Arial", 10, "bold")).grid(
-            row=5, column=0, columnspan=2, sticky=tk.W, padx=5, pady=(5,0)
+            row=6, column=0, columnspan=2, sticky=tk.W, padx=5, pady=(5,0)
         )
         
         # Create account list treeview
         account_list_frame = ttk.Frame(manage_content)
-        account_list_frame.grid(row=6, column=0, columnspan=2, sticky=tk.NSEW, padx=5, pady=5)
+        account_list_frame.grid(row=7, column=0, columnspan=2, sticky=tk.NSEW, padx=5, pady=5)
         
         # Configure grid for treeview
         account_list_frame.columnconfigure(0, weight=1)
@@ -179,14 +260,24 @@ class AccountManagerScreen:
         # Treeview for displaying accounts
         self.account_tree = ttk.Treeview(
             account_list_frame, 
-            columns=("username", "alias"), 
+            columns=("username", "alias", "client", "cpu", "memory", "io", "history"), 
             show="headings", 
             selectmode="browse"
         )
         self.account_tree.heading("username", text="Username")
         self.account_tree.heading("alias", text="Alias")
-        self.account_tree.column("username", width=150)
-        self.account_tree.column("alias", width=150)
+        self.account_tree.heading("client", text="Client")
+        self.account_tree.heading("cpu", text="CPU")
+        self.account_tree.heading("memory", text="Memory")
+        self.account_tree.heading("io", text="Disk I/O")
+        self.account_tree.heading("history", text="CPU History")
+        self.account_tree.column("username", width=120)
+        self.account_tree.column("alias", width=110)
+        self.account_tree.column("client", width=80)
+        self.account_tree.column("cpu", width=55, anchor=tk.E)
+        self.account_tree.column("memory", width=70, anchor=tk.E)
+        self.account_tree.column("io", width=80, anchor=tk.E)
+        self.account_tree.column("history", width=140)
         
         # Scrollbar for treeview
         scrollbar = ttk.Scrollbar(account_list_frame, orient="vertical", command=self.account_tree.yview)
@@ -223,6 +314,13 @@ class AccountManagerScreen:
         menu_bar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Configure Login Screen", command=self.open_coordinate_tool)
         tools_menu.add_command(label="Change Game Path", command=self.change_game_path)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Launch Queue", command=self.open_launch_queue)
+        tools_menu.add_command(label="Launch Statistics", command=self.open_launch_statistics)
+        tools_menu.add_command(label="CPU Placement", command=self.open_cpu_placement)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Terminate Clients for This Expansion", command=self.terminate_group_clients)
+        tools_menu.add_command(label="Terminate All Clients", command=self.terminate_all_clients)
         
         # Help menu
         help_menu = tk.Menu(menu_bar, tearoff=0)
@@ -231,6 +329,11 @@ class AccountManagerScreen:
     
     def on_close(self):
         """Handle window close event"""
+        self.root.after_cancel(self.state_refresh_job)
+        if self.owns_remote_supervisor:
+            stop_sampler(self.supervisor)
+            self.supervisor.stop()
+        
         # Call the close callback if available
         if self.on_close_callback:
             self.on_close_callback(self.root)
@@ -266,14 +369,65 @@ class AccountManagerScreen:
         for account in self.accounts_data.get("accounts", []):
             username = account.get("username", "")
             alias = account.get("alias", "")
+            state = self.supervisor.get_state((self.server_name, self.expansion_name, username))
             
-            self.account_tree.insert("", "end", values=(username, alias))
+            self.account_tree.insert("", "end", values=(username, alias, state, "", "", "", ""))
+        self.shown_sampler_version = None
+    
+    def refresh_client_states(self):
+        """Update the client column whenever the supervisor reports a change"""
+        if not self.root.winfo_exists():
+            return
+        
+        if self.supervisor.version != self.shown_supervisor_version:
+            self.shown_supervisor_version = self.supervisor.version
+            for item in self.account_tree.get_children():
+                values = self.account_tree.item(item, "values")
+                if values:
+                    state = self.supervisor.get_state((self.server_name, self.expansion_name, values[0]))
+                    self.account_tree.set(item, "client", state)
+        
+        if self.resource_sampler.version != self.shown_sampler_version:
+            self.shown_sampler_version = self.resource_sampler.version
+            self.refresh_resource_usage()
+        
+        # Explain launches held back (or refused) for lack of memory
+        hold_reason = self.launch_queue.hold_reason
+        if hold_reason != self.shown_hold_reason:
+            self.shown_hold_reason = hold_reason
+            if hold_reason:
+                self.status_bar.set_status(hold_reason)
+        
+        self.state_refresh_job = self.root.after(1000, self.refresh_client_states)
+    
+    def refresh_resource_usage(self):
+        """Fill the usage columns from the latest resource samples"""
+        for item in self.account_tree.get_children():
+            values = self.account_tree.item(item, "values")
+            if not values:
+                continue
+            usage = self.resource_sampler.usage((self.server_name, self.expansion_name, values[0]))
+            if usage is None:
+                row = ("", "", "", "")
+            else:
+                io = ""
+                if usage["read_rate"] is not None:
+                    io = f"{format_bytes(usage['read_rate'] + usage['write_rate'])}/s"
+                row = (
+                    f"{usage['cpu']:.0f}%",
+                    format_bytes(usage["rss"]),
+                    io,
+                    sparkline(usage["cpu_history"])
+                )
+            for column, value in zip(("cpu", "memory", "io", "history"), row):
+                self.account_tree.set(item, column, value)
     
     def clear_fields(self):
         """Clear all input fields"""
         self.username_var.set("")
         self.password_var.set("")
         self.alias_var.set("")
+        self.profile_var.set("")
     
     def find_account_by_display_name(self, display_name):
         """Find account by display name (alias or username)"""
@@ -292,6 +446,7 @@ class AccountManagerScreen:
             self.username_var.set(account.get("username", ""))
             self.password_var.set(account.get("password", ""))
             self.alias_var.set(account.get("alias", ""))
+            self.profile_var.set(account.get("profile", ""))
             
             # Also select in the treeview
             self.select_account_in_tree(account.get("username", ""))
@@ -311,6 +466,7 @@ class AccountManagerScreen:
                         self.username_var.set(account.get("username", ""))
                         self.password_var.set(account.get("password", ""))
                         self.alias_var.set(account.get("alias", ""))
+                        self.profile_var.set(account.get("profile", ""))
                         
                         # Also select in the dropdown
                         display_name = account.get("alias") or account.get("username")
@@ -331,6 +487,7 @@ class AccountManagerScreen:
         username = self.username_var.get().strip()
         password = self.password_var.get().strip()
         alias = self.alias_var.get().strip()
+        profile = self.profile_var.get()
         
         if not username or not password:
             messagebox.showerror("Error", "Username and password are required!")
@@ -340,14 +497,15 @@ class AccountManagerScreen:
         found = False
         for i, account in enumerate(self.accounts_data.get("accounts", [])):
             if account.get("username") == username:
-                # Update existing account
-                self.accounts_data["accounts"][i] = {
-                    "username": username,
-                    "password": password,
-                    "alias": alias,
-                    "server": self.server_name,
-                    "expansion": self.expansion_name
-                }
+                # Update existing account, keeping fields this form does not edit
+                extra = dict(getattr(account, "extra", None) or {})
+                extra.pop("profile", None)
+                if profile:
+                    extra["profile"] = profile
+                self.accounts_data["accounts"][i] = AccountRecord(
+                    username, password, alias, self.server_name, self.expansion_name, extra,
+                    getattr(account, "missing", ())
+                )
                 found = True
                 break
         
@@ -357,13 +515,10 @@ class AccountManagerScreen:
                 self.accounts_data["accounts"] = []
             
             # Add new account
-            self.accounts_data["accounts"].append({
-                "username": username,
-                "password": password,
-                "alias": alias,
-                "server": self.server_name,
-                "expansion": self.expansion_name
-            })
+            self.accounts_data["accounts"].append(AccountRecord(
+                username, password, alias, self.server_name, self.expansion_name,
+                {"profile": profile} if profile else None
+            ))
         
         # Save accounts
         self.config_manager.save_accounts(self.accounts_data, self.accounts_file)
@@ -420,6 +575,7 @@ class AccountManagerScreen:
         if not found:
             messagebox.showerror("Error", f"Account with username '{username}' not found")
     
+    @profiled("launch_game")
     def launch_game(self):
         """Launch the game with the selected account"""
         selected = self.account_var.get()
@@ -441,19 +597,137 @@ class AccountManagerScreen:
             )
             return
         
+        if self.daemon_client:
+            self.launch_via_daemon(account, selected)
+            return
+        
         # Load login coordinates
         login_coords = self.config_manager.load_coordinates(self.coords_file)
         
-        # Launch the game
-        success = self.login_automation.launch_game(
-            self.wow_path,
-            account,
-            login_coords
+        # Queue the launch; the queue starts it once the server's limits allow
+        priority = next(
+            (p for p, name in PRIORITY_NAMES.items() if name == self.priority_var.get()),
+            PRIORITY_NORMAL
         )
+        request = self.create_launch_request(account, selected, login_coords, priority)
+        
+        if self.launch_queue.submit(request):
+            # Read the game data ahead while the launch waits its turn
+            prewarmer.prewarm(self.wow_path)
+            position = self.launch_queue.position(request.id)
+            if position:
+                self.status_bar.set_status(f"Queued launch for '{selected}' (position {position})")
+            else:
+                self.status_bar.set_status(f"Launching game with account '{selected}'...")
+        else:
+            self.status_bar.set_status(f"Account '{selected}' is already queued or launching")
+    
+    def launch_via_daemon(self, account, display_name):
+        """Send the launch to the launcher daemon and show its progress"""
+        request = {
+            "cmd": "launch",
+            "server": self.server_name,
+            "expansion": self.expansion_name,
+            "account": account.get("username", ""),
+            "priority": self.priority_var.get().lower()
+        }
+        
+        def set_status(message):
+            self.root.after(0, lambda: self.status_bar.set_status(message))
+        
+        def stream():
+            try:
+                for event in self.daemon_client.stream(request):
+                    if event.get("event") == "queued":
+                        set_status(f"Queued launch for '{display_name}' (position {event.get('position') or 1})")
+                    elif event.get("event") == "status":
+                        set_status(event.get("message", ""))
+                    elif event.get("error"):
+                        set_status(f"Launch of '{display_name}' failed: {event['error']}")
+            except OSError as e:
+                set_status(f"Lost connection to launcher daemon: {str(e)}")
+        
+        threading.Thread(target=stream, daemon=True).start()
+        self.status_bar.set_status(f"Sending launch for '{display_name}' to launcher daemon...")
+    
+    def configure_warm_pool(self):
+        """Apply this expansion's warm pool settings"""
+        if self.warm_pools and self.wow_path and not self.daemon_client:
+            self.warm_pools.configure(
+                self.server_name,
+                self.expansion_name,
+                self.wow_path,
+                self.expansion_data.get("warm_pool")
+            )
+    
+    def create_launch_request(self, account, display_name, login_coords, priority):
+        """Build a queued launch request for an account"""
+        wow_path = self.wow_path
+        
+        # Older account files may lack these; the supervisor and metrics key on them
+        account = dict(account, server=self.server_name, expansion=self.expansion_name)
+        
+        # Crash restarts go back through the queue so they respect the rate limits
+        def restart():
+            self.launch_queue.submit(
+                self.create_launch_request(account, display_name, login_coords, PRIORITY_HIGH)
+            )
         
-        if success:
-            self.status_bar.set_status(f"Launching game with account '{selected}'...")
+        return LaunchRequest(
+            self.server_name,
+            self.expansion_name,
+            account.get("username", ""),
+            display_name,
+            lambda on_complete: self.login_automation.launch_game(
+                wow_path, account, login_coords, on_complete, restart,
+                config_wtf=self.expansion_data.get("config_wtf"),
+                profile=launch_settings(self.expansion_data, account),
+                placement=placement_policy(self.expansion_data, account)
+            ),
+            priority
+        )
+    
+    def terminate_group_clients(self):
+        """Terminate every client launched for this server and expansion"""
+        confirm = ConfirmDialog(
+            self.root,
+            "Terminate Clients",
+            f"Close all {self.server_name} - {self.expansion_name} game clients?"
+        ).result
+        if confirm:
+            self.supervisor.terminate_async(group=(self.server_name, self.expansion_name))
+            self.status_bar.set_status("Terminating clients...")
+    
+    def terminate_all_clients(self):
+        """Terminate every launched client"""
+        confirm = ConfirmDialog(
+            self.root,
+            "Terminate Clients",
+            "Close all running game clients?"
+        ).result
+        if confirm:
+            self.supervisor.terminate_async()
+            self.status_bar.set_status("Terminating clients...")
+    
+    def open_launch_queue(self):
+        """Open the launch queue window"""
+        LaunchQueueDialog(self.root, self.launch_queue)
     
+    def open_launch_statistics(self):
+        """Open the per-phase login timing statistics"""
+        LaunchStatisticsDialog(
+            self.root,
+            self.login_automation.metrics,
+            self.server_name,
+            self.expansion_name,
+            [account.get("username", "") for account in self.accounts_data.get("accounts", [])]
+        )
+    
+    def open_cpu_placement(self):
+        """Open the CPU placement and per-core load window"""
+        CpuPlacementDialog(self.root)
+    
+    @profiled("import_accounts")
     def import_accounts(self):
         """Import accounts from a JSON file"""
         try:
@@ -477,37 +751,17 @@ class AccountManagerScreen:
                 return
             
             # Ask whether to merge or replace
+            merge = False
             if self.accounts_data.get("accounts"):
                 merge = messagebox.askyesno(
                     "Import Accounts",
                     "Do you want to merge with existing accounts?\n"
                     "Click No to replace all existing accounts."
                 )
-                
-                if merge:
-                    # Update server and expansion for imported accounts
-                    for account in imported_accounts:
-                        account["server"] = self.server_name
-                        account["expansion"] = self.expansion_name
-                    
-                    # Add imported accounts to existing accounts
-                    self.accounts_data["accounts"].extend(imported_accounts)
-                else:
-                    # Replace all accounts with imported ones
-                    # Update server and expansion for imported accounts
-                    for account in imported_accounts:
-                        account["server"] = self.server_name
-                        account["expansion"] = self.expansion_name
-                    
-                    self.accounts_data["accounts"] = imported_accounts
-            else:
-                # No existing accounts, just set the imported ones
-                # Update server and expansion for imported accounts
-                for account in imported_accounts:
-                    account["server"] = self.server_name
-                    account["expansion"] = self.expansion_name
-                
-                self.accounts_data["accounts"] = imported_accounts
+            
+            self.config_manager.import_accounts(
+                self.accounts_data, imported_accounts, self.server_name, self.expansion_name, merge
+            )
             
             # Save accounts
             self.config_manager.save_accounts(self.accounts_data, self.accounts_file)
@@ -523,6 +777,7 @@ class AccountManagerScreen:
         except Exception as e:
             messagebox.showerror("Import Failed", f"Error importing accounts: {str(e)}")
     
+    @profiled("export_accounts")
     def export_accounts(self):
         """Export accounts to a JSON file"""
         try:
@@ -541,7 +796,7 @@ class AccountManagerScreen:
             
             # Write accounts to file
             with open(export_file, 'w') as f:
-                json.dump(self.accounts_data, f, indent=4)
+                json.dump(data_from_records(self.accounts_data), f, indent=4)
             
             # Update status
             count = len(self.accounts_data.get("accounts", []))
@@ -573,6 +828,7 @@ class AccountManagerScreen:
             # Update the path in memory
             self.wow_path = game_path
             self.expansion_data["path"] = game_path
+            self.configure_warm_pool()
             
             # Update the path in the server configuration
             servers = self.config_manager.load_servers()
@@ -0,0 +1,119 @@
+import sys
+
+class AccountRecord:
+    """
+    Compact in-memory account
+
+    Behaves like the account dicts stored in the accounts files (get, [],
+    keys, dict(record)), but keeps the fields in slots instead of a per-account
+    dict and shares one interned string for each server and expansion name.
+    Keys other than the standard fields are kept in a small side dict.
+    """
+
+    __slots__ = ("username", "password", "alias", "server", "expansion", "extra", "missing")
+
+    # Standard fields in the order they are written to the accounts files
+    FIELDS = ("username", "password", "alias", "server", "expansion")
+
+    def __init__(self, username="", password="", alias="", server=None, expansion=None, extra=None, missing=()):
+        self.username = username
+        self.password = password
+        self.alias = alias
+        self.server = sys.intern(server) if server else server
+        self.expansion = sys.intern(expansion) if expansion else expansion
+        self.extra = extra or None
+        # Standard fields the account was loaded without; they are only saved
+        # once they get a value, so older files round-trip unchanged
+        self.missing = missing
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a record from an account dict as stored in the accounts files"""
+        if isinstance(data, cls):
+            return data
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        return cls(
+            data.get("username", ""),
+            data.get("password", ""),
+            data.get("alias", ""),
+            data.get("server"),
+            data.get("expansion"),
+            extra,
+            tuple(field for field in cls.FIELDS if field not in data)
+        )
+
+    def to_dict(self):
+        """Return the account as a plain dict for saving (unset fields are left out)"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None and (value != "" or field not in self.missing):
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    # Dict-style access so code written for account dicts keeps working
+
+    def keys(self):
+        keys = [field for field in self.FIELDS if getattr(self, field) is not None]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not None
+        return bool(self.extra) and key in self.extra
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in ("server", "expansion") and value:
+            value = sys.intern(value)
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self):
+        return f"AccountRecord(username={self.username!r}, server={self.server!r}, expansion={self.expansion!r})"
+
+def records_from_data(accounts_data):
+    """Convert the "accounts" list of a loaded accounts file to records (in place)"""
+    accounts_data["accounts"] = [AccountRecord.from_dict(a) for a in accounts_data.get("accounts", [])]
+    return accounts_data
+
+def data_from_records(accounts_data):
+    """Return a JSON-serializable copy of an accounts structure holding records"""
+    data = dict(accounts_data)
+    data["accounts"] = [
+        a.to_dict() if isinstance(a, AccountRecord) else a
+        for a in accounts_data.get("accounts", [])
+    ]
+    return data
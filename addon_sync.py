@@ -0,0 +1,297 @@
+import os
+import shutil
+import fnmatch
+import threading
+import concurrent.futures
+
+from file_hashes import FileHashCache
+
+# Suffix of staged copies waiting to be swapped in
+STAGE_SUFFIX = ".sync-tmp"
+
+def resolve_case(root, relative_path):
+    """
+    Find a relative path below root, matching each part case-insensitively
+
+    Installs copied from Windows often differ in case ("Interface/Addons"),
+    so the existing spelling is reused; parts that do not exist yet keep
+    the spelling they were given.
+    """
+    path = root
+    for part in relative_path.replace("\\", "/").split("/"):
+        candidate = os.path.join(path, part)
+        if not os.path.exists(candidate) and os.path.isdir(path):
+            lowered = part.lower()
+            for name in os.listdir(path):
+                if name.lower() == lowered:
+                    candidate = os.path.join(path, name)
+                    break
+        path = candidate
+    return path
+
+class AddonSync:
+    """
+    Copies addons and settings from one install to others, changed files only
+
+    For each synced folder a manifest of relative path to (size, hash) is
+    built for the source and for every target; hashes come from the shared
+    FileHashCache, so files that did not change since the last run are not
+    read again. Only files missing from a target or differing from the
+    source are copied, in parallel, to staged names next to their
+    destination. Once every copy of a target is staged they are renamed
+    into place, so a client never sees a half-copied file.
+
+    Target-only files are removed from "mirror" folders (addons deleted at
+    the source) and kept everywhere else (e.g. other accounts' WTF folders).
+    """
+
+    def __init__(self, settings=None, hash_cache=None):
+        """
+        Initialize the sync
+
+        Args:
+            settings: The "addon_sync" settings from app_config.json
+            hash_cache: FileHashCache to use (defaults to the configured file)
+        """
+        self.paths = ["Interface/AddOns", "WTF"]
+        self.mirror = ["Interface/AddOns"]
+        self.exclude = ["WTF/Config.wtf*", "*.bak", "*.old"]
+        self.workers = 8
+        self.cache_file = "file_hashes.json"
+        self.configure(settings)
+        self.hash_cache = hash_cache or FileHashCache(self.cache_file)
+
+    def configure(self, settings):
+        """Apply "addon_sync" settings (paths, mirror, exclude, workers, hash_cache)"""
+        settings = settings or {}
+        self.paths = list(settings.get("paths", self.paths))
+        self.mirror = list(settings.get("mirror", self.mirror))
+        self.exclude = list(settings.get("exclude", self.exclude))
+        self.workers = int(settings.get("workers", self.workers))
+        self.cache_file = settings.get("hash_cache", self.cache_file)
+
+    def is_excluded(self, relative_path):
+        """True if a path relative to the install root is never synced"""
+        relative_path = relative_path.replace("\\", "/").lower()
+        name = relative_path.rsplit("/", 1)[-1]
+        if name.endswith(STAGE_SUFFIX):
+            return True
+        return any(
+            fnmatch.fnmatchcase(relative_path, pattern.lower()) or fnmatch.fnmatchcase(name, pattern.lower())
+            for pattern in self.exclude
+        )
+
+    def list_files(self, folder):
+        """Return (relative path, stat) of every file below a folder"""
+        files = []
+        pending = [folder]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            files.append((os.path.relpath(entry.path, folder), entry.stat(follow_symlinks=False)))
+                    except OSError:
+                        continue
+        return files
+
+    def manifest(self, root, relative_folder):
+        """
+        Build the manifest of one synced folder of an install
+
+        Returns:
+            Tuple (folder path, dict of lower-cased relative path to
+            (relative path, size, hash))
+        """
+        folder = resolve_case(root, relative_folder)
+        files = [
+            (rel, st) for rel, st in self.list_files(folder)
+            if not self.is_excluded(f"{relative_folder}/{rel}")
+        ]
+        digests = self.hash_cache.digest_many(
+            [(os.path.join(folder, rel), st) for rel, st in files], self.workers
+        )
+        manifest = {}
+        for rel, st in files:
+            digest = digests.get(os.path.join(folder, rel))
+            if digest is not None:
+                manifest[rel.replace("\\", "/").lower()] = (rel, st.st_size, digest)
+        return folder, manifest
+
+    def source_manifests(self, source_root):
+        """Build the manifests of every synced folder of the source install"""
+        return {relative_folder: self.manifest(source_root, relative_folder) for relative_folder in self.paths}
+
+    def delta(self, source_root, target_root, source_manifests=None):
+        """
+        Compute what a target needs to match the source
+
+        Args:
+            source_root: Install directory to copy from
+            target_root: Install directory to update
+            source_manifests: The source's manifests, when syncing several
+                              targets (built here otherwise)
+
+        Returns:
+            Dict with "copy" (list of (source file, target file, size)) and
+            "delete" (list of target files)
+        """
+        copy, delete = [], []
+        mirrored = {path.lower() for path in self.mirror}
+        source_manifests = source_manifests or self.source_manifests(source_root)
+        for relative_folder in self.paths:
+            source_folder, source_files = source_manifests[relative_folder]
+            if not os.path.isdir(source_folder):
+                continue
+            target_folder, target_files = self.manifest(target_root, relative_folder)
+
+            for key, (rel, size, digest) in source_files.items():
+                existing = target_files.get(key)
+                if existing is not None and existing[2] == digest:
+                    continue
+                target_rel = existing[0] if existing is not None else rel
+                copy.append((os.path.join(source_folder, rel), os.path.join(target_folder, target_rel), size))
+
+            if relative_folder.lower() in mirrored:
+                delete.extend(
+                    os.path.join(target_folder, rel)
+                    for key, (rel, _, _) in target_files.items() if key not in source_files
+                )
+        return {"copy": copy, "delete": delete}
+
+    @staticmethod
+    def stage(source_file, target_file):
+        """Copy a file next to its destination under a staged name"""
+        os.makedirs(os.path.dirname(target_file), exist_ok=True)
+        staged = target_file + STAGE_SUFFIX
+        shutil.copy2(source_file, staged)
+        return staged
+
+    def apply(self, delta, executor):
+        """
+        Bring one target up to date: stage every copy, then swap them in
+
+        Returns:
+            Dict with "copied", "deleted", "bytes" and "errors" (messages)
+        """
+        result = {"copied": 0, "deleted": 0, "bytes": 0, "errors": []}
+        futures = {
+            executor.submit(self.stage, source_file, target_file): (target_file, size)
+            for source_file, target_file, size in delta["copy"]
+        }
+        staged = []
+        for future in concurrent.futures.as_completed(futures):
+            target_file, size = futures[future]
+            try:
+                staged.append((future.result(), target_file, size))
+            except OSError as e:
+                result["errors"].append(f"{target_file}: {e.strerror or str(e)}")
+
+        # Leave the target untouched if any copy failed
+        if result["errors"]:
+            for staged_file, _, _ in staged:
+                try:
+                    os.remove(staged_file)
+                except OSError:
+                    pass
+            return result
+
+        for staged_file, target_file, size in staged:
+            try:
+                os.replace(staged_file, target_file)
+                result["copied"] += 1
+                result["bytes"] += size
+            except OSError as e:
+                result["errors"].append(f"{target_file}: {e.strerror or str(e)}")
+        for target_file in delta["delete"]:
+            try:
+                os.remove(target_file)
+                result["deleted"] += 1
+            except OSError as e:
+                result["errors"].append(f"{target_file}: {e.strerror or str(e)}")
+        return result
+
+    def sync(self, source_root, target_roots, dry_run=False, progress=None):
+        """
+        Sync a source install to several targets
+
+        Targets are compared and updated in parallel; each is swapped in on
+        its own once its copies are staged.
+
+        Args:
+            source_root: Install directory to copy from
+            target_roots: Install directories to update
+            dry_run: Only compute the deltas
+            progress: Optional callback receiving status messages
+
+        Returns:
+            Dict of target directory to its result (the delta's "copy" and
+            "delete" counts, plus apply()'s fields unless dry_run)
+        """
+        source_root = os.path.realpath(source_root)
+        targets = []
+        for root in target_roots:
+            root = os.path.realpath(root)
+            if root != source_root and root not in targets:
+                targets.append(root)
+
+        if progress:
+            progress(f"Comparing {len(targets)} install(s) with the source...")
+        source_manifests = self.source_manifests(source_root)
+        results = {}
+        lock = threading.Lock()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            def sync_target(target_root):
+                try:
+                    delta = self.delta(source_root, target_root, source_manifests)
+                    result = {"copy": len(delta["copy"]), "delete": len(delta["delete"])}
+                    if not dry_run:
+                        result.update(self.apply(delta, executor))
+                except Exception as e:
+                    result = {"copy": 0, "delete": 0, "errors": [f"{target_root}: {str(e)}"]}
+                with lock:
+                    results[target_root] = result
+                    if progress:
+                        progress(f"Synced {len(results)} of {len(targets)} install(s)")
+
+            # Targets get their own threads so their staged copies can share the pool
+            threads = [threading.Thread(target=sync_target, args=(root,), daemon=True) for root in targets]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        try:
+            self.hash_cache.save()
+        except OSError:
+            pass
+        return results
+
+def expansion_installs(servers):
+    """
+    Map "Server / Expansion" labels to install directories
+
+    Returns:
+        Dict of label to directory, for expansions whose executable exists
+    """
+    installs = {}
+    for server_name, server_data in servers.items():
+        for expansion_name, expansion_data in server_data.get("expansions", {}).items():
+            path = expansion_data.get("path")
+            if path and os.path.isfile(path):
+                installs[f"{server_name} / {expansion_name}"] = os.path.realpath(os.path.dirname(path))
+    return installs
+
+def describe(results):
+    """One-line summary of a sync's results"""
+    copied = sum(r.get("copied", r["copy"]) for r in results.values())
+    deleted = sum(r.get("deleted", r["delete"]) for r in results.values())
+    failed = sum(1 for r in results.values() if r.get("errors"))
+    summary = f"{copied} file(s) copied, {deleted} removed across {len(results)} install(s)"
+    return summary + (f", {failed} failed" if failed else "")
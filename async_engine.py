@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import subprocess
+import concurrent.futures
+
+class AsyncProcessHandle:
+    """
+    Popen-like view of an asyncio subprocess
+
+    The supervisor and warm pools work with Popen objects from other threads;
+    this wrapper gives them the same poll/wait/terminate/kill interface while
+    the event loop owns the actual process.
+    """
+
+    def __init__(self, process, loop):
+        self._process = process
+        self._loop = loop
+        self._exited = threading.Event()
+        self.pid = process.pid
+        self.returncode = None
+        self.args = None
+
+    def _set_exited(self, returncode):
+        """Called on the event loop once the process has been reaped"""
+        self.returncode = returncode
+        self._exited.set()
+
+    def poll(self):
+        """Return the exit code, or None while the process is running"""
+        return self.returncode
+
+    def wait(self, timeout=None):
+        """Block (from any thread but the loop's) until the process exits"""
+        if not self._exited.wait(timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            self._loop.call_soon_threadsafe(self._signal, "terminate")
+
+    def kill(self):
+        if self.returncode is None:
+            self._loop.call_soon_threadsafe(self._signal, "kill")
+
+    def _signal(self, method):
+        try:
+            getattr(self._process, method)()
+        except ProcessLookupError:
+            pass
+
+class AsyncLaunchEngine:
+    """Runs every login as a coroutine on one background event loop"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.tasks = set()
+
+        # Keyboard and mouse input goes through the global focus, so it runs on
+        # a single worker thread and one client's credential entry is never
+        # interleaved with another's
+        self.input_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="login-input"
+        )
+        self.input_lock = asyncio.Lock()
+
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        """Thread function running the event loop forever"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the engine's loop
+
+        Returns:
+            A concurrent.futures.Future that can be waited on or cancelled from
+            any thread (cancelling it cancels the coroutine)
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.tasks.add(future)
+        future.add_done_callback(self.tasks.discard)
+        return future
+
+    async def run_input(self, fn, *args, **kwargs):
+        """Run a blocking input call (pyautogui) on the input thread"""
+        return await self.loop.run_in_executor(self.input_executor, lambda: fn(*args, **kwargs))
+
+    async def spawn(self, args, supervisor, key, group=None, restart_fn=None):
+        """
+        Start a process with asyncio and register it with the supervisor
+
+        Returns:
+            An AsyncProcessHandle for the new process
+        """
+        if isinstance(args, str):
+            args = [args]
+        process = await asyncio.create_subprocess_exec(*args)
+        handle = AsyncProcessHandle(process, self.loop)
+        handle.args = args
+        supervisor.adopt(key, handle, args, group, restart_fn)
+
+        async def watch_exit():
+            returncode = await process.wait()
+            handle._set_exited(returncode)
+            supervisor.process_exited(handle.pid)
+
+        self.loop.create_task(watch_exit())
+        return handle
+
+    def cancel_all(self):
+        """Cancel every in-flight coroutine"""
+        for future in list(self.tasks):
+            future.cancel()
+
+    def in_flight(self):
+        """Number of coroutines that have not finished yet"""
+        return len(self.tasks)
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the shared launch engine, starting it on first use"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = AsyncLaunchEngine()
+        return _default_engine
@@ -0,0 +1,151 @@
+"""
+Helpers shared by the benchmark scripts: repository imports, a headless
+display, percentiles and baseline comparison
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+# The benchmarks import the launcher modules directly from the checkout
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list (None when empty)"""
+    from launch_metrics import LaunchMetrics
+    return LaunchMetrics.percentile(sorted(values), fraction)
+
+def ensure_display(display=":99"):
+    """
+    Make sure a display is available, starting Xvfb when there is none
+
+    Returns:
+        The Xvfb process that was started (the caller terminates it), or None
+        if a display was already set
+
+    Raises:
+        RuntimeError: If there is no display and Xvfb is not installed
+    """
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("No DISPLAY is set and Xvfb is not installed")
+
+    process = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    os.environ["DISPLAY"] = display
+
+    # Wait for the X socket to appear
+    socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb failed to start on {display}")
+        time.sleep(0.1)
+    return process
+
+def environment():
+    """Describe the machine and checkout a result was measured on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+def baseline_path(name):
+    """Path of a benchmark's stored baseline"""
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def load_baseline(name):
+    """Load a stored baseline: dict of scenario -> metric -> value"""
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("scenarios", {})
+
+def save_baseline(name, scenarios):
+    """Store scenario results as the new baseline"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w") as f:
+        json.dump({"environment": environment(), "scenarios": scenarios}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(scenarios, baseline, directions, tolerance):
+    """
+    Compare results against a baseline
+
+    Args:
+        scenarios: Dict of scenario -> metric -> measured value
+        baseline: Dict of scenario -> metric -> baseline value
+        directions: Dict of metric -> "higher" or "lower" (which way is better);
+                    metrics not listed are not compared
+        tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        List of human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for scenario, metrics in scenarios.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(scenario, {}).get(metric)
+            direction = directions.get(metric)
+            if expected is None or value is None or direction is None:
+                continue
+            if direction == "higher" and value < expected * (1 - tolerance):
+                regressions.append(f"{scenario}: {metric} {value} < baseline {expected}")
+            elif direction == "lower" and value > expected * (1 + tolerance):
+                regressions.append(f"{scenario}: {metric} {value} > baseline {expected}")
+    return regressions
+
+def finish(name, scenarios, directions, args):
+    """
+    Print results, update or check the baseline and return the exit code
+
+    args needs json, update_baseline and tolerance attributes (see add_common_arguments).
+    """
+    if args.json:
+        print(json.dumps({"benchmark": name, "environment": environment(), "scenarios": scenarios}, indent=2))
+    else:
+        for scenario, metrics in scenarios.items():
+            values = "  ".join(f"{metric}={value}" for metric, value in metrics.items())
+            print(f"{scenario}: {values}")
+
+    if args.update_baseline:
+        save_baseline(name, scenarios)
+        print(f"Baseline saved to {baseline_path(name)}", file=sys.stderr)
+        return 0
+
+    regressions = compare(scenarios, load_baseline(name), directions, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+def add_common_arguments(parser, tolerance=0.2):
+    """Add the output and baseline options every benchmark takes"""
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=tolerance,
+                        help="Allowed relative regression against the baseline")
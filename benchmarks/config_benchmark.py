@@ -0,0 +1,249 @@
+"""
+Scale benchmark for ConfigManager and account-file operations
+
+Generates synthetic data sets in a temporary directory and measures how
+load_servers/save_servers, load_accounts/save_accounts, import_accounts and
+detect_existing_accounts behave as they grow. Each operation is timed over
+several runs (median wall time) and run once more under tracemalloc for its
+peak memory.
+
+    python benchmarks/config_benchmark.py --accounts 1000 10000 --servers 100 --files 1000
+    python benchmarks/config_benchmark.py --json > results.json
+
+Exits with status 1 when a result regresses past the stored baseline
+(benchmarks/baselines/config.json) by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import contextlib
+
+import bench_utils
+
+from config_utils import ConfigManager
+
+DIRECTIONS = {
+    "seconds": "lower",
+    "peak_kib": "lower",
+    "record_kib": "lower"
+}
+
+# File name abbreviations detect_existing_accounts recognises
+EXPANSION_ABBREVIATIONS = ("mop", "tbc", "wotlk", "cata", "legion", "classic")
+EXPANSION_NAMES = ("MoP 5.4.8", "TBC 2.4.3", "WotLK 3.3.5", "Cataclysm 4.3.4", "Legion 7.3.5", "Classic 1.12")
+
+def build_parser():
+    """Create the argument parser for the config benchmark"""
+    parser = argparse.ArgumentParser(description="Scale benchmark for ConfigManager operations")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1000, 10000, 100000, 1000000],
+                        help="Accounts per file to benchmark load/save/import with")
+    parser.add_argument("--servers", type=int, nargs="+", default=[100, 500],
+                        help="Servers in servers_config.json (six expansions each)")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 5000],
+                        help="Account files for detect_existing_accounts")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per operation (the median is reported)")
+    bench_utils.add_common_arguments(parser)
+    return parser
+
+def make_accounts(count, server="Bench", expansion="MoP 5.4.8", prefix="user"):
+    """Generate an accounts structure with count accounts"""
+    return {
+        "accounts": [
+            {
+                "username": f"{prefix}{i:07d}",
+                "password": f"pw{i * 7919 % 1000003:07d}",
+                "alias": f"Alt {i}" if i % 3 == 0 else "",
+                "server": server,
+                "expansion": expansion
+            }
+            for i in range(count)
+        ]
+    }
+
+def make_servers(count):
+    """Generate a servers configuration with six expansions per server"""
+    servers = {}
+    for i in range(count):
+        server = f"Server{i:04d}"
+        servers[server] = {
+            "expansions": {
+                name: {
+                    "path": f"C:/Games/{server}/{abbreviation}/Wow.exe",
+                    "accounts_file": f"accounts_{server.lower()}_{abbreviation}.json",
+                    "coords_file": f"login_coords_{server.lower()}_{abbreviation}.json"
+                }
+                for abbreviation, name in zip(EXPANSION_ABBREVIATIONS, EXPANSION_NAMES)
+            }
+        }
+    return servers
+
+def write_json(path, data):
+    """Write a file the way ConfigManager does"""
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+def measure(operation, setup, repeat):
+    """
+    Time an operation and measure its peak memory
+
+    Args:
+        operation: Function taking the state returned by setup
+        setup: Function preparing a fresh state for one run (not measured)
+        repeat: Number of timed runs
+
+    Returns:
+        Dict with the median "seconds" and the tracemalloc "peak_kib"
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        started = time.perf_counter()
+        operation(state)
+        times.append(time.perf_counter() - started)
+        del state
+
+    # Tracing slows everything down, so memory gets its own run
+    state = setup()
+    tracemalloc.start()
+    try:
+        operation(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(statistics.median(times), 4),
+        "peak_kib": peak // 1024
+    }
+
+def retained_kib(load):
+    """Memory still held by the value load() returns, measured with tracemalloc"""
+    tracemalloc.start()
+    try:
+        value = load()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del value
+    return retained // 1024
+
+def bench_account_memory(config_manager, accounts_file, count):
+    """Compare the memory of loaded accounts as plain dicts and as AccountRecords"""
+    def load_dicts():
+        with open(accounts_file, "r") as f:
+            return json.load(f)
+
+    dict_kib = retained_kib(load_dicts)
+    record_kib = retained_kib(lambda: config_manager.load_accounts(accounts_file))
+    return {
+        "dict_kib": dict_kib,
+        "record_kib": record_kib,
+        "saving_pct": round(100 * (dict_kib - record_kib) / dict_kib, 1) if dict_kib else None
+    }
+
+def bench_accounts(config_manager, count, repeat):
+    """Benchmark loading, saving and importing an accounts file of count accounts"""
+    accounts_file = "accounts_bench_mop.json"
+    import_file = "import_bench.json"
+    write_json(accounts_file, make_accounts(count))
+    write_json(import_file, make_accounts(count, prefix="imported"))
+
+    def run_import(existing):
+        # What Account Manager's File > Import Accounts does with the data
+        with open(import_file, "r") as f:
+            imported = json.load(f).get("accounts", [])
+        config_manager.import_accounts(existing, imported, "Bench", "MoP 5.4.8", merge=True)
+        config_manager.save_accounts(existing, "accounts_bench_import.json")
+
+    results = {
+        f"load_accounts[n={count}]": measure(
+            lambda state: config_manager.load_accounts(accounts_file),
+            lambda: None, repeat
+        ),
+        f"save_accounts[n={count}]": measure(
+            lambda data: config_manager.save_accounts(data, accounts_file),
+            lambda: config_manager.load_accounts(accounts_file), repeat
+        ),
+        f"import_accounts[n={count}]": measure(
+            run_import,
+            lambda: make_accounts(1000), repeat
+        ),
+        f"account_memory[n={count}]": bench_account_memory(config_manager, accounts_file, count)
+    }
+    for path in (accounts_file, import_file, "accounts_bench_import.json"):
+        os.remove(path)
+    return results
+
+def bench_servers(config_manager, count, repeat):
+    """Benchmark loading and saving a servers configuration with count servers"""
+    servers = make_servers(count)
+    config_manager.save_servers(servers)
+    return {
+        f"load_servers[servers={count}]": measure(
+            lambda state: config_manager.load_servers(),
+            lambda: None, repeat
+        ),
+        f"save_servers[servers={count}]": measure(
+            config_manager.save_servers,
+            lambda: servers, repeat
+        )
+    }
+
+def bench_detect(config_manager, count, repeat):
+    """Benchmark detect_existing_accounts over count account files"""
+    files = []
+    for i in range(count):
+        abbreviation = EXPANSION_ABBREVIATIONS[i % len(EXPANSION_ABBREVIATIONS)]
+        path = f"accounts_server{i // len(EXPANSION_ABBREVIATIONS):05d}_{abbreviation}.json"
+        write_json(path, make_accounts(5))
+        files.append(path)
+
+    def detect(state):
+        # The scan logs every file; keep the formatting cost but not the terminal
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            config_manager.detect_existing_accounts()
+
+    result = {
+        f"detect_existing_accounts[files={count}]": measure(
+            detect,
+            lambda: config_manager.save_servers({}), repeat
+        )
+    }
+    for path in files:
+        os.remove(path)
+    config_manager.save_servers({})
+    return result
+
+def main(argv=None):
+    """Entry point of the config benchmark"""
+    args = build_parser().parse_args(argv)
+
+    original_dir = os.getcwd()
+    scenarios = {}
+    with tempfile.TemporaryDirectory(prefix="config_bench_") as workdir:
+        # ConfigManager works on files in the current directory
+        os.chdir(workdir)
+        try:
+            config_manager = ConfigManager(interactive=False)
+            for count in args.accounts:
+                print(f"Benchmarking {count} accounts...", file=sys.stderr)
+                scenarios.update(bench_accounts(config_manager, count, args.repeat))
+            for count in args.servers:
+                print(f"Benchmarking {count} servers...", file=sys.stderr)
+                scenarios.update(bench_servers(config_manager, count, args.repeat))
+            for count in args.files:
+                print(f"Benchmarking {count} account files...", file=sys.stderr)
+                scenarios.update(bench_detect(config_manager, count, args.repeat))
+        finally:
+            os.chdir(original_dir)
+
+    return bench_utils.finish("config", scenarios, DIRECTIONS, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+End-to-end launch benchmark
+
+Drives real LoginAutomation launches through the LaunchQueue against
+simulated game clients (sim_client.py) and reports launches per minute and
+login latency percentiles for each level of concurrency. Needs a display;
+when DISPLAY is not set, Xvfb is started for the run.
+
+    python benchmarks/launch_benchmark.py --clients 1 2 4 --rounds 3
+    python benchmarks/launch_benchmark.py --update-baseline
+
+Each simulated client gets its own tile of the screen and the login
+coordinates are window-relative, so with several clients every click has
+to find the right window (needs xdotool). A launch only counts as a
+success when its client reported accepting exactly that launch's account.
+
+Exits with status 1 when a result regresses past the stored baseline
+(benchmarks/baselines/launch.json) by more than --tolerance, or when any
+client received another account's credentials.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+
+import bench_utils
+from bench_utils import percentile
+
+from launch_queue import LaunchQueue, LaunchRequest
+from launch_metrics import LaunchMetrics
+from process_supervisor import ProcessSupervisor
+
+# Which way is better for each reported metric
+DIRECTIONS = {
+    "launches_per_minute": "higher",
+    "success_rate": "higher",
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "p99_ms": "lower"
+}
+
+# Size of the simulated client's window; the screen is tiled with them
+WINDOW_SIZE = (320, 220)
+
+# Login field positions: absolute for the first tile, and as fractions of
+# the window so LoginAutomation resolves them against each client's window
+LOGIN_COORDS = {
+    "username_x": 160,
+    "username_y": 90,
+    "password_x": 160,
+    "password_y": 140,
+    "username_rx": 0.5,
+    "username_ry": round(90 / 220, 4),
+    "password_rx": 0.5,
+    "password_ry": round(140 / 220, 4)
+}
+
+def build_parser():
+    """Create the argument parser for the launch benchmark"""
+    parser = argparse.ArgumentParser(description="End-to-end launch benchmark against simulated clients")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4],
+                        help="Simultaneous clients to benchmark (one scenario each)")
+    parser.add_argument("--rounds", type=int, default=2,
+                        help="Launches per client slot in each scenario")
+    parser.add_argument("--startup-delay", type=float, default=2.0,
+                        help="Seconds the simulated client takes to show its login screen")
+    parser.add_argument("--response-delay", type=float, default=0.5,
+                        help="Seconds the simulated server takes to answer a login")
+    parser.add_argument("--behaviour", choices=("accept", "reject", "random"), default="accept",
+                        help="How the simulated clients answer logins")
+    parser.add_argument("--input-mode", choices=("global", "window"), default="global",
+                        help="How credentials are typed (see input_mode in app_config.json)")
+    parser.add_argument("--prefill", action="store_true",
+                        help="Pre-fill the account name in Config.wtf instead of typing it")
+    parser.add_argument("--timeout", type=float, default=600,
+                        help="Give up on a scenario after this many seconds")
+    bench_utils.add_common_arguments(parser)
+    return parser
+
+def write_client_wrapper(workdir, args):
+    """
+    Write an executable that starts the simulated client with the benchmark's options
+
+    LoginAutomation launches a bare executable path, so the options are baked
+    into a small shell script.
+    """
+    sim_client = os.path.join(bench_utils.BENCH_DIR, "sim_client.py")
+    command = [
+        sys.executable, sim_client,
+        "--startup-delay", str(args.startup_delay),
+        "--response-delay", str(args.response_delay),
+        "--behaviour", args.behaviour,
+        "--size", f"{WINDOW_SIZE[0]},{WINDOW_SIZE[1]}",
+        "--username-pos", f"{LOGIN_COORDS['username_x']},{LOGIN_COORDS['username_y']}",
+        "--password-pos", f"{LOGIN_COORDS['password_x']},{LOGIN_COORDS['password_y']}",
+        "--slot-file", os.path.join(workdir, "window_slots"),
+        "--config-wtf", os.path.join(workdir, "WTF", "Config.wtf")
+    ]
+    wrapper = os.path.join(workdir, "sim_client.sh")
+    with open(wrapper, "w") as f:
+        f.write("#!/bin/sh\n")
+        f.write("exec " + " ".join(shlex.quote(part) for part in command) + "\n")
+    os.chmod(wrapper, 0o755)
+    return wrapper
+
+def run_scenario(clients, args, workdir, game_path):
+    """Run one scenario with the given number of simultaneous clients"""
+    # Imported late so pyautogui only looks for a display once one exists
+    from login_automation import LoginAutomation
+
+    report_file = os.path.join(workdir, f"report_{clients}.jsonl")
+    os.environ["SIM_CLIENT_REPORT"] = report_file
+
+    supervisor = ProcessSupervisor()
+    metrics = LaunchMetrics(os.path.join(workdir, f"metrics_{clients}.jsonl"))
+    login_automation = LoginAutomation(None, None, supervisor, metrics, input_mode=args.input_mode)
+    login_automation.startup_wait = args.startup_delay + 1.0
+    login_automation.confirm_delay = args.response_delay + 1.0
+
+    # Only the benchmark's own concurrency limits the queue
+    launch_queue = LaunchQueue(
+        lambda server: {"rate_per_minute": 1000000, "burst": clients, "max_concurrent": clients},
+        max_total=clients
+    )
+
+    latencies = {}
+    lock = threading.Lock()
+    config_wtf = {"enabled": True} if args.prefill else None
+
+    def make_launch_fn(account):
+        def launch_fn(on_complete):
+            started = time.monotonic()
+
+            def done(success):
+                try:
+                    if success:
+                        with lock:
+                            latencies[account["username"]] = (time.monotonic() - started) * 1000
+                finally:
+                    on_complete(success)
+
+            return login_automation.launch_game(game_path, account, LOGIN_COORDS, done,
+                                                config_wtf=config_wtf)
+        return launch_fn
+
+    launches = clients * args.rounds
+    accounts = {}
+    started = time.monotonic()
+    for index in range(launches):
+        account = {
+            "server": "Benchmark",
+            "expansion": f"Clients{clients}",
+            "username": f"bench{index:04d}",
+            "password": f"secret{index:04d}"
+        }
+        accounts[account["username"]] = account
+        launch_queue.submit(LaunchRequest(
+            account["server"], account["expansion"], account["username"], account["username"],
+            make_launch_fn(account)
+        ))
+
+    finished = launch_queue.wait_idle(args.timeout)
+    login_automation.flush_metrics(args.timeout)
+    elapsed = time.monotonic() - started
+
+    # Which account each client process was launched for
+    launched_for = {
+        client["pid"]: client["key"][2]
+        for client in supervisor.snapshot()
+        if client["pid"] and client["key"] and client["key"][2] in accounts
+    }
+    supervisor.terminate(group=("Benchmark", f"Clients{clients}"), grace_period=5.0)
+    launch_queue.stop()
+
+    # A launch succeeded only if its own client accepted its own credentials;
+    # a client typed into with another account's credentials is crossed
+    reports = []
+    if os.path.exists(report_file):
+        with open(report_file, "r") as f:
+            reports = [json.loads(line) for line in f if line.strip()]
+    succeeded, crossed = set(), 0
+    for report in reports:
+        username = launched_for.get(report["pid"])
+        if username is None:
+            continue
+        expected = accounts[username]
+        if (report["username"] != username or
+                report["password_sha256"] != hashlib.sha256(expected["password"].encode()).hexdigest()):
+            crossed += 1
+        elif report["accepted"]:
+            succeeded.add(username)
+    verified = [latencies[username] for username in succeeded if username in latencies]
+
+    return {
+        "launches": launches,
+        "completed": finished,
+        "launches_per_minute": round(len(succeeded) * 60 / elapsed, 2) if elapsed else None,
+        "success_rate": round(len(succeeded) / launches, 3),
+        "p50_ms": round(percentile(verified, 0.50)) if verified else None,
+        "p95_ms": round(percentile(verified, 0.95)) if verified else None,
+        "p99_ms": round(percentile(verified, 0.99)) if verified else None,
+        "unreported": launches - len({launched_for.get(r["pid"]) for r in reports} - {None}),
+        "crossed": crossed
+    }
+
+def main(argv=None):
+    """Entry point of the launch benchmark"""
+    args = build_parser().parse_args(argv)
+
+    if max(args.clients) > 1 and not shutil.which("xdotool"):
+        print("xdotool is needed to find each client's window when running several clients", file=sys.stderr)
+        return 2
+
+    try:
+        xvfb = bench_utils.ensure_display()
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    try:
+        scenarios = {}
+        with tempfile.TemporaryDirectory(prefix="launch_bench_") as workdir:
+            game_path = write_client_wrapper(workdir, args)
+            for clients in args.clients:
+                print(f"Benchmarking {clients} simultaneous client(s)...", file=sys.stderr)
+                scenarios[f"clients={clients}"] = run_scenario(clients, args, workdir, game_path)
+        code = bench_utils.finish("launch", scenarios, DIRECTIONS, args)
+        crossed = {name: result["crossed"] for name, result in scenarios.items() if result["crossed"]}
+        for name, count in crossed.items():
+            print(f"FAILED {name}: {count} client(s) received another account's credentials", file=sys.stderr)
+        return 1 if crossed else code
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Overhead benchmark for the per-client resource sampler
+
+Starts idle stand-in client processes under a ProcessSupervisor and runs
+the ResourceSampler over them, reporting the sampler thread's CPU usage
+(percent of one core) and the time one sampling pass takes.
+
+    python benchmarks/sampler_benchmark.py --clients 10 50 --duration 10
+
+Exits with status 1 when a result regresses past the stored baseline
+(benchmarks/baselines/sampler.json) by more than --tolerance.
+"""
+import sys
+import time
+import argparse
+import statistics
+
+import bench_utils
+
+from process_supervisor import ProcessSupervisor
+from resource_sampler import ResourceSampler
+
+DIRECTIONS = {
+    "overhead_percent": "lower",
+    "pass_ms": "lower"
+}
+
+def build_parser():
+    """Create the argument parser for the sampler benchmark"""
+    parser = argparse.ArgumentParser(description="Overhead benchmark for the resource sampler")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50],
+                        help="Supervised processes to sample (one scenario each)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between samples")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds to sample for in each scenario")
+    bench_utils.add_common_arguments(parser)
+    return parser
+
+def run_scenario(clients, args):
+    """Sample the given number of processes and measure the sampler's cost"""
+    supervisor = ProcessSupervisor()
+    group = ("Benchmark", f"Clients{clients}")
+    for index in range(clients):
+        supervisor.spawn(group + (f"bench{index:04d}",), ["sleep", str(args.duration + 30)], group=group)
+
+    # Time single passes directly, then let the thread run on its own
+    sampler = ResourceSampler(supervisor, args.interval)
+    passes = []
+    for _ in range(5):
+        started = time.thread_time()
+        sampler.sample()
+        passes.append((time.thread_time() - started) * 1000)
+
+    cpu_started, started = sampler.cpu_time, time.monotonic()
+    time.sleep(args.duration)
+    overhead = 100.0 * (sampler.cpu_time - cpu_started) / (time.monotonic() - started)
+    sampler.stop()
+    supervisor.terminate(group=group, grace_period=2.0)
+
+    return {
+        "overhead_percent": round(overhead, 3),
+        "pass_ms": round(statistics.median(passes), 3),
+        "sampled": len(sampler.clients)
+    }
+
+def main(argv=None):
+    """Entry point of the sampler benchmark"""
+    args = build_parser().parse_args(argv)
+    scenarios = {}
+    for clients in args.clients:
+        print(f"Benchmarking the sampler with {clients} client(s)...", file=sys.stderr)
+        scenarios[f"clients={clients}"] = run_scenario(clients, args)
+    return bench_utils.finish("sampler", scenarios, DIRECTIONS, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Simulated game client for launch benchmarks
+
+Opens a borderless window with a username and a password field (at the
+top-left corner of the screen, or in its own tile of the screen when
+started with --slot-file), so LoginAutomation can log into it exactly
+like into a real client (run it under Xvfb for headless use). The window
+appears after a configurable startup delay; pressing Enter in the password
+field submits the login, which is accepted or rejected. Like a real client,
+it starts with the account name from its WTF/Config.wtf filled in when
+there is one. Submitted logins are reported with the process ID, so a
+benchmark can check that each client received its own account.
+
+An accepted client keeps running ("in game") until it is terminated; a
+rejected one exits with status 1, which the launcher sees as a failed login.
+"""
+import os
+import sys
+import json
+import time
+import re
+import random
+import hashlib
+import argparse
+import tkinter as tk
+
+def parse_position(value):
+    """Parse an "x,y" window position"""
+    try:
+        x, y = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y but got {value!r}")
+    return x, y
+
+def build_parser():
+    """Create the argument parser for the simulated client"""
+    parser = argparse.ArgumentParser(description="Simulated game client for launch benchmarks")
+    parser.add_argument("--startup-delay", type=float, default=2.0,
+                        help="Seconds before the login screen appears")
+    parser.add_argument("--username-pos", type=parse_position, default=(200, 150),
+                        help="X,Y of the username field in the window")
+    parser.add_argument("--password-pos", type=parse_position, default=(200, 200),
+                        help="X,Y of the password field in the window")
+    parser.add_argument("--size", type=parse_position, default=(400, 300),
+                        help="WIDTH,HEIGHT of the window")
+    parser.add_argument("--slot-file",
+                        help="Counter file shared by simultaneous clients; each takes the next "
+                             "tile of the screen so no two windows overlap")
+    parser.add_argument("--behaviour", choices=("accept", "reject", "random"), default="accept",
+                        help="What happens when a login is submitted")
+    parser.add_argument("--accept-rate", type=float, default=0.9,
+                        help="Probability of accepting a login with --behaviour random")
+    parser.add_argument("--response-delay", type=float, default=0.5,
+                        help="Seconds the simulated server takes to answer a login")
+    parser.add_argument("--config-wtf",
+                        help="Config.wtf whose accountName is filled in at startup")
+    parser.add_argument("--report", default=os.environ.get("SIM_CLIENT_REPORT"),
+                        help="File each submitted login is appended to as a JSON line")
+    return parser
+
+def read_account_name(path):
+    """Return the accountName stored in a Config.wtf, or None"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = re.match(r'\s*SET\s+accountName\s+"(.*)"', line, re.IGNORECASE)
+                if match:
+                    return match.group(1)
+    except OSError:
+        pass
+    return None
+
+def next_slot(path):
+    """Take the next window slot from a counter file shared with other clients"""
+    import fcntl
+    with open(path, "a+") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        f.seek(0)
+        content = f.read().strip()
+        slot = int(content) if content.isdigit() else 0
+        f.seek(0)
+        f.truncate()
+        f.write(str(slot + 1))
+    return slot
+
+class SimulatedClient:
+    """The login screen of the simulated client"""
+
+    def __init__(self, root, args):
+        self.root = root
+        self.args = args
+        self.started = time.monotonic()
+
+        width, height = args.size
+        x = y = 0
+        if args.slot_file:
+            # Tile the screen; only after every tile is taken do windows overlap
+            columns = max(1, root.winfo_screenwidth() // width)
+            rows = max(1, root.winfo_screenheight() // height)
+            slot = next_slot(args.slot_file) % (columns * rows)
+            x, y = (slot % columns) * width, (slot // columns) * height
+        root.title("Simulated Client")
+        root.overrideredirect(True)
+        root.geometry(f"{width}x{height}+{x}+{y}")
+        root.configure(bg="#1a1a1a")
+
+        # Fields are centred on the configured positions, which is where the
+        # login coordinates point
+        self.username_entry = tk.Entry(root, width=20)
+        self.username_entry.place(x=args.username_pos[0], y=args.username_pos[1], anchor=tk.CENTER)
+        self.password_entry = tk.Entry(root, width=20, show="*")
+        self.password_entry.place(x=args.password_pos[0], y=args.password_pos[1], anchor=tk.CENTER)
+        self.password_entry.bind("<Return>", lambda e: self.submit())
+
+        # Like the real login screen, typing starts in the username field and Tab
+        # moves to the password (used by the per-window input mode); a
+        # remembered account name is filled in and typing starts in the password
+        account_name = read_account_name(args.config_wtf) if args.config_wtf else None
+        if account_name:
+            self.username_entry.insert(0, account_name)
+            self.password_entry.focus_set()
+        else:
+            self.username_entry.focus_set()
+
+        self.status_label = tk.Label(root, text="", bg="#1a1a1a", fg="#ffd100")
+        self.status_label.place(x=width // 2, y=height - 30, anchor=tk.CENTER)
+
+        self.submitted = False
+
+    def report(self, accepted):
+        """Append the submitted login to the report file"""
+        if not self.args.report:
+            return
+        entry = {
+            "pid": os.getpid(),
+            "username": self.username_entry.get(),
+            "password_length": len(self.password_entry.get()),
+            "password_sha256": hashlib.sha256(self.password_entry.get().encode()).hexdigest(),
+            "accepted": accepted,
+            "seconds": round(time.monotonic() - self.started, 3)
+        }
+        with open(self.args.report, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def submit(self):
+        """Answer a login after the simulated server delay"""
+        if self.submitted:
+            return
+        self.submitted = True
+        self.status_label.config(text="Connecting...")
+        self.root.after(int(self.args.response_delay * 1000), self.respond)
+
+    def respond(self):
+        """Accept or reject the submitted login"""
+        if self.args.behaviour == "random":
+            accepted = random.random() < self.args.accept_rate
+        else:
+            accepted = self.args.behaviour == "accept"
+        accepted = accepted and bool(self.username_entry.get() and self.password_entry.get())
+        self.report(accepted)
+
+        if accepted:
+            self.status_label.config(text=f"In game as {self.username_entry.get()}")
+        else:
+            self.status_label.config(text="Login rejected")
+            self.root.after(200, lambda: sys.exit(1))
+
+def main(argv=None):
+    """Entry point of the simulated client"""
+    args = build_parser().parse_args(argv)
+
+    # A real client spends its startup loading before any window shows up
+    time.sleep(args.startup_delay)
+
+    root = tk.Tk()
+    SimulatedClient(root, args)
+    root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
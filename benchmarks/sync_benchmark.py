@@ -0,0 +1,127 @@
+"""
+Benchmark for syncing addons and settings to several installs
+
+Builds a stand-in source install with an Interface/AddOns tree of many
+small files and a WTF folder, plus empty target installs, then times:
+
+    initial   - the first sync, copying everything to every target
+    resync    - a sync after --changed-percent of the addon files changed
+    unchanged - a sync with nothing to copy (manifests from the hash cache)
+
+    python benchmarks/sync_benchmark.py --targets 10 --files 5000
+
+Exits with status 1 when a result regresses past the stored baseline
+(benchmarks/baselines/sync.json) by more than --tolerance.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import bench_utils
+
+from addon_sync import AddonSync
+from file_hashes import FileHashCache
+
+DIRECTIONS = {
+    "initial_s": "lower",
+    "resync_s": "lower",
+    "unchanged_s": "lower"
+}
+
+def build_parser():
+    """Create the argument parser for the sync benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark for syncing addons and settings")
+    parser.add_argument("--targets", type=int, nargs="+", default=[10],
+                        help="Target installs to sync to (one scenario each)")
+    parser.add_argument("--files", type=int, default=5000,
+                        help="Addon files in the source install")
+    parser.add_argument("--file-kb", type=int, default=8,
+                        help="Size of each addon file in KB")
+    parser.add_argument("--changed-percent", type=float, default=2.0,
+                        help="Share of addon files changed before the resync")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Files copied at once")
+    parser.add_argument("--directory", default=None,
+                        help="Where to create the stand-in installs (default: a temp folder)")
+    bench_utils.add_common_arguments(parser)
+    return parser
+
+def create_source(root, files, file_kb):
+    """Write a source install with addons and saved variables; return the addon files"""
+    addons = os.path.join(root, "Interface", "AddOns")
+    paths = []
+    for index in range(files):
+        folder = os.path.join(addons, f"Addon{index // 50:03d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"file{index % 50:02d}.lua")
+        with open(path, "wb") as f:
+            f.write(os.urandom(file_kb * 1024))
+        paths.append(path)
+
+    saved = os.path.join(root, "WTF", "Account", "BENCH", "SavedVariables")
+    os.makedirs(saved, exist_ok=True)
+    for index in range(20):
+        with open(os.path.join(saved, f"Addon{index:03d}.lua"), "w") as f:
+            f.write(f"Addon{index:03d}DB = {{}}\n")
+    with open(os.path.join(root, "WTF", "Config.wtf"), "w") as f:
+        f.write('SET accountName "BENCH"\n')
+    return paths
+
+def run_scenario(targets, args):
+    """Time initial, partial and no-op syncs to the given number of targets"""
+    base = tempfile.mkdtemp(prefix="sync-bench-", dir=args.directory)
+    try:
+        source = os.path.join(base, "source")
+        addon_files = create_source(source, args.files, args.file_kb)
+        target_roots = [os.path.join(base, f"target{index:02d}") for index in range(targets)]
+        for root in target_roots:
+            os.makedirs(root)
+
+        settings = {"workers": args.workers}
+        hash_cache = FileHashCache(os.path.join(base, "hashes.json"))
+
+        started = time.perf_counter()
+        initial = AddonSync(settings, hash_cache).sync(source, target_roots)
+        initial_s = time.perf_counter() - started
+
+        changed = random.sample(addon_files, max(1, int(len(addon_files) * args.changed_percent / 100)))
+        for path in changed:
+            with open(path, "wb") as f:
+                f.write(os.urandom(args.file_kb * 1024))
+
+        # A fresh sync object with the saved cache, as a later run would have
+        hash_cache.save()
+        hash_cache = FileHashCache(hash_cache.cache_file)
+        started = time.perf_counter()
+        resync = AddonSync(settings, hash_cache).sync(source, target_roots)
+        resync_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        AddonSync(settings, hash_cache).sync(source, target_roots)
+        unchanged_s = time.perf_counter() - started
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    return {
+        "initial_s": round(initial_s, 3),
+        "resync_s": round(resync_s, 3),
+        "unchanged_s": round(unchanged_s, 3),
+        "initial_copied": sum(r.get("copied", 0) for r in initial.values()),
+        "resync_copied": sum(r.get("copied", 0) for r in resync.values())
+    }
+
+def main(argv=None):
+    """Entry point of the sync benchmark"""
+    args = build_parser().parse_args(argv)
+    scenarios = {}
+    for targets in args.targets:
+        print(f"Benchmarking a sync of {args.files} files to {targets} install(s)...", file=sys.stderr)
+        scenarios[f"targets={targets}"] = run_scenario(targets, args)
+    return bench_utils.finish("sync", scenarios, DIRECTIONS, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Headless UI benchmark for the Treeview-heavy screens
+
+Builds ServerManagerScreen and AccountManagerScreen against synthetic
+configurations of increasing size and measures time-to-populate, the cost
+of one mutation (refreshing the widgets after a server or account is
+added), selection latency and the memory the widgets take. Needs a display;
+when DISPLAY is not set, Xvfb is started for the run.
+
+    python benchmarks/ui_benchmark.py --accounts 100 1000 10000 --servers 10 100 500
+
+Exits with status 1 when a result regresses past the stored baseline
+(benchmarks/baselines/ui.json) by more than --tolerance.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+import bench_utils
+
+DIRECTIONS = {
+    "build_ms": "lower",
+    "populate_ms": "lower",
+    "mutation_ms": "lower",
+    "select_ms": "lower",
+    "dropdown_select_ms": "lower",
+    "widget_kib": "lower"
+}
+
+def build_parser():
+    """Create the argument parser for the UI benchmark"""
+    parser = argparse.ArgumentParser(description="Headless benchmark of the server and account screens")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Accounts shown by the account manager (one scenario each)")
+    parser.add_argument("--servers", type=int, nargs="+", default=[10, 100, 500],
+                        help="Servers shown by the server manager, six expansions each (one scenario each)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per measurement (the median is reported)")
+    bench_utils.add_common_arguments(parser, tolerance=0.3)
+    return parser
+
+def rss_kib():
+    """Resident memory of this process in KiB (Tk allocations are invisible to tracemalloc)"""
+    with open("/proc/self/statm", "r") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+def timed(root, fn, repeat):
+    """Median milliseconds for fn plus the idle work (layout and redraw) it causes"""
+    times = []
+    for _ in range(repeat):
+        root.update()
+        started = time.perf_counter()
+        fn()
+        root.update_idletasks()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 2)
+
+def write_config(servers, accounts):
+    """Write servers_config.json and one expansion's accounts file in the current directory"""
+    expansions = ("MoP 5.4.8", "TBC 2.4.3", "WotLK 3.3.5", "Cataclysm 4.3.4", "Legion 7.3.5", "Classic 1.12")
+    config = {
+        f"Server{i:04d}": {
+            "expansions": {
+                name: {
+                    "path": f"/opt/games/server{i:04d}/{name.split()[0].lower()}/Wow.exe",
+                    "accounts_file": f"accounts_server{i:04d}_{name.split()[0].lower()}.json",
+                    "coords_file": f"login_coords_server{i:04d}_{name.split()[0].lower()}.json"
+                }
+                for name in expansions
+            }
+        }
+        for i in range(servers)
+    }
+    with open("servers_config.json", "w") as f:
+        json.dump(config, f, indent=4)
+
+    with open("accounts_bench_mop.json", "w") as f:
+        json.dump({
+            "accounts": [
+                {
+                    "username": f"user{i:06d}",
+                    "password": f"pw{i:06d}",
+                    "alias": f"Alt {i}" if i % 3 == 0 else "",
+                    "server": "Bench",
+                    "expansion": "MoP 5.4.8"
+                }
+                for i in range(accounts)
+            ]
+        }, f, indent=4)
+
+def bench_server_manager(count, repeat):
+    """Benchmark ServerManagerScreen with count servers"""
+    import tkinter as tk
+    from server_manager import ServerManagerScreen
+
+    write_config(count, 0)
+    gc.collect()
+    rss_before = rss_kib()
+
+    root = tk.Tk()
+    started = time.perf_counter()
+    screen = ServerManagerScreen(root)
+    root.update_idletasks()
+    build_ms = round((time.perf_counter() - started) * 1000, 2)
+    try:
+        root.update()
+        widget_kib = rss_kib() - rss_before
+
+        populate_ms = timed(root, screen.populate_server_tree, repeat)
+
+        # What the screen does after a server is added: rebuild the tree
+        added = []
+
+        def mutate():
+            name = f"Added{len(added):04d}"
+            added.append(name)
+            screen.servers[name] = {"expansions": {"MoP 5.4.8": {"path": ""}}}
+            screen.populate_server_tree()
+
+        mutation_ms = timed(root, mutate, repeat)
+
+        # Select the last expansion, the worst case for anything that scans
+        last_server = screen.server_tree.get_children()[-1]
+        last_item = (screen.server_tree.get_children(last_server) or (last_server,))[-1]
+        select_ms = timed(root, lambda: (screen.server_tree.selection_set(last_item), root.update()), repeat)
+    finally:
+        screen.launch_queue.stop()
+        root.destroy()
+
+    return {
+        "build_ms": build_ms,
+        "populate_ms": populate_ms,
+        "mutation_ms": mutation_ms,
+        "select_ms": select_ms,
+        "widget_kib": widget_kib
+    }
+
+def bench_account_manager(count, repeat):
+    """Benchmark AccountManagerScreen with count accounts"""
+    import tkinter as tk
+    from config_utils import ConfigManager
+    from account_manager import AccountManagerScreen
+    from process_supervisor import ProcessSupervisor
+    from launch_queue import LaunchQueue
+
+    write_config(1, count)
+    config_manager = ConfigManager(interactive=False)
+    expansion_data = {"path": "", "accounts_file": "accounts_bench_mop.json", "coords_file": "coords_bench.json"}
+
+    root = tk.Tk()
+    root.withdraw()
+    launch_queue = LaunchQueue()
+    gc.collect()
+    rss_before = rss_kib()
+
+    window = tk.Toplevel(root)
+    started = time.perf_counter()
+    screen = AccountManagerScreen(
+        window, "Bench", "MoP 5.4.8", expansion_data, config_manager,
+        launch_queue=launch_queue, supervisor=ProcessSupervisor()
+    )
+    screen.update_account_dropdown()
+    root.update_idletasks()
+    build_ms = round((time.perf_counter() - started) * 1000, 2)
+    try:
+        root.update()
+        widget_kib = rss_kib() - rss_before
+
+        populate_ms = timed(root, lambda: (screen.update_account_dropdown(), screen.populate_account_tree()), repeat)
+
+        # The widget refresh add_update_account does after saving an account
+        def mutate():
+            index = len(screen.accounts_data["accounts"])
+            screen.accounts_data["accounts"].append({
+                "username": f"added{index:06d}", "password": "pw", "alias": "",
+                "server": "Bench", "expansion": "MoP 5.4.8"
+            })
+            screen.update_account_dropdown()
+            screen.populate_account_tree()
+
+        mutation_ms = timed(root, mutate, repeat)
+
+        # Selecting the last account in the tree and in the dropdown (worst case for the scans)
+        items = screen.account_tree.get_children()
+        select_ms = timed(root, lambda: (screen.account_tree.selection_set(items[-1]), root.update()), repeat)
+
+        last_account = screen.accounts_data["accounts"][-1]
+
+        def select_from_dropdown():
+            screen.account_var.set(last_account.get("alias") or last_account.get("username"))
+            screen.on_account_selected(None)
+
+        dropdown_select_ms = timed(root, select_from_dropdown, repeat)
+    finally:
+        screen.root.after_cancel(screen.state_refresh_job)
+        launch_queue.stop()
+        root.destroy()
+
+    return {
+        "build_ms": build_ms,
+        "populate_ms": populate_ms,
+        "mutation_ms": mutation_ms,
+        "select_ms": select_ms,
+        "dropdown_select_ms": dropdown_select_ms,
+        "widget_kib": widget_kib
+    }
+
+def main(argv=None):
+    """Entry point of the UI benchmark"""
+    args = build_parser().parse_args(argv)
+
+    try:
+        xvfb = bench_utils.ensure_display()
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    original_dir = os.getcwd()
+    scenarios = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="ui_bench_") as workdir:
+            # The screens read their configuration from the current directory
+            os.chdir(workdir)
+            try:
+                for count in args.servers:
+                    print(f"Benchmarking server manager with {count} servers...", file=sys.stderr)
+                    scenarios[f"server_manager[servers={count}]"] = bench_server_manager(count, args.repeat)
+                for count in args.accounts:
+                    print(f"Benchmarking account manager with {count} accounts...", file=sys.stderr)
+                    scenarios[f"account_manager[accounts={count}]"] = bench_account_manager(count, args.repeat)
+            finally:
+                os.chdir(original_dir)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    return bench_utils.finish("ui", scenarios, DIRECTIONS, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
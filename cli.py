@@ -0,0 +1,372 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+from config_utils import ConfigManager
+from performance_profiles import launch_settings, placement_policy
+from client_version import client_versions
+
+PRIORITY_CHOICES = ("high", "normal", "low")
+
+def build_parser():
+    """Create the argument parser for the command-line interface"""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="WoW Private Server Manager (run without arguments to open the GUI)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    launch_parser = subparsers.add_parser("launch", help="Launch and log in one or more accounts")
+    launch_parser.add_argument("server", nargs="?", help="Server name")
+    launch_parser.add_argument("expansion", nargs="?", help="Expansion name")
+    launch_parser.add_argument("accounts", nargs="*", help="Account usernames or aliases")
+    launch_parser.add_argument("--manifest", help="JSON file listing launches (server, expansion, account, priority)")
+    launch_parser.add_argument("--concurrency", type=int, default=1, help="Maximum launches in progress at once")
+    launch_parser.add_argument("--priority", choices=PRIORITY_CHOICES, default="normal", help="Priority for positional accounts")
+    launch_parser.add_argument("--timeout", type=float, default=None, help="Give up waiting after this many seconds")
+    launch_parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    launch_parser.add_argument("--verbose", action="store_true", help="Print progress messages to stderr")
+
+    list_parser = subparsers.add_parser("list", help="List configured servers, expansions and accounts")
+    list_parser.add_argument("--json", action="store_true", help="Print the listing as JSON")
+
+    dedup_parser = subparsers.add_parser("dedup", help="Link identical game files across configured installs")
+    dedup_parser.add_argument("--dry-run", action="store_true", help="Only report what would be linked")
+    dedup_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    sync_parser = subparsers.add_parser("sync", help="Copy changed addons and settings from one install to others")
+    sync_parser.add_argument("server", help="Server of the source install")
+    sync_parser.add_argument("expansion", help="Expansion of the source install")
+    sync_parser.add_argument("--to", action="append", metavar="SERVER/EXPANSION",
+                             help="Target install (repeatable; default: every other configured install)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Only report what would be copied")
+    sync_parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    find_parser = subparsers.add_parser("find", help="Search local disks for game client installs")
+    find_parser.add_argument("roots", nargs="*", help="Folders to search (default: install_discovery roots in app_config.json)")
+    find_parser.add_argument("--rescan", action="store_true", help="Ignore the saved index and list every folder again")
+    find_parser.add_argument("--json", action="store_true", help="Print the installs as JSON")
+
+    daemon_parser = subparsers.add_parser("daemon", help="Run the resident launcher daemon")
+    daemon_parser.add_argument("--socket", help="Unix socket path (default: daemon_socket in app_config.json)")
+
+    return parser
+
+def find_account(accounts_data, name):
+    """Find an account by username or alias"""
+    for account in accounts_data.get("accounts", []):
+        if account.get("username") == name or (account.get("alias") and account.get("alias") == name):
+            return account
+    return None
+
+def load_manifest(manifest_file):
+    """
+    Read a launch manifest
+
+    The manifest is either a list of launches or an object with a "launches" list;
+    each launch is an object with server, expansion, account and optional priority.
+    """
+    with open(manifest_file, "r") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = manifest.get("launches", [])
+    return [
+        {
+            "server": entry.get("server", ""),
+            "expansion": entry.get("expansion", ""),
+            "account": entry.get("account", ""),
+            "priority": str(entry.get("priority", "normal")).lower()
+        }
+        for entry in manifest
+    ]
+
+def list_command(config_manager, args):
+    """Print the configured servers, expansions and accounts"""
+    servers = config_manager.load_servers()
+
+    listing = []
+    for server_name, server_data in servers.items():
+        expansions = []
+        for expansion_name, expansion_data in server_data.get("expansions", {}).items():
+            accounts_file = config_manager.get_accounts_file(server_name, expansion_name, expansion_data)
+            accounts = config_manager.load_accounts(accounts_file).get("accounts", [])
+            client = client_versions.identify(expansion_data.get("path", ""))
+            expansions.append({
+                "name": expansion_name,
+                "path": expansion_data.get("path", ""),
+                "client": client,
+                "accounts": [
+                    {"username": a.get("username", ""), "alias": a.get("alias", "")}
+                    for a in accounts
+                ]
+            })
+        listing.append({"name": server_name, "expansions": expansions})
+
+    if args.json:
+        print(json.dumps({"servers": listing}, indent=2))
+        return 0
+
+    for server in listing:
+        print(server["name"])
+        for expansion in server["expansions"]:
+            client = f"  [{expansion['client']['label']}, build {expansion['client']['build']}]" if expansion["client"] else ""
+            print(f"  {expansion['name']}  ({expansion['path'] or 'no path set'}){client}")
+            for account in expansion["accounts"]:
+                alias = f"  [{account['alias']}]" if account["alias"] else ""
+                print(f"    {account['username']}{alias}")
+    return 0
+
+def launch_command(config_manager, args):
+    """Launch accounts without building any windows"""
+    # Imported here so "list" does not need a display for pyautogui
+    from login_automation import LoginAutomation
+    from cpu_placement import placement_engine
+    from memory_admission import MemoryAdmission
+    from page_cache import prewarmer
+    from launch_queue import LaunchQueue, LaunchRequest, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+    priorities = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+    if args.manifest:
+        try:
+            targets = load_manifest(args.manifest)
+        except Exception as e:
+            print(f"Failed to read manifest: {e}", file=sys.stderr)
+            return 2
+    elif args.server and args.expansion and args.accounts:
+        targets = [
+            {"server": args.server, "expansion": args.expansion, "account": name, "priority": args.priority}
+            for name in args.accounts
+        ]
+    else:
+        print("launch requires <server> <expansion> <account...> or --manifest FILE", file=sys.stderr)
+        return 2
+
+    def log(message):
+        if args.verbose:
+            print(message, file=sys.stderr)
+
+    servers = config_manager.load_servers()
+    login_automation = LoginAutomation(
+        None, log, input_mode=config_manager.global_config.get("input_mode")
+    )
+    placement_engine.configure(config_manager.global_config.get("cpu_placement"))
+    prewarmer.configure(config_manager.global_config.get("page_cache_prewarm"))
+    admission = MemoryAdmission(login_automation.supervisor, config_manager.global_config.get("memory_admission"))
+    launch_queue = LaunchQueue(
+        config_manager.get_launch_limits, log, max_total=max(1, args.concurrency),
+        admission_callback=admission.check
+    )
+    # Crash restarts are queued too, so they keep to the same limits
+    login_automation.launch_queue = launch_queue
+
+    results = []
+    results_lock = threading.Lock()
+    accounts_cache = {}
+    coords_cache = {}
+
+    def finish(result, success):
+        with results_lock:
+            result["status"] = "launched" if success else "failed"
+            result["seconds"] = round(time.monotonic() - result.pop("_started"), 2)
+            key = (result["server"], result["expansion"], result["username"])
+            result["pid"] = login_automation.supervisor.get_pid(key)
+        log(f"{result['account']}: {result['status']}")
+
+    for target in targets:
+        result = {
+            "server": target["server"],
+            "expansion": target["expansion"],
+            "account": target["account"],
+            "username": "",
+            "status": "queued"
+        }
+        results.append(result)
+
+        expansion_data = servers.get(target["server"], {}).get("expansions", {}).get(target["expansion"])
+        if expansion_data is None:
+            result.update(status="error", error="Unknown server or expansion")
+            continue
+        game_path = expansion_data.get("path", "")
+        if not game_path or not os.path.exists(game_path):
+            result.update(status="error", error=f"Game executable not found: {game_path}")
+            continue
+
+        cache_key = (target["server"], target["expansion"])
+        if cache_key not in accounts_cache:
+            accounts_cache[cache_key] = config_manager.load_accounts(
+                config_manager.get_accounts_file(target["server"], target["expansion"], expansion_data)
+            )
+            coords_cache[cache_key] = config_manager.load_coordinates(
+                config_manager.get_coords_file(target["server"], target["expansion"], expansion_data)
+            )
+
+        account = find_account(accounts_cache[cache_key], target["account"])
+        if account is None:
+            result.update(status="error", error="Account not found")
+            continue
+        account = dict(account, server=target["server"], expansion=target["expansion"])
+        result["username"] = account.get("username", "")
+
+        def launch_fn(on_complete, result=result, account=account, game_path=game_path,
+                      login_coords=coords_cache[cache_key], config_wtf=expansion_data.get("config_wtf"),
+                      profile=launch_settings(expansion_data, account),
+                      placement=placement_policy(expansion_data, account)):
+            def done(success):
+                try:
+                    finish(result, success)
+                finally:
+                    on_complete(success)
+
+            result["_started"] = time.monotonic()
+            return login_automation.launch_game(game_path, account, login_coords, done,
+                                                config_wtf=config_wtf, profile=profile,
+                                                placement=placement)
+
+        request = LaunchRequest(
+            target["server"],
+            target["expansion"],
+            result["username"],
+            target["account"],
+            launch_fn,
+            priorities.get(target["priority"], PRIORITY_NORMAL)
+        )
+        result["_request"] = request
+        if not launch_queue.submit(request):
+            result.update(status="duplicate")
+        else:
+            prewarmer.prewarm(game_path)
+
+    finished = launch_queue.wait_idle(args.timeout)
+    login_automation.flush_metrics(args.timeout)
+
+    for result in results:
+        result.pop("_started", None)
+        request = result.pop("_request", None)
+        if request is not None and request.state == "refused":
+            result.update(status="refused", error=request.hold_reason)
+        elif result["status"] == "queued":
+            # Queue rejected the launch (e.g. missing executable) or we timed out
+            result["status"] = "failed" if finished else "timeout"
+
+    ok = all(r["status"] in ("launched", "duplicate") for r in results)
+    if args.json:
+        print(json.dumps({
+            "results": results,
+            "launched": sum(1 for r in results if r["status"] == "launched"),
+            "failed": sum(1 for r in results if r["status"] not in ("launched", "duplicate"))
+        }, indent=2))
+    else:
+        for result in results:
+            detail = f" ({result['error']})" if result.get("error") else ""
+            print(f"{result['server']} / {result['expansion']} / {result['account']}: {result['status']}{detail}")
+    return 0 if ok else 1
+
+def dedup_command(config_manager, args):
+    """Replace identical files across the configured installs with links"""
+    from install_dedup import InstallDeduplicator, describe
+
+    deduplicator = InstallDeduplicator(config_manager.global_config.get("install_dedup"))
+    progress = None if args.json else (lambda message: print(message, file=sys.stderr))
+    report = deduplicator.run(config_manager.load_servers(), args.dry_run, progress)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(describe(report))
+        for error in report.get("errors", []):
+            print(f"  {error}", file=sys.stderr)
+    return 1 if report.get("errors") else 0
+
+def sync_command(config_manager, args):
+    """Sync addons and settings from one configured install to others"""
+    from addon_sync import AddonSync, expansion_installs, describe
+
+    installs = expansion_installs(config_manager.load_servers())
+    source = installs.get(f"{args.server} / {args.expansion}")
+    if source is None:
+        print(f"No install found for {args.server} / {args.expansion}", file=sys.stderr)
+        return 1
+
+    if args.to:
+        targets = []
+        for target in args.to:
+            server, _, expansion = target.partition("/")
+            path = installs.get(f"{server.strip()} / {expansion.strip()}")
+            if path is None:
+                print(f"No install found for {target}", file=sys.stderr)
+                return 1
+            targets.append(path)
+    else:
+        targets = list(installs.values())
+
+    progress = None if args.json else (lambda message: print(message, file=sys.stderr))
+    sync = AddonSync(config_manager.global_config.get("addon_sync"))
+    results = sync.sync(source, targets, args.dry_run, progress)
+
+    if args.json:
+        print(json.dumps({"source": source, "targets": results}, indent=2))
+    else:
+        for target, result in results.items():
+            errors = result.get("errors", [])
+            print(f"{target}: {result.get('copied', result['copy'])} copied, "
+                  f"{result.get('deleted', result['delete'])} removed" + (f", {len(errors)} error(s)" if errors else ""))
+            for error in errors[:10]:
+                print(f"  {error}", file=sys.stderr)
+        print(describe(results))
+    return 1 if any(r.get("errors") for r in results.values()) else 0
+
+def find_command(config_manager, args):
+    """Print the game client installs found below the search roots"""
+    from install_discovery import InstallIndex, suggest_expansion
+
+    index = InstallIndex(config_manager.global_config.get("install_discovery"))
+    progress = None if args.json else (lambda message: print(message, file=sys.stderr))
+    installs = index.crawl(args.roots, args.rescan, progress)
+
+    servers = config_manager.load_servers()
+    for install in installs:
+        suggestion = suggest_expansion(servers, install)
+        install["suggested"] = " / ".join(suggestion) if suggestion else None
+
+    if args.json:
+        print(json.dumps({"installs": installs}, indent=2))
+        return 0
+    for install in installs:
+        client = install["client"]
+        suggested = f"  -> {install['suggested']}" if install["suggested"] else ""
+        print(f"{install['path']}  [{client['label']}, build {client['build']}]{suggested}")
+    if not installs:
+        print("No game client installs found", file=sys.stderr)
+    return 0
+
+def run_cli(argv):
+    """Entry point for headless use; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "daemon":
+        from launcher_daemon import LauncherDaemon
+        try:
+            LauncherDaemon(args.socket).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        return 0
+
+    config_manager = ConfigManager(interactive=False)
+    config_manager.load_global_config()
+
+    if args.command == "list":
+        return list_command(config_manager, args)
+    if args.command == "dedup":
+        return dedup_command(config_manager, args)
+    if args.command == "sync":
+        return sync_command(config_manager, args)
+    if args.command == "find":
+        return find_command(config_manager, args)
+    return launch_command(config_manager, args)
@@ -0,0 +1,237 @@
+import os
+import mmap
+import json
+import struct
+import tempfile
+import threading
+
+# Expansions by client major version: (short name, account file name aliases)
+EXPANSIONS = {
+    1: ("Classic", ("classic", "vanilla")),
+    2: ("TBC", ("tbc", "bc")),
+    3: ("WotLK", ("wotlk", "wrath")),
+    4: ("Cataclysm", ("cata", "cataclysm")),
+    5: ("MoP", ("mop", "pandaria")),
+    6: ("WoD", ("wod", "draenor")),
+    7: ("Legion", ("legion",)),
+    8: ("BfA", ("bfa",)),
+    9: ("Shadowlands", ("sl", "shadowlands")),
+    10: ("Dragonflight", ("df", "dragonflight"))
+}
+
+# Expansion names used for account files named after an expansion (the
+# common private server patch of each)
+ALIAS_NAMES = {
+    "classic": "Classic 1.12",
+    "vanilla": "Classic 1.12",
+    "tbc": "TBC 2.4.3",
+    "bc": "TBC 2.4.3",
+    "wotlk": "WotLK 3.3.5",
+    "wrath": "WotLK 3.3.5",
+    "cata": "Cataclysm 4.3.4",
+    "cataclysm": "Cataclysm 4.3.4",
+    "mop": "MoP 5.4.8",
+    "pandaria": "MoP 5.4.8",
+    "wod": "WoD 6.2.4",
+    "draenor": "WoD 6.2.4",
+    "legion": "Legion 7.3.5",
+    "bfa": "BfA 8.3.7"
+}
+
+RT_VERSION = 16
+VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+
+# The version resource is small; never look further than this into it
+MAX_VERSION_RESOURCE = 64 * 1024
+
+def expansion_for_alias(alias):
+    """Return the expansion name an account file fragment ("mop", "tbc") stands for, or None"""
+    return ALIAS_NAMES.get(alias.lower())
+
+def _rva_to_offset(sections, rva):
+    """Translate a relative virtual address to a file offset using the section table"""
+    for virtual_address, virtual_size, raw_offset, raw_size in sections:
+        if virtual_address <= rva < virtual_address + max(virtual_size, raw_size):
+            return raw_offset + rva - virtual_address
+    return None
+
+def _first_entry(data, offset):
+    """Return the first (id, offset_or_data) entry of a resource directory"""
+    named, ids = struct.unpack_from("<HH", data, offset + 12)
+    if named + ids == 0:
+        return None
+    return struct.unpack_from("<II", data, offset + 16)
+
+def _find_entry(data, offset, wanted_id):
+    """Return the entry of a resource directory with an integer ID, or None"""
+    named, ids = struct.unpack_from("<HH", data, offset + 12)
+    for index in range(named, named + ids):
+        entry_id, target = struct.unpack_from("<II", data, offset + 16 + 8 * index)
+        if entry_id == wanted_id:
+            return entry_id, target
+    return None
+
+def read_pe_version(data):
+    """
+    Read the file version from the version resource of a PE executable
+
+    Only the headers, the section table and the resource directory are
+    touched, so on a memory-mapped file just those pages are read.
+
+    Args:
+        data: The executable's bytes (an mmap or bytes object)
+
+    Returns:
+        Tuple (major, minor, patch, build), or None if the file is not a PE
+        executable or has no version resource
+    """
+    if data[:2] != b"MZ":
+        return None
+    pe_offset = struct.unpack_from("<I", data, 0x3C)[0]
+    if data[pe_offset:pe_offset + 4] != b"PE\0\0":
+        return None
+
+    section_count, optional_size = struct.unpack_from("<H12xH", data, pe_offset + 6)
+    optional = pe_offset + 24
+    magic = struct.unpack_from("<H", data, optional)[0]
+    # Data directories start after the standard and Windows-specific fields
+    directories = optional + (96 if magic == 0x10B else 112)
+    resource_rva, resource_size = struct.unpack_from("<II", data, directories + 2 * 8)
+    if not resource_rva:
+        return None
+
+    sections = []
+    section_table = optional + optional_size
+    for index in range(section_count):
+        virtual_size, virtual_address, raw_size, raw_offset = struct.unpack_from(
+            "<IIII", data, section_table + 40 * index + 8
+        )
+        sections.append((virtual_address, virtual_size, raw_offset, raw_size))
+    root = _rva_to_offset(sections, resource_rva)
+    if root is None:
+        return None
+
+    # Resource tree: type (RT_VERSION) -> name -> language -> data entry
+    entry = _find_entry(data, root, RT_VERSION)
+    for _ in range(2):
+        if entry is None or not entry[1] & 0x80000000:
+            return None
+        entry = _first_entry(data, root + (entry[1] & 0x7FFFFFFF))
+    if entry is None or entry[1] & 0x80000000:
+        return None
+    data_rva, data_size = struct.unpack_from("<II", data, root + entry[1])
+    start = _rva_to_offset(sections, data_rva)
+    if start is None:
+        return None
+
+    # VS_VERSIONINFO starts with a header and a UTF-16 key; the fixed info
+    # follows, found by its signature
+    block = bytes(data[start:start + min(data_size, MAX_VERSION_RESOURCE)])
+    position = block.find(struct.pack("<I", VS_FIXEDFILEINFO_SIGNATURE))
+    if position < 0 or position + 16 > len(block):
+        return None
+    file_ms, file_ls = struct.unpack_from("<II", block, position + 8)
+    return file_ms >> 16, file_ms & 0xFFFF, file_ls >> 16, file_ls & 0xFFFF
+
+def identify_file(path):
+    """
+    Identify the client build of an executable without reading all of it
+
+    Returns:
+        Dict with version ("5.4.8"), build (18414), expansion ("MoP") and
+        label ("MoP 5.4.8"), or None if the version cannot be read
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < 0x40:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                version = read_pe_version(data)
+            except (struct.error, ValueError, IndexError):
+                return None
+    if version is None:
+        return None
+
+    major, minor, patch, build = version
+    expansion = EXPANSIONS.get(major, (None,))[0]
+    number = f"{major}.{minor}.{patch}"
+    return {
+        "version": number,
+        "build": build,
+        "expansion": expansion,
+        "label": f"{expansion} {number}" if expansion else f"Client {number}"
+    }
+
+class ClientVersionCache:
+    """
+    Client builds of executables, cached by file fingerprint
+
+    An executable is only opened again when its size or modification time
+    changed since it was identified. The cache is kept in a small JSON file
+    so the server list and dialogs do not re-read executables on each start.
+    """
+
+    def __init__(self, cache_file="client_versions.json"):
+        """
+        Initialize the cache
+
+        Args:
+            cache_file: JSON file the identified builds are kept in
+        """
+        self.cache_file = cache_file
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.cache_file, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".versions-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def identify(self, path):
+        """
+        Return the client build of an executable (see identify_file)
+
+        Returns:
+            The build dict, or None if the file is missing or unrecognized
+        """
+        if not path:
+            return None
+        try:
+            real_path = os.path.realpath(path)
+            st = os.stat(real_path)
+        except OSError:
+            return None
+        fingerprint = [st.st_size, st.st_mtime_ns]
+
+        with self.lock:
+            self._load()
+            entry = self.entries.get(real_path)
+            if entry and entry.get("fingerprint") == fingerprint:
+                return entry.get("client")
+
+        try:
+            client = identify_file(real_path)
+        except OSError:
+            return None
+
+        with self.lock:
+            self.entries[real_path] = {"fingerprint": fingerprint, "client": client}
+            self._save()
+        return client
+
+# Shared so the dialogs, account detection and CLI reuse one cache
+client_versions = ClientVersionCache()
@@ -1,12 +1,20 @@
 import os
+import sys
 import json
 import tkinter as tk
 from tkinter import messagebox, filedialog
 
+from account_records import AccountRecord, records_from_data, data_from_records
+from client_version import expansion_for_alias, client_versions
+
 class ConfigManager:
     """Handles configuration file operations for the application"""
     
-    def __init__(self):
+    def __init__(self, interactive=True):
+        # Show errors in message boxes (False for headless/command-line use,
+        # where they are written to stderr instead)
+        self.interactive = interactive
+        
         # Main configuration files
         self.servers_config_file = "servers_config.json"
         self.global_config_file = "app_config.json"
@@ -14,17 +22,102 @@ class ConfigManager:
         # Empty default configurations (no pre-defined servers)
         self.default_server_data = {}
         
+        # Launch limits by server, rebuilt whenever the server configuration
+        # is loaded or saved (read by the launch queue's dispatcher thread)
+        self.launch_limits = None
+        
         # Global app settings
         self.global_config = {
             "theme": "default",
             "auto_update_check": True,
             "last_server": "",
-            "last_expansion": ""
+            "last_expansion": "",
+            # Default logon throttling, overridable per server with a
+            # "launch_limits" entry in servers_config.json
+            "launch_limits": {
+                "rate_per_minute": 4,
+                "burst": 2,
+                "max_concurrent": 1
+            },
+            # Unix socket of the resident launcher daemon (main.py daemon)
+            "daemon_socket": "launcher.sock",
+            # "global": type through the focused window (one client at a time);
+            # "window": send keys to each client's X11 window in parallel
+            "input_mode": "global",
+            # Cores reserved for foreground clients and cores per background
+            # client, for accounts whose profile sets a "cpu" role (Linux)
+            "cpu_placement": {
+                "enabled": True,
+                "foreground_cores": 2,
+                "background_cores": 1
+            },
+            # Hold queued launches while the host lacks memory for another
+            # client (sizes in MB; client_budget_mb 0 means no total cap)
+            "memory_admission": {
+                "enabled": True,
+                "reserve_mb": 1024,
+                "client_estimate_mb": 1536,
+                "client_budget_mb": 0,
+                "settle_seconds": 90,
+                "max_wait_seconds": 600
+            },
+            # Per-client CPU/memory/disk sampling shown in the account list
+            # (seconds between samples, samples kept per client)
+            "resource_sampler": {
+                "interval": 2.0,
+                "history": 60
+            },
+            # Read an install's data files into the page cache when its
+            # expansion is selected or a launch is queued
+            "page_cache_prewarm": {
+                "enabled": True,
+                "workers": 4,
+                "max_fraction": 0.5,
+                "max_mb": 8192,
+                "min_interval": 600
+            },
+            # Link identical game files across installs ("auto" reflinks where
+            # the file system supports it and hard-links otherwise)
+            "install_dedup": {
+                "mode": "auto",
+                "workers": 4,
+                "min_size_kb": 64,
+                "hash_cache": "file_hashes.json"
+            },
+            # Folders copied from one install to others by Sync Addons and
+            # Settings; target-only files are removed from "mirror" folders
+            "addon_sync": {
+                "paths": ["Interface/AddOns", "WTF"],
+                "mirror": ["Interface/AddOns"],
+                "exclude": ["WTF/Config.wtf*", "*.bak", "*.old"],
+                "workers": 8,
+                "hash_cache": "file_hashes.json"
+            },
+            # Folders searched by Find Installations (empty: every drive on
+            # Windows, home and the usual mount points elsewhere)
+            "install_discovery": {
+                "roots": [],
+                "workers": 8,
+                "max_depth": 8,
+                "index_file": "install_index.json"
+            }
         }
         
         # Initialize configs if they don't exist
         self.init_configs()
     
+    def show_error(self, title, message):
+        """Report an error in a message box, or on stderr when headless"""
+        if self.interactive:
+            messagebox.showerror(title, message)
+        else:
+            print(f"{title}: {message}", file=sys.stderr)
+    
+    def show_info(self, title, message):
+        """Show an informational message box (ignored when headless)"""
+        if self.interactive:
+            messagebox.showinfo(title, message)
+    
     def init_configs(self):
         """Initialize configuration files if they don't exist"""
         # Initialize global config
@@ -37,7 +130,7 @@ class ConfigManager:
             self.save_servers({})
             
             # Inform the user about how to add servers
-            messagebox.showinfo(
+            self.show_info(
                 "No Servers Found", 
                 "No server configurations were found.\n\n" +
                 "You can:\n" +
@@ -50,9 +143,11 @@ class ConfigManager:
         if os.path.exists(self.servers_config_file):
             try:
                 with open(self.servers_config_file, 'r') as f:
-                    return json.load(f)
+                    servers_data = json.load(f)
+                self.cache_launch_limits(servers_data)
+                return servers_data
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to load server configuration: {e}")
+                self.show_error("Error", f"Failed to load server configuration: {e}")
                 return self.default_server_data
         else:
             return self.default_server_data
@@ -62,9 +157,10 @@ class ConfigManager:
         try:
             with open(self.servers_config_file, 'w') as f:
                 json.dump(servers_data, f, indent=4)
+            self.cache_launch_limits(servers_data)
             return True
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save server configuration: {e}")
+            self.show_error("Error", f"Failed to save server configuration: {e}")
             return False
     
     def load_global_config(self):
@@ -75,8 +171,10 @@ class ConfigManager:
                     loaded_config = json.load(f)
                     # Update our default config with loaded values
                     self.global_config.update(loaded_config)
+                # The defaults may have changed
+                self.launch_limits = None
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to load application configuration: {e}")
+                self.show_error("Error", f"Failed to load application configuration: {e}")
         return self.global_config
     
     def save_global_config(self):
@@ -86,23 +184,69 @@ class ConfigManager:
                 json.dump(self.global_config, f, indent=4)
             return True
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save application configuration: {e}")
+            self.show_error("Error", f"Failed to save application configuration: {e}")
             return False
     
+    def cache_launch_limits(self, servers_data):
+        """Rebuild the launch limits of every server from a server configuration"""
+        defaults = self.global_config.get("launch_limits", {})
+        launch_limits = {
+            server: dict(defaults, **server_data.get("launch_limits", {}))
+            for server, server_data in servers_data.items()
+            if isinstance(server_data, dict)
+        }
+        self.launch_limits = launch_limits
+        return launch_limits
+    
+    def get_launch_limits(self, server):
+        """
+        Return the launch rate limits for a server (global defaults plus server overrides)
+        
+        Called by the launch queue's dispatcher thread for every pending
+        request, so the limits come from the cache and the configuration file
+        is only read if it has not been loaded yet. Errors are never shown
+        from here; an unreadable file means the global defaults apply.
+        """
+        launch_limits = self.launch_limits
+        if launch_limits is None:
+            try:
+                with open(self.servers_config_file, 'r') as f:
+                    launch_limits = self.cache_launch_limits(json.load(f))
+            except (OSError, ValueError, AttributeError):
+                launch_limits = self.cache_launch_limits({})
+        limits = launch_limits.get(server)
+        if limits is None:
+            limits = self.global_config.get("launch_limits", {})
+        return dict(limits)
+    
     def update_last_used(self, server, expansion):
         """Update the last used server and expansion"""
         self.global_config["last_server"] = server
         self.global_config["last_expansion"] = expansion
         self.save_global_config()
     
+    def get_accounts_file(self, server, expansion, expansion_data):
+        """Return the accounts file of an expansion, falling back to the default name"""
+        return expansion_data.get(
+            "accounts_file",
+            f"accounts_{server.lower()}_{expansion.lower().replace(' ', '_')}.json"
+        )
+    
+    def get_coords_file(self, server, expansion, expansion_data):
+        """Return the login coordinates file of an expansion, falling back to the default name"""
+        return expansion_data.get(
+            "coords_file",
+            f"login_coords_{server.lower()}_{expansion.lower().replace(' ', '_')}.json"
+        )
+    
     def load_accounts(self, accounts_file):
-        """Load accounts from the specified file"""
+        """Load accounts from the specified file (the accounts are AccountRecord objects)"""
         if os.path.exists(accounts_file):
             try:
                 with open(accounts_file, 'r') as f:
-                    return json.load(f)
+                    return records_from_data(json.load(f))
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to load accounts: {e}")
+                self.show_error("Error", f"Failed to load accounts: {e}")
                 return {"accounts": []}
         else:
             return {"accounts": []}
@@ -111,12 +255,38 @@ class ConfigManager:
         """Save accounts to the specified file"""
         try:
             with open(accounts_file, 'w') as f:
-                json.dump(accounts_data, f, indent=4)
+                json.dump(data_from_records(accounts_data), f, indent=4)
             return True
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save accounts: {e}")
+            self.show_error("Error", f"Failed to save accounts: {e}")
             return False
     
+    def import_accounts(self, accounts_data, imported_accounts, server, expansion, merge=True):
+        """
+        Add imported accounts to an accounts structure
+        
+        Args:
+            accounts_data: The accounts dict being imported into (modified in place)
+            imported_accounts: List of account dicts read from an import file
+            server: Server the imported accounts are assigned to
+            expansion: Expansion the imported accounts are assigned to
+            merge: Append to the existing accounts (False replaces them)
+        
+        Returns:
+            The updated accounts_data
+        """
+        # Update server and expansion for imported accounts
+        imported_accounts = [AccountRecord.from_dict(account) for account in imported_accounts]
+        for account in imported_accounts:
+            account["server"] = server
+            account["expansion"] = expansion
+        
+        if merge:
+            accounts_data.setdefault("accounts", []).extend(imported_accounts)
+        else:
+            accounts_data["accounts"] = imported_accounts
+        return accounts_data
+    
     def load_coordinates(self, coords_file):
         """Load login screen coordinates from the specified file"""
         default_coords = {
@@ -133,7 +303,7 @@ class ConfigManager:
                     # Update our default coordinates with loaded values
                     default_coords.update(loaded_coords)
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to load login coordinates: {e}")
+                self.show_error("Error", f"Failed to load login coordinates: {e}")
         
         return default_coords
     
@@ -144,9 +314,32 @@ class ConfigManager:
                 json.dump(coords_data, f, indent=4)
             return True
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save login coordinates: {e}")
+            self.show_error("Error", f"Failed to save login coordinates: {e}")
             return False
     
+    def find_client_path(self, server_data, expansion):
+        """
+        Find an executable of a server that runs a given expansion
+
+        The executables already configured for the server's other expansions
+        are identified from their version resource, so an account file named
+        after an expansion can be matched with an install of that client.
+
+        Args:
+            server_data: The server's configuration
+            expansion: Expansion name, e.g. "MoP 5.4.8"
+
+        Returns:
+            The executable path, or "" if none matches
+        """
+        wanted = expansion.split()[0].lower()
+        for expansion_data in server_data.get("expansions", {}).values():
+            path = expansion_data.get("path", "")
+            client = client_versions.identify(path)
+            if client and client["expansion"] and client["expansion"].lower() == wanted:
+                return path
+        return ""
+    
     def detect_existing_accounts(self):
         """
         Scan the current directory for account files and try to associate them with 
@@ -202,11 +395,8 @@ class ConfigManager:
                 # Try to determine the expansion from the remaining parts
                 if len(parts) > 1:
                     expansion_part = parts[1]
-                    if expansion_part.lower() == "mop":
-                        expansion = "MoP 5.4.8"
-                    elif expansion_part.lower() == "tbc":
-                        expansion = "TBC 2.4.3"
-                    else:
+                    expansion = expansion_for_alias(expansion_part)
+                    if expansion is None:
                         # Unknown expansion, skip
                         print(f"Unknown expansion in file: {file}")
                         continue
@@ -225,19 +415,8 @@ class ConfigManager:
                 expansion_part = parts[2]
                 
                 # Map common abbreviations to expansion names
-                if expansion_part.lower() == "mop":
-                    expansion = "MoP 5.4.8"
-                elif expansion_part.lower() == "tbc":
-                    expansion = "TBC 2.4.3"
-                elif expansion_part.lower() in ["wotlk", "wrath"]:
-                    expansion = "WotLK 3.3.5"
-                elif expansion_part.lower() == "cata":
-                    expansion = "Cataclysm 4.3.4"
-                elif expansion_part.lower() == "legion":
-                    expansion = "Legion 7.3.5"
-                elif expansion_part.lower() == "classic":
-                    expansion = "Classic 1.12"
-                else:
+                expansion = expansion_for_alias(expansion_part)
+                if expansion is None:
                     # Unknown expansion, skip
                     print(f"Unknown expansion in file: {file}")
                     continue
@@ -268,7 +447,9 @@ class ConfigManager:
             if expansion not in servers_data[server]["expansions"]:
                 # Add expansion with the account file
                 servers_data[server]["expansions"][expansion] = {
-                    "path": "",  # Path needs to be filled in manually
+                    # Reuse the server's install of the same client, if any;
+                    # otherwise the path needs to be filled in manually
+                    "path": self.find_client_path(servers_data[server], expansion),
                     "accounts_file": file,
                     "coords_file": f"login_coords_{server.lower()}_{expansion_part.lower()}.json"
                 }
@@ -279,7 +460,7 @@ class ConfigManager:
         if updated:
             print("Saving updated server configuration")
             self.save_servers(servers_data)
-            messagebox.showinfo(
+            self.show_info(
                 "Accounts Detected",
                 "Found and configured account files for some servers.\n"
                 "You may need to fill in missing game paths."
@@ -0,0 +1,358 @@
+import os
+import sys
+import shutil
+import threading
+import subprocess
+import tkinter as tk
+from tkinter import ttk, messagebox
+from ui_components import WOW_COLORS
+
+# ionice classes accepted in a placement policy
+IONICE_CLASSES = {"realtime": "1", "best-effort": "2", "idle": "3"}
+
+# Default nice level for each role when the policy does not set one
+DEFAULT_NICE = {"foreground": 0, "background": 10}
+
+class Placement:
+    """Where one client runs: its CPU set and scheduling priority"""
+
+    __slots__ = ("pid", "key", "role", "policy", "cpus", "nice", "ionice", "error")
+
+    def __init__(self, pid, key, role, policy, cpus, nice=None, ionice=None, error=None):
+        self.pid = pid
+        self.key = key
+        self.role = role
+        self.policy = policy
+        self.cpus = cpus
+        self.nice = nice
+        self.ionice = ionice
+        self.error = error
+
+class PlacementEngine:
+    """
+    Assigns launched clients to CPU cores and scheduling priorities (Linux)
+
+    The highest-numbered cores are reserved for foreground clients; background
+    clients are spread round-robin over the remaining cores and run at a
+    lower priority, so alts cannot steal time from the client being played.
+    """
+
+    def __init__(self, foreground_cores=2, background_cores=1):
+        """
+        Initialize the engine
+
+        Args:
+            foreground_cores: Cores reserved for foreground clients
+            background_cores: Cores given to each background client
+        """
+        self.enabled = True
+        self.foreground_cores = foreground_cores
+        self.background_cores = background_cores
+        self.placements = {}
+        self.next_core = 0
+        self.version = 0
+        self.lock = threading.Lock()
+
+        # Previous /proc/stat sample for per-core load
+        self.cpu_times = {}
+
+    @staticmethod
+    def available():
+        """True when CPU placement is supported on this system"""
+        return sys.platform.startswith("linux") and hasattr(os, "sched_setaffinity")
+
+    def configure(self, settings):
+        """Apply the "cpu_placement" settings from app_config.json"""
+        settings = settings or {}
+        with self.lock:
+            self.enabled = bool(settings.get("enabled", True))
+            self.foreground_cores = int(settings.get("foreground_cores", self.foreground_cores))
+            self.background_cores = int(settings.get("background_cores", self.background_cores))
+
+    def core_pools(self):
+        """
+        Split the usable cores into (foreground, background) lists
+
+        With too few cores to dedicate any, both roles share all of them.
+        """
+        cores = sorted(os.sched_getaffinity(0))
+        reserved = min(self.foreground_cores, len(cores) - 1)
+        if reserved <= 0:
+            return cores, cores
+        return cores[-reserved:], cores[:-reserved]
+
+    @staticmethod
+    def _threads(pid):
+        """Thread ids of a process (affinity and nice are per thread on Linux)"""
+        try:
+            return [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+        except OSError:
+            return [pid]
+
+    def _prune(self):
+        """Forget placements of processes that have exited"""
+        for pid in [pid for pid in self.placements if not os.path.exists(f"/proc/{pid}")]:
+            del self.placements[pid]
+
+    def _choose_cpus(self, role):
+        """Pick the CPU set for a new placement"""
+        foreground, background = self.core_pools()
+        if role == "foreground":
+            return foreground
+        count = max(1, min(self.background_cores, len(background)))
+        cpus = [background[(self.next_core + i) % len(background)] for i in range(count)]
+        self.next_core = (self.next_core + count) % len(background)
+        return sorted(cpus)
+
+    def _apply(self, placement, policy):
+        """Set affinity, nice and ionice of a placed process"""
+        errors = []
+        nice = policy.get("nice", DEFAULT_NICE[placement.role])
+        for tid in self._threads(placement.pid):
+            try:
+                os.sched_setaffinity(tid, placement.cpus)
+            except OSError as e:
+                errors.append(f"affinity: {e.strerror}")
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, nice)
+            except OSError as e:
+                # Raising priority again needs CAP_SYS_NICE; keep the current level
+                errors.append(f"nice: {e.strerror}")
+        try:
+            placement.nice = os.getpriority(os.PRIO_PROCESS, placement.pid)
+        except OSError:
+            placement.nice = None
+
+        ionice = policy.get("ionice")
+        if ionice in IONICE_CLASSES and shutil.which("ionice"):
+            result = subprocess.run(
+                ["ionice", "-c", IONICE_CLASSES[ionice], "-p", str(placement.pid)],
+                capture_output=True, text=True
+            )
+            if result.returncode == 0:
+                placement.ionice = ionice
+            else:
+                errors.append(f"ionice: {result.stderr.strip()}")
+
+        # Duplicates come from the same error on every thread
+        placement.error = "; ".join(dict.fromkeys(errors)) or None
+
+    def place(self, pid, key, policy):
+        """
+        Place a launched client according to its policy
+
+        Args:
+            pid: Process id of the client
+            key: Supervisor key of the client, e.g. (server, expansion, username)
+            policy: Dict with "cpu" ("foreground" or "background") and optionally
+                    "nice" and "ionice" ("idle", "best-effort" or "realtime")
+
+        Returns:
+            The Placement, or None if the client is not placed
+        """
+        role = (policy or {}).get("cpu")
+        if role not in DEFAULT_NICE or not self.enabled or not self.available():
+            return None
+        with self.lock:
+            self._prune()
+            placement = Placement(pid, key, role, dict(policy), self._choose_cpus(role))
+            self._apply(placement, policy)
+            self.placements[pid] = placement
+            self.version += 1
+        return placement
+
+    def set_role(self, pid, role):
+        """Move a placed client to the foreground or background cores"""
+        with self.lock:
+            placement = self.placements.get(pid)
+            if placement is None or role not in DEFAULT_NICE:
+                return None
+            # The account's own policy applies when it returns to its usual
+            # role; otherwise the role's defaults do
+            if role == placement.policy.get("cpu"):
+                policy = placement.policy
+            else:
+                policy = {"ionice": "best-effort" if role == "foreground" else "idle"}
+            placement.role = role
+            placement.cpus = self._choose_cpus(role)
+            self._apply(placement, policy)
+            self.version += 1
+            return placement
+
+    def snapshot(self):
+        """Return a list of dicts describing every placed client"""
+        with self.lock:
+            self._prune()
+            return [
+                {
+                    "pid": p.pid,
+                    "key": p.key,
+                    "role": p.role,
+                    "cpus": list(p.cpus),
+                    "nice": p.nice,
+                    "ionice": p.ionice,
+                    "error": p.error
+                }
+                for p in self.placements.values()
+            ]
+
+    def core_load(self):
+        """
+        Return per-core load since the previous call
+
+        Returns:
+            Dict of core number to (busy percent, placed clients)
+        """
+        times = {}
+        try:
+            with open("/proc/stat", "r") as f:
+                for line in f:
+                    if line.startswith("cpu") and line[3].isdigit():
+                        fields = line.split()
+                        values = [int(v) for v in fields[1:]]
+                        # idle and iowait count as not busy
+                        times[int(fields[0][3:])] = (sum(values), values[3] + values[4])
+        except (OSError, IndexError, ValueError):
+            return {}
+
+        clients = {}
+        with self.lock:
+            for placement in self.placements.values():
+                for cpu in placement.cpus:
+                    clients[cpu] = clients.get(cpu, 0) + 1
+
+        load = {}
+        for cpu, (total, idle) in times.items():
+            previous = self.cpu_times.get(cpu)
+            busy = 0.0
+            if previous and total > previous[0]:
+                busy = 100.0 * (1 - (idle - previous[1]) / (total - previous[0]))
+            load[cpu] = (round(busy, 1), clients.get(cpu, 0))
+        self.cpu_times = times
+        return load
+
+# Shared by every LoginAutomation so round-robin placement spans all launches
+placement_engine = PlacementEngine()
+
+class CpuPlacementDialog:
+    """Window showing client placements and the load of each core"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, engine=None):
+        """
+        Initialize the placement window
+
+        Args:
+            parent: The parent window/widget
+            engine: The PlacementEngine to display (defaults to the shared one)
+        """
+        self.engine = engine or placement_engine
+        self.shown_version = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("CPU Placement")
+        self.dialog.geometry("620x460")
+        self.dialog.transient(parent)
+        self.dialog.configure(bg=WOW_COLORS["bg_dark"])
+
+        main_frame = ttk.Frame(self.dialog, style="WoW.TFrame", padding=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        ttk.Label(main_frame, text="CPU Placement", style="Title.TLabel").grid(
+            row=0, column=0, pady=(0, 10), sticky=tk.W
+        )
+
+        # Placed clients
+        self.placement_tree = ttk.Treeview(
+            main_frame,
+            columns=("account", "pid", "role", "cpus", "nice", "note"),
+            show="headings",
+            selectmode="browse"
+        )
+        for column, heading, width in (
+            ("account", "Account", 120), ("pid", "PID", 60), ("role", "Role", 90),
+            ("cpus", "Cores", 80), ("nice", "Nice", 50), ("note", "Note", 160)
+        ):
+            self.placement_tree.heading(column, text=heading)
+            self.placement_tree.column(column, width=width)
+        self.placement_tree.grid(row=1, column=0, sticky=tk.NSEW)
+
+        # Per-core load bars
+        self.core_frame = ttk.Frame(main_frame, style="WoW.TFrame")
+        self.core_frame.grid(row=2, column=0, sticky=tk.EW, pady=(10, 0))
+        self.core_frame.columnconfigure(1, weight=1)
+        self.core_frame.columnconfigure(3, weight=1)
+        self.core_bars = {}
+
+        button_frame = ttk.Frame(main_frame, style="WoW.TFrame")
+        button_frame.grid(row=3, column=0, pady=(10, 0), sticky=tk.EW)
+        for column in range(3):
+            button_frame.columnconfigure(column, weight=1)
+        ttk.Button(button_frame, text="Make Foreground",
+                   command=lambda: self.set_selected_role("foreground")).grid(row=0, column=0, padx=3, sticky=tk.EW)
+        ttk.Button(button_frame, text="Make Background",
+                   command=lambda: self.set_selected_role("background")).grid(row=0, column=1, padx=3, sticky=tk.EW)
+        ttk.Button(button_frame, text="Close", style="Gold.TButton", command=self.dialog.destroy).grid(
+            row=0, column=2, padx=3, sticky=tk.EW
+        )
+
+        if not self.engine.available():
+            messagebox.showinfo("CPU Placement", "CPU placement is only available on Linux.", parent=self.dialog)
+
+        self.refresh_job = None
+        self.dialog.bind("<Destroy>", self.on_destroy)
+        self.refresh()
+
+    def on_destroy(self, event):
+        """Stop refreshing once the window is gone"""
+        if event.widget is self.dialog and self.refresh_job:
+            self.dialog.after_cancel(self.refresh_job)
+            self.refresh_job = None
+
+    def set_selected_role(self, role):
+        """Move the selected client to the foreground or background cores"""
+        selection = self.placement_tree.selection()
+        if selection:
+            self.engine.set_role(int(selection[0]), role)
+        self.refresh(reschedule=False)
+
+    def refresh(self, reschedule=True):
+        """Redraw the placements if they changed and update the core load"""
+        if not self.dialog.winfo_exists():
+            return
+
+        if self.engine.version != self.shown_version:
+            self.shown_version = self.engine.version
+            selected = self.placement_tree.selection()
+            self.placement_tree.delete(*self.placement_tree.get_children())
+            for row in self.engine.snapshot():
+                self.placement_tree.insert("", "end", iid=str(row["pid"]), values=(
+                    row["key"][2] if row["key"] else "",
+                    row["pid"],
+                    row["role"],
+                    ",".join(str(cpu) for cpu in row["cpus"]),
+                    "" if row["nice"] is None else row["nice"],
+                    row["error"] or ""
+                ))
+            for item in selected:
+                if self.placement_tree.exists(item):
+                    self.placement_tree.selection_set(item)
+
+        # Two columns of cores
+        for cpu, (busy, clients) in sorted(self.engine.core_load().items()):
+            if cpu not in self.core_bars:
+                row, column = divmod(cpu, 2)
+                label = ttk.Label(self.core_frame)
+                label.grid(row=row, column=column * 2, sticky=tk.W, padx=(0 if column == 0 else 10, 5))
+                bar = ttk.Progressbar(self.core_frame, maximum=100)
+                bar.grid(row=row, column=column * 2 + 1, sticky=tk.EW, pady=1)
+                self.core_bars[cpu] = (label, bar)
+            label, bar = self.core_bars[cpu]
+            label.configure(text=f"CPU {cpu}: {busy:5.1f}% ({clients} client{'s' if clients != 1 else ''})")
+            bar["value"] = busy
+
+        if reschedule:
+            self.refresh_job = self.dialog.after(self.REFRESH_MS, self.refresh)
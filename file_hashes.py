@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import concurrent.futures
+
+# Read size when hashing; large enough that hashlib releases the GIL per call
+HASH_CHUNK = 1024 * 1024
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileHashCache:
+    """
+    Content hashes of files, cached by (device, inode, mtime, size)
+
+    A file is only hashed again when its inode, modification time or size
+    changed since the last run, so repeated scans of large installs read
+    just the files that were touched. The cache is a JSON file written
+    atomically; entries that were not looked up during a run can be pruned.
+    """
+
+    def __init__(self, cache_file="file_hashes.json"):
+        """
+        Initialize the cache
+
+        Args:
+            cache_file: JSON file the hashes are kept in between runs
+        """
+        self.cache_file = cache_file
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def key(st):
+        return f"{st.st_dev}:{st.st_ino}"
+
+    def load(self):
+        """Read the cache file (a missing or damaged file starts an empty cache)"""
+        try:
+            with open(self.cache_file, "r") as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    def save(self, prune=False):
+        """
+        Write the cache file atomically
+
+        Args:
+            prune: Drop entries that were not looked up since the cache was loaded
+        """
+        with self.lock:
+            if prune:
+                self.entries = {k: v for k, v in self.entries.items() if k in self.seen}
+            data = json.dumps({"files": self.entries}, separators=(",", ":"))
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".hashes-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def cached(self, st):
+        """Return the cached hash of a file if it is unchanged, else None"""
+        key = self.key(st)
+        with self.lock:
+            self.seen.add(key)
+            entry = self.entries.get(key)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.hits += 1
+                return entry[2]
+        return None
+
+    def digest(self, path, st=None):
+        """
+        Return the content hash of a file, hashing it only if it changed
+
+        Args:
+            path: File to hash
+            st: The file's os.stat result, if the caller already has it
+        """
+        st = st or os.stat(path)
+        value = self.cached(st)
+        if value is not None:
+            return value
+
+        value = file_digest(path)
+        with self.lock:
+            self.misses += 1
+            self.entries[self.key(st)] = [st.st_mtime_ns, st.st_size, value]
+        return value
+
+    def digest_many(self, files, workers=4):
+        """
+        Hash many files in parallel
+
+        Args:
+            files: Iterable of (path, stat) pairs
+            workers: Files hashed at once
+
+        Returns:
+            Dict of path to hex digest; files that could not be read are left out
+        """
+        results, missing = {}, []
+        for path, st in files:
+            value = self.cached(st)
+            if value is None:
+                missing.append((path, st))
+            else:
+                results[path] = value
+        if not missing:
+            return results
+
+        # Only files that changed are read, on a pool of their own
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(self.digest, path, st): path for path, st in missing}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except OSError:
+                    continue
+        return results
@@ -0,0 +1,321 @@
+import os
+import sys
+import errno
+import threading
+
+from file_hashes import FileHashCache
+from memory_admission import format_bytes
+
+# Folders below an install root that belong to that install alone
+# (account settings, addons and their saved variables, caches, logs)
+PRIVATE_DIRS = ("wtf", "interface", "cache", "logs", "errors", "screenshots")
+
+# Files that are configuration rather than game data, wherever they are
+PRIVATE_EXTENSIONS = (".wtf", ".lua", ".txt", ".log", ".ini", ".cfg", ".json", ".xml")
+
+# ioctl number of FICLONE (Linux reflink: share extents, copy on write)
+FICLONE = 0x40049409
+
+# Errors meaning the file system cannot reflink these files
+REFLINK_UNSUPPORTED = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.ENOSYS)
+
+def install_dirs(servers):
+    """
+    Return the install directories of every configured expansion
+
+    Args:
+        servers: The servers configuration (servers_config.json)
+
+    Returns:
+        Sorted list of existing directories, each listed once
+    """
+    dirs = set()
+    for server_data in servers.values():
+        for expansion_data in server_data.get("expansions", {}).values():
+            path = expansion_data.get("path")
+            if path and os.path.isfile(path):
+                dirs.add(os.path.realpath(os.path.dirname(path)))
+    return sorted(dirs)
+
+def reflink(source, target):
+    """Make target a copy-on-write clone of source"""
+    import fcntl
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+class InstallDeduplicator:
+    """
+    Replaces identical game files across installs with links to one copy
+
+    Every file of the configured installs that is not private to its
+    install is hashed (in parallel, through a FileHashCache so unchanged
+    files are not read again). Files with the same size and hash on the same
+    device are then linked to a single copy: reflinked where the file system
+    supports it ("auto" or "reflink" mode), hard-linked otherwise. Each
+    replacement links to a temporary name and renames it over the original,
+    so a file is never missing or half-written.
+
+    Hard links share one inode, so a patcher that rewrites a linked file in
+    place changes it for every install; reflinks do not have that problem.
+    """
+
+    def __init__(self, settings=None, hash_cache=None):
+        """
+        Initialize the deduplicator
+
+        Args:
+            settings: The "install_dedup" settings from app_config.json
+            hash_cache: FileHashCache to use (defaults to the configured file)
+        """
+        self.mode = "auto"
+        self.workers = 4
+        self.min_size = 64 * 1024
+        self.cache_file = "file_hashes.json"
+        self.configure(settings)
+        self.hash_cache = hash_cache or FileHashCache(self.cache_file)
+        self.reflink_ok = {}
+        self.lock = threading.Lock()
+
+    def configure(self, settings):
+        """Apply "install_dedup" settings (mode, workers, min_size_kb, hash_cache)"""
+        settings = settings or {}
+        self.mode = settings.get("mode", self.mode)
+        self.workers = int(settings.get("workers", self.workers))
+        self.min_size = int(settings.get("min_size_kb", self.min_size // 1024)) * 1024
+        self.cache_file = settings.get("hash_cache", self.cache_file)
+
+    @staticmethod
+    def is_private(relative_path):
+        """True if a path (relative to its install root) must not be shared"""
+        parts = relative_path.replace("\\", "/").lower().split("/")
+        return parts[0] in PRIVATE_DIRS or parts[-1].endswith(PRIVATE_EXTENSIONS)
+
+    def candidates(self, dirs):
+        """
+        List the shareable files of the given installs
+
+        Returns:
+            List of (path, stat) pairs of regular files of at least min_size
+        """
+        files = []
+        for root in dirs:
+            pending = [root]
+            while pending:
+                try:
+                    entries = os.scandir(pending.pop())
+                except OSError:
+                    continue
+                with entries:
+                    for entry in entries:
+                        try:
+                            if self.is_private(os.path.relpath(entry.path, root)):
+                                continue
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                if st.st_size >= self.min_size:
+                                    files.append((entry.path, st))
+                        except OSError:
+                            continue
+        return files
+
+    def plan(self, dirs, progress=None):
+        """
+        Find groups of identical files across installs
+
+        Only files whose size occurs more than once on a device (and that are
+        not already the same inode) are hashed.
+
+        Args:
+            dirs: Install directories to compare
+            progress: Optional callback receiving status messages
+
+        Returns:
+            Dict with "groups" (lists of (path, stat), canonical copy first),
+            "scanned", "hashed", "cache_hits" and "bytes_saved"
+        """
+        if progress:
+            progress(f"Scanning {len(dirs)} install(s)...")
+        files = self.candidates(dirs)
+
+        by_size = {}
+        for path, st in files:
+            by_size.setdefault((st.st_dev, st.st_size), []).append((path, st))
+        to_hash = [
+            item for same_size in by_size.values()
+            if len({st.st_ino for _, st in same_size}) > 1
+            for item in same_size
+        ]
+
+        if progress:
+            progress(f"Hashing {len(to_hash)} of {len(files)} file(s)...")
+        hits_before = self.hash_cache.hits
+        digests = self.hash_cache.digest_many(to_hash, self.workers)
+
+        by_content = {}
+        for path, st in to_hash:
+            if path in digests:
+                by_content.setdefault((st.st_dev, st.st_size, digests[path]), []).append((path, st))
+
+        groups, bytes_saved = [], 0
+        for (_, size, _), members in by_content.items():
+            if len({st.st_ino for _, st in members}) < 2:
+                continue
+            # Keep the copy that is already shared most, so fewer files change
+            members.sort(key=lambda item: (-item[1].st_nlink, item[0]))
+            groups.append(members)
+
+            canonical_ino = members[0][1].st_ino
+            paths_per_inode = {}
+            for _, st in members[1:]:
+                if st.st_ino != canonical_ino:
+                    paths_per_inode.setdefault(st.st_ino, []).append(st)
+            # An inode only frees its space once none of its links remain
+            for stats in paths_per_inode.values():
+                if stats[0].st_nlink <= len(stats):
+                    bytes_saved += size
+
+        return {
+            "groups": groups,
+            "scanned": len(files),
+            "hashed": len(digests) - (self.hash_cache.hits - hits_before),
+            "cache_hits": self.hash_cache.hits - hits_before,
+            "bytes_saved": bytes_saved
+        }
+
+    def _can_reflink(self, dev):
+        with self.lock:
+            return self.reflink_ok.get(dev, self.mode in ("auto", "reflink"))
+
+    @staticmethod
+    def unchanged(path, st):
+        """True if a file still has the inode, size and mtime it was hashed with"""
+        try:
+            current = os.stat(path, follow_symlinks=False)
+        except FileNotFoundError:
+            return False
+        return (current.st_ino, current.st_mtime_ns, current.st_size) == (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def link(self, source, target, st, source_st):
+        """
+        Replace target with a link to source
+
+        Args:
+            source: The canonical copy
+            target: The identical file to replace
+            st: target's stat when it was hashed; it is left alone if it changed since
+            source_st: source's stat when it was hashed; nothing is linked to
+                       it if it changed since
+
+        Returns:
+            "reflink", "hardlink", or None if either file changed and target was skipped
+        """
+        if not self.unchanged(source, source_st):
+            return None
+        current = os.stat(target, follow_symlinks=False)
+        if (current.st_ino, current.st_mtime_ns, current.st_size) != (st.st_ino, st.st_mtime_ns, st.st_size):
+            return None
+
+        tmp_path = f"{target}.dedup-tmp"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            if sys.platform.startswith("linux") and self._can_reflink(st.st_dev):
+                try:
+                    reflink(source, tmp_path)
+                    os.chmod(tmp_path, current.st_mode & 0o7777)
+                    os.replace(tmp_path, target)
+                    return "reflink"
+                except OSError as e:
+                    if os.path.lexists(tmp_path):
+                        os.remove(tmp_path)
+                    if e.errno not in REFLINK_UNSUPPORTED or self.mode == "reflink":
+                        raise
+                    # Remember per device so the next files go straight to hard links
+                    with self.lock:
+                        self.reflink_ok[st.st_dev] = False
+
+            os.link(source, tmp_path)
+            os.replace(tmp_path, target)
+            return "hardlink"
+        except OSError:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def apply(self, plan, progress=None):
+        """
+        Link every group of a plan to its canonical copy
+
+        Returns:
+            Dict with "linked", "reflinked", "skipped" and "errors" (messages)
+        """
+        result = {"linked": 0, "reflinked": 0, "skipped": 0, "errors": []}
+        for index, members in enumerate(plan["groups"]):
+            source, source_st = members[0]
+            if progress and index % 50 == 0:
+                progress(f"Linking group {index + 1} of {len(plan['groups'])}...")
+            # A canonical copy written to since it was hashed no longer
+            # matches the others; linking them to it would replace their content
+            if not self.unchanged(source, source_st):
+                result["skipped"] += sum(1 for _, st in members[1:] if st.st_ino != source_st.st_ino)
+                continue
+            for target, st in members[1:]:
+                if st.st_ino == source_st.st_ino:
+                    continue
+                try:
+                    how = self.link(source, target, st, source_st)
+                except OSError as e:
+                    result["errors"].append(f"{target}: {e.strerror or str(e)}")
+                    continue
+                if how == "reflink":
+                    result["reflinked"] += 1
+                elif how == "hardlink":
+                    result["linked"] += 1
+                else:
+                    result["skipped"] += 1
+        return result
+
+    def run(self, servers, dry_run=False, progress=None):
+        """
+        Deduplicate every configured install
+
+        Args:
+            servers: The servers configuration (servers_config.json)
+            dry_run: Only report what would be linked
+            progress: Optional callback receiving status messages
+
+        Returns:
+            Report dict combining the plan's counts and, unless dry_run, the
+            results of apply()
+        """
+        dirs = install_dirs(servers)
+        plan = self.plan(dirs, progress)
+        report = {
+            "installs": len(dirs),
+            "scanned": plan["scanned"],
+            "hashed": plan["hashed"],
+            "cache_hits": plan["cache_hits"],
+            "groups": len(plan["groups"]),
+            "files": sum(len(members) - 1 for members in plan["groups"]),
+            "bytes_saved": plan["bytes_saved"],
+            "dry_run": dry_run
+        }
+        if not dry_run:
+            report.update(self.apply(plan, progress))
+        try:
+            self.hash_cache.save(prune=True)
+        except OSError as e:
+            report.setdefault("errors", []).append(f"{self.cache_file}: {e.strerror or str(e)}")
+        return report
+
+def describe(report):
+    """One-line summary of a deduplication report"""
+    saved = format_bytes(report["bytes_saved"])
+    if report["dry_run"]:
+        return (f"{report['files']} file(s) in {report['groups']} group(s) across {report['installs']} install(s) "
+                f"can be linked, saving {saved}")
+    errors = len(report.get("errors", []))
+    return (f"Linked {report['linked'] + report['reflinked']} file(s) ({report['reflinked']} reflinked), "
+            f"saved {saved}" + (f", {errors} error(s)" if errors else ""))
@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import string
+import tempfile
+import threading
+import concurrent.futures
+
+from client_version import client_versions
+
+# File names of game client executables (compared in lower case)
+CLIENT_NAMES = ("wow.exe", "wow-64.exe", "wow64.exe", "wowclassic.exe", "wowb.exe", "wowt.exe")
+
+# Folders never worth descending into, wherever they are
+PRUNE_NAMES = (
+    "windows", "$recycle.bin", "system volume information", "$windows.~bt", "recovery",
+    "node_modules", "__pycache__", ".git", ".svn", ".cache", ".npm", ".cargo", ".rustup"
+)
+
+# System trees on Unix-like hosts
+PRUNE_PATHS = (
+    "/proc", "/sys", "/dev", "/run", "/boot", "/etc", "/usr", "/bin", "/sbin", "/lib", "/lib32",
+    "/lib64", "/snap", "/var/lib", "/var/cache", "/var/log", "/var/tmp", "/tmp"
+)
+
+# Subfolders of a found install that cannot hold another install
+INSTALL_DIRS = ("data", "cache", "interface", "wtf", "logs", "errors", "screenshots")
+
+def default_roots():
+    """Folders searched when no roots are configured: every drive, or home and the usual mount points"""
+    if sys.platform == "win32":
+        return [f"{letter}:\\" for letter in string.ascii_uppercase if os.path.isdir(f"{letter}:\\")]
+    roots = [os.path.expanduser("~")]
+    roots.extend(path for path in ("/opt", "/mnt", "/media", "/srv", "/games") if os.path.isdir(path))
+    return roots
+
+class InstallIndex:
+    """
+    Finds game client installs below a set of root folders
+
+    Directories are crawled level by level with os.scandir on a thread pool.
+    System folders and the insides of installs already found are pruned.
+    Executables are recognized by file name and then by their PE version
+    resource (see client_version.py).
+
+    What each directory contained is kept in an index file together with
+    its modification time. A directory's mtime only changes when entries
+    are added, removed or renamed in it, so a later crawl just stats
+    directories it has seen before and lists only those that changed.
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initialize the index
+
+        Args:
+            settings: The "install_discovery" settings from app_config.json
+        """
+        self.roots = []
+        self.workers = 8
+        self.max_depth = 8
+        self.index_file = "install_index.json"
+        self.configure(settings)
+        self.dirs = None
+        self.lock = threading.Lock()
+
+    def configure(self, settings):
+        """Apply "install_discovery" settings (roots, workers, max_depth, index_file)"""
+        settings = settings or {}
+        self.roots = list(settings.get("roots", self.roots))
+        self.workers = int(settings.get("workers", self.workers))
+        self.max_depth = int(settings.get("max_depth", self.max_depth))
+        self.index_file = settings.get("index_file", self.index_file)
+
+    def load(self):
+        """Read the index file (a missing or damaged file starts an empty index)"""
+        try:
+            with open(self.index_file, "r") as f:
+                self.dirs = json.load(f).get("dirs", {})
+        except (OSError, ValueError, AttributeError):
+            self.dirs = {}
+
+    def save(self):
+        """Write the index file atomically"""
+        directory = os.path.dirname(os.path.abspath(self.index_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".index-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"dirs": self.dirs}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def pruned(path, name):
+        """True if a folder is skipped entirely"""
+        return name.lower() in PRUNE_NAMES or path in PRUNE_PATHS
+
+    def visit(self, path):
+        """
+        Return (subdirectories, candidate executables) of one directory
+
+        The index entry is reused while the directory's mtime is unchanged;
+        otherwise the directory is listed again and its entry replaced.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], []
+        with self.lock:
+            entry = self.dirs.get(path)
+        if entry and entry["mtime"] == mtime:
+            return entry["subdirs"], entry["executables"]
+
+        subdirs, executables = [], []
+        try:
+            with os.scandir(path) as entries:
+                for item in entries:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            if not self.pruned(item.path, item.name):
+                                subdirs.append(item.name)
+                        elif item.name.lower() in CLIENT_NAMES and item.is_file():
+                            executables.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+
+        # An install's own folders (Data, WTF, ...) are not searched further
+        if executables:
+            subdirs = [name for name in subdirs if name.lower() not in INSTALL_DIRS]
+        with self.lock:
+            self.dirs[path] = {"mtime": mtime, "subdirs": subdirs, "executables": executables}
+        return subdirs, executables
+
+    def crawl(self, roots=None, rescan=False, progress=None):
+        """
+        Search the roots for game client installs
+
+        Args:
+            roots: Folders to search (defaults to the configured or default roots)
+            rescan: Ignore the saved index and list every directory again
+            progress: Optional callback receiving status messages
+
+        Returns:
+            List of dicts with path, client (see client_version.identify_file)
+            and has_data, sorted by path
+        """
+        roots = [os.path.abspath(os.path.expanduser(root)) for root in (roots or self.roots or default_roots())]
+        if self.dirs is None or rescan:
+            self.load()
+            if rescan:
+                self.dirs = {}
+
+        candidates, visited, level = [], set(), [root for root in roots if os.path.isdir(root)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            for depth in range(self.max_depth + 1):
+                if not level:
+                    break
+                next_level = []
+                for path, (subdirs, executables) in zip(level, executor.map(self.visit, level)):
+                    candidates.extend(os.path.join(path, name) for name in executables)
+                    if depth < self.max_depth:
+                        next_level.extend(os.path.join(path, name) for name in subdirs)
+                visited.update(level)
+                if progress:
+                    progress(f"Searched {len(visited)} folder(s), {len(candidates)} candidate(s)...")
+                level = next_level
+
+            # Only the version resource is read, and only for changed files
+            clients = list(executor.map(client_versions.identify, candidates))
+
+        # Forget directories below the searched roots that were not reached
+        # (removed, or now pruned); other roots' entries are kept
+        prefixes = tuple(root.rstrip(os.sep) + os.sep for root in roots)
+        with self.lock:
+            for path in [p for p in self.dirs if p not in visited and (p in roots or p.startswith(prefixes))]:
+                del self.dirs[path]
+        try:
+            self.save()
+        except OSError:
+            pass
+
+        installs = []
+        for path, client in zip(candidates, clients):
+            if client is None:
+                continue
+            install_dir = os.path.dirname(path)
+            installs.append({
+                "path": path,
+                "client": client,
+                "has_data": any(os.path.isdir(os.path.join(install_dir, name)) for name in ("Data", "data"))
+            })
+        installs.sort(key=lambda install: install["path"].lower())
+        return installs
+
+def suggest_expansion(servers, install):
+    """
+    Suggest the expansion a found install belongs to
+
+    Expansions without a working executable whose name starts with the
+    install's expansion ("MoP 5.4.8" for a 5.4.8 client) are preferred.
+
+    Returns:
+        (server, expansion) or None
+    """
+    wanted = (install["client"].get("expansion") or "").lower()
+    if not wanted:
+        return None
+    for server_name, server_data in servers.items():
+        for expansion_name, expansion_data in server_data.get("expansions", {}).items():
+            if os.path.isfile(expansion_data.get("path", "")):
+                continue
+            if expansion_name.split()[0].lower() == wanted:
+                return server_name, expansion_name
+    return None
@@ -0,0 +1,261 @@
+import os
+import json
+import math
+import time
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from ui_components import WOW_COLORS
+
+# Login phases in the order they happen; each phase's duration is measured
+# from the end of the previous one. "input_wait" (waiting for other clients'
+# logins to release the focused window) only occurs with global input. The
+# fixed settle delay after submitting (LoginAutomation.confirm_delay) only
+# decides success and is not a phase; older records may still carry it as
+# "in_game_confirmed", which is ignored
+LOGIN_PHASES = (
+    "spawn",
+    "window_ready",
+    "input_wait",
+    "username_entered",
+    "password_entered",
+    "submitted"
+)
+
+PHASE_LABELS = {
+    "spawn": "Process spawn",
+    "window_ready": "Wait for client window",
+    "input_wait": "Wait for input lock",
+    "username_entered": "Username entry",
+    "password_entered": "Password entry",
+    "submitted": "Submit"
+}
+
+def login_total(phases):
+    """Total login milliseconds of a record's phases (measured phases only)"""
+    return sum(value for phase, value in phases.items() if phase in LOGIN_PHASES)
+
+class LaunchTimer:
+    """Collects monotonic timestamps for the phases of one login"""
+
+    def __init__(self, server, expansion, account):
+        self.server = server
+        self.expansion = expansion
+        self.account = account
+        self.started = time.monotonic()
+        self.marks = {}
+
+    def mark(self, phase):
+        """Record that a phase finished now (a repeated phase keeps the latest time)"""
+        self.marks[phase] = time.monotonic()
+
+    def durations(self):
+        """Return a dict of phase -> duration in milliseconds"""
+        result = {}
+        previous = self.started
+        for phase in LOGIN_PHASES:
+            if phase in self.marks:
+                result[phase] = round((self.marks[phase] - previous) * 1000)
+                previous = self.marks[phase]
+        return result
+
+class LaunchMetrics:
+    """Appends per-launch phase timings to a local file and aggregates them"""
+
+    def __init__(self, metrics_file="launch_metrics.jsonl"):
+        """
+        Initialize the metrics store
+
+        Args:
+            metrics_file: File the launch events are appended to (one JSON object per line)
+        """
+        self.metrics_file = metrics_file
+        self.lock = threading.Lock()
+
+    def start(self, server, expansion, account):
+        """Return a new LaunchTimer for a login"""
+        return LaunchTimer(server, expansion, account)
+
+    def record(self, timer, success):
+        """Append the timings of a finished login to the metrics file"""
+        event = {
+            "t": int(time.time()),
+            "s": timer.server,
+            "e": timer.expansion,
+            "a": timer.account,
+            "ok": bool(success),
+            "p": timer.durations()
+        }
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        try:
+            with self.lock:
+                with open(self.metrics_file, "a") as f:
+                    f.write(line)
+        except Exception as e:
+            print(f"Failed to write launch metrics: {str(e)}")
+
+    def load_events(self, server=None, expansion=None, account=None):
+        """Read recorded events, optionally filtered by server, expansion and account"""
+        events = []
+        if not os.path.exists(self.metrics_file):
+            return events
+
+        with self.lock:
+            with open(self.metrics_file, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # Skip lines truncated by a crash mid-write
+                        continue
+                    if server is not None and event.get("s") != server:
+                        continue
+                    if expansion is not None and event.get("e") != expansion:
+                        continue
+                    if account is not None and event.get("a") != account:
+                        continue
+                    events.append(event)
+        return events
+
+    @staticmethod
+    def percentile(sorted_values, fraction):
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_values:
+            return None
+        index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+        return sorted_values[index]
+
+    def summarize(self, server=None, expansion=None, account=None):
+        """
+        Aggregate recorded launches into per-phase percentiles
+
+        Returns:
+            Dict of phase -> {"count", "p50", "p95", "p99"} in milliseconds, plus a
+            "total" entry covering the whole login
+        """
+        samples = {phase: [] for phase in LOGIN_PHASES + ("total",)}
+        for event in self.load_events(server, expansion, account):
+            phases = event.get("p", {})
+            for phase, value in phases.items():
+                if phase in samples:
+                    samples[phase].append(value)
+            if phases:
+                samples["total"].append(login_total(phases))
+
+        summary = {}
+        for phase, values in samples.items():
+            if not values:
+                continue
+            values.sort()
+            summary[phase] = {
+                "count": len(values),
+                "p50": self.percentile(values, 0.50),
+                "p95": self.percentile(values, 0.95),
+                "p99": self.percentile(values, 0.99)
+            }
+        return summary
+
+    def dominant_phase(self, summary):
+        """Return the phase with the highest median duration, or None"""
+        phases = [p for p in LOGIN_PHASES if p in summary]
+        if not phases:
+            return None
+        return max(phases, key=lambda p: summary[p]["p50"])
+
+class LaunchStatisticsDialog:
+    """Window showing login phase percentiles for a server and expansion"""
+
+    def __init__(self, parent, metrics, server, expansion, accounts):
+        """
+        Initialize the statistics window
+
+        Args:
+            parent: The parent window/widget
+            metrics: The LaunchMetrics store to read from
+            server: Server to show statistics for
+            expansion: Expansion to show statistics for
+            accounts: Usernames that can be selected to narrow the statistics
+        """
+        self.metrics = metrics
+        self.server = server
+        self.expansion = expansion
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Launch Statistics")
+        self.dialog.geometry("560x380")
+        self.dialog.transient(parent)
+        self.dialog.configure(bg=WOW_COLORS["bg_dark"])
+
+        main_frame = ttk.Frame(self.dialog, style="WoW.TFrame", padding=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(2, weight=1)
+
+        ttk.Label(main_frame, text=f"{server} - {expansion} Launch Statistics", style="Title.TLabel").grid(
+            row=0, column=0, columnspan=2, pady=(0, 10), sticky=tk.W
+        )
+
+        # Account filter
+        ttk.Label(main_frame, text="Account:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.account_var = tk.StringVar(value="All Accounts")
+        account_dropdown = ttk.Combobox(
+            main_frame,
+            textvariable=self.account_var,
+            values=["All Accounts"] + list(accounts),
+            state="readonly"
+        )
+        account_dropdown.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=5)
+        account_dropdown.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+
+        # Phase percentiles
+        self.stats_tree = ttk.Treeview(
+            main_frame,
+            columns=("phase", "count", "p50", "p95", "p99"),
+            show="headings"
+        )
+        for column, heading, width in (
+            ("phase", "Phase", 170), ("count", "Samples", 70),
+            ("p50", "p50 (ms)", 80), ("p95", "p95 (ms)", 80), ("p99", "p99 (ms)", 80)
+        ):
+            self.stats_tree.heading(column, text=heading)
+            self.stats_tree.column(column, width=width)
+        self.stats_tree.tag_configure("dominant", foreground=WOW_COLORS["accent_gold"])
+        self.stats_tree.grid(row=2, column=0, columnspan=2, sticky=tk.NSEW, pady=5)
+
+        self.summary_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.summary_var).grid(
+            row=3, column=0, columnspan=2, sticky=tk.W, pady=5
+        )
+
+        ttk.Button(main_frame, text="Close", style="Gold.TButton", command=self.dialog.destroy).grid(
+            row=4, column=0, columnspan=2, pady=(10, 0)
+        )
+
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the percentiles for the current filter"""
+        account = self.account_var.get()
+        if account == "All Accounts":
+            account = None
+
+        summary = self.metrics.summarize(self.server, self.expansion, account)
+        dominant = self.metrics.dominant_phase(summary)
+
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for phase in LOGIN_PHASES + ("total",):
+            if phase not in summary:
+                continue
+            stats = summary[phase]
+            self.stats_tree.insert(
+                "", "end",
+                values=(PHASE_LABELS.get(phase, "Total"), stats["count"], stats["p50"], stats["p95"], stats["p99"]),
+                tags=("dominant",) if phase == dominant else ()
+            )
+
+        if dominant:
+            share = summary[dominant]["p50"] * 100 // max(1, summary["total"]["p50"])
+            self.summary_var.set(f"Slowest phase: {PHASE_LABELS[dominant]} (~{share}% of a typical launch)")
+        else:
+            self.summary_var.set("No launches recorded yet.")
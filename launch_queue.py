@@ -0,0 +1,522 @@
+import time
+import threading
+import itertools
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from ui_components import WOW_COLORS
+
+# Priority levels for queued launches (lower value launches first)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_HIGH: "High",
+    PRIORITY_NORMAL: "Normal",
+    PRIORITY_LOW: "Low"
+}
+
+# Seconds between admission checks while a launch is held back
+ADMISSION_RETRY = 2.0
+
+class TokenBucket:
+    """Token bucket limiting how often logins may hit one logon server"""
+
+    def __init__(self, rate_per_minute, burst):
+        """
+        Initialize the bucket
+
+        Args:
+            rate_per_minute: Number of tokens refilled per minute
+            burst: Maximum number of tokens the bucket can hold
+        """
+        self.rate = max(float(rate_per_minute), 0.001) / 60.0
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def configure(self, rate_per_minute, burst):
+        """Apply new limits without losing the tokens already earned"""
+        self._refill()
+        self.rate = max(float(rate_per_minute), 0.001) / 60.0
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        """Add the tokens earned since the last update"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """Return the number of seconds until a token is available (0 if one is)"""
+        self._refill()
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def consume(self):
+        """Take one token; returns False if the bucket is empty"""
+        if self.delay() > 0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+class LaunchRequest:
+    """A single queued game launch"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, server, expansion, username, display_name, launch_fn, priority=PRIORITY_NORMAL):
+        """
+        Initialize a launch request
+
+        Args:
+            server: Name of the server the account belongs to
+            expansion: Name of the expansion to launch
+            username: Account username (used for de-duplication)
+            display_name: Name shown in the queue (alias or username)
+            launch_fn: Callable taking an on_complete(success) callback; returns
+                       True if the launch was started
+            priority: One of PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        self.id = next(self._ids)
+        self.server = server
+        self.expansion = expansion
+        self.username = username
+        self.display_name = display_name
+        self.launch_fn = launch_fn
+        self.priority = priority
+        self.state = "queued"
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        # Why admission control is holding back or refused the launch
+        self.hold_reason = None
+
+    @property
+    def key(self):
+        """Key identifying the same account on the same server and expansion"""
+        return (self.server, self.expansion, self.username)
+
+class LaunchQueue:
+    """Prioritized launch queue with per-server rate limits and concurrency caps"""
+
+    def __init__(self, limits_callback=None, status_callback=None, max_total=None, admission_callback=None):
+        """
+        Initialize the launch queue
+
+        Args:
+            limits_callback: Function taking a server name and returning a dict with
+                             rate_per_minute, burst and max_concurrent
+            status_callback: Function to call to update status messages
+            max_total: Optional cap on concurrent launches across all servers
+            admission_callback: Optional function taking the next request and returning
+                                ("admit", None), ("wait", reason) or ("refuse", reason),
+                                e.g. MemoryAdmission.check
+        """
+        self.limits_callback = limits_callback
+        self.status_callback = status_callback
+        self.max_total = max_total
+        self.admission_callback = admission_callback
+        
+        # Latest admission message, for windows that poll the queue
+        self.hold_reason = None
+
+        self.pending = []
+        self.running = {}
+        self.buckets = {}
+        self.version = 0
+
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._thread.start()
+
+    def update_status(self, message):
+        """Update status message via callback if available"""
+        if self.status_callback:
+            self.status_callback(message)
+
+    def get_limits(self, server):
+        """Return the launch limits for a server"""
+        limits = {"rate_per_minute": 4, "burst": 2, "max_concurrent": 1}
+        if self.limits_callback:
+            limits.update(self.limits_callback(server) or {})
+        return limits
+
+    def submit(self, request):
+        """
+        Add a request to the queue
+
+        Returns:
+            True if the request was queued, False if the same account is already
+            queued or launching
+        """
+        with self._cond:
+            for existing in self.pending + list(self.running.values()):
+                if existing.key == request.key:
+                    # Let a duplicate raise the priority of the queued request
+                    if existing.state == "queued" and request.priority < existing.priority:
+                        self.pending.remove(existing)
+                        existing.priority = request.priority
+                        self._insert(existing)
+                        self._changed()
+                    return False
+
+            self._insert(request)
+            self._changed()
+            return True
+
+    def _insert(self, request):
+        """Insert a request after every queued request of equal or higher priority"""
+        index = len(self.pending)
+        for i, queued in enumerate(self.pending):
+            if queued.priority > request.priority:
+                index = i
+                break
+        self.pending.insert(index, request)
+
+    def position(self, request_id):
+        """Return the 1-based queue position of a request, or None"""
+        with self._cond:
+            for i, request in enumerate(self.pending):
+                if request.id == request_id:
+                    return i + 1
+        return None
+
+    def move(self, request_id, offset):
+        """Move a queued request up (negative offset) or down the queue"""
+        with self._cond:
+            for i, request in enumerate(self.pending):
+                if request.id == request_id:
+                    new_index = max(0, min(len(self.pending) - 1, i + offset))
+                    if new_index != i:
+                        self.pending.insert(new_index, self.pending.pop(i))
+                        self._changed()
+                    return True
+        return False
+
+    def set_priority(self, request_id, priority):
+        """Change the priority of a queued request and re-sort it"""
+        with self._cond:
+            for request in self.pending:
+                if request.id == request_id:
+                    self.pending.remove(request)
+                    request.priority = priority
+                    self._insert(request)
+                    self._changed()
+                    return True
+        return False
+
+    def cancel(self, request_id):
+        """Remove a request that has not started yet"""
+        with self._cond:
+            for request in self.pending:
+                if request.id == request_id:
+                    self.pending.remove(request)
+                    request.state = "cancelled"
+                    self._changed()
+                    return True
+        return False
+
+    def snapshot(self):
+        """Return a list of dicts describing running and queued requests"""
+        with self._cond:
+            rows = []
+            for request in list(self.running.values()) + self.pending:
+                rows.append({
+                    "id": request.id,
+                    "server": request.server,
+                    "expansion": request.expansion,
+                    "account": request.display_name,
+                    "priority": PRIORITY_NAMES.get(request.priority, str(request.priority)),
+                    "state": request.state
+                })
+            return rows
+
+    def is_idle(self):
+        """True when nothing is queued or launching"""
+        with self._cond:
+            return not self.pending and not self.running
+
+    def wait_idle(self, timeout=None):
+        """Block until the queue is idle; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self.pending or self.running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self):
+        """Stop dispatching; queued requests are dropped"""
+        with self._cond:
+            self._stopped = True
+            self.pending = []
+            self._cond.notify_all()
+
+    def _changed(self):
+        """Bump the version counter and wake the dispatcher (lock must be held)"""
+        self.version += 1
+        self._cond.notify_all()
+
+    def _running_count(self, server):
+        """Return the number of launches in progress for a server"""
+        return sum(1 for request in self.running.values() if request.server == server)
+
+    def _next_ready(self):
+        """
+        Find the first queued request allowed to start (lock must be held)
+
+        Returns:
+            (request, wait) where wait is the number of seconds until a throttled
+            request may become ready, or None to wait for the next change
+        """
+        wait = None
+        if self.max_total and len(self.running) >= self.max_total:
+            return None, None
+
+        blocked_servers = set()
+        for request in self.pending:
+            if request.server in blocked_servers:
+                continue
+
+            limits = self.get_limits(request.server)
+            if self._running_count(request.server) >= limits["max_concurrent"]:
+                # Will be woken up by a completion
+                blocked_servers.add(request.server)
+                continue
+
+            bucket = self.buckets.get(request.server)
+            if bucket is None:
+                bucket = TokenBucket(limits["rate_per_minute"], limits["burst"])
+                self.buckets[request.server] = bucket
+            else:
+                bucket.configure(limits["rate_per_minute"], limits["burst"])
+
+            delay = bucket.delay()
+            if delay > 0:
+                blocked_servers.add(request.server)
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            # Host-wide resources: when the first ready request does not fit,
+            # none behind it does either, so the queue holds them all
+            verdict, reason = self._admit(request)
+            if verdict == "wait":
+                return None, ADMISSION_RETRY if wait is None else min(wait, ADMISSION_RETRY)
+            if verdict == "refuse":
+                self.pending.remove(request)
+                request.state = "refused"
+                self._changed()
+                return None, 0
+
+            bucket.consume()
+            return request, None
+
+        return None, wait
+
+    def _admit(self, request):
+        """Ask admission control about a request and track its hold state (lock must be held)"""
+        if self.admission_callback is None:
+            return "admit", None
+        try:
+            verdict, reason = self.admission_callback(request)
+        except Exception as e:
+            print(f"Admission check failed: {str(e)}")
+            return "admit", None
+
+        if verdict == "admit":
+            if request.state == "held":
+                request.state = "queued"
+                request.hold_reason = None
+                self.hold_reason = None
+                self._changed()
+            return verdict, None
+
+        if verdict == "refuse":
+            reason = f"Refused launch of '{request.display_name}': {reason}"
+        elif request.state != "held":
+            request.state = "held"
+        if reason != request.hold_reason:
+            request.hold_reason = reason
+            self.hold_reason = reason
+            self._changed()
+            self.update_status(reason)
+        return verdict, reason
+
+    def _dispatch_loop(self):
+        """Thread function that starts queued launches as limits allow"""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                request, wait = self._next_ready()
+                if request is None:
+                    self._cond.wait(wait)
+                    continue
+
+                self.pending.remove(request)
+                request.state = "launching"
+                request.started_at = time.monotonic()
+                self.running[request.id] = request
+                self._changed()
+
+            self.update_status(f"Launching '{request.display_name}' from queue...")
+            try:
+                started = request.launch_fn(
+                    lambda success, r=request: self._complete(r, success)
+                )
+            except Exception as e:
+                print(f"Queued launch failed: {str(e)}")
+                started = False
+
+            if not started:
+                self._complete(request, False)
+
+    def _complete(self, request, success):
+        """Record that a launch finished and free its concurrency slot"""
+        with self._cond:
+            if self.running.pop(request.id, None) is None:
+                return
+            request.state = "done" if success else "failed"
+            self._changed()
+
+class LaunchQueueDialog:
+    """Window showing the launch queue, allowing requests to be reordered"""
+
+    REFRESH_MS = 500
+
+    def __init__(self, parent, launch_queue):
+        """
+        Initialize the queue window
+
+        Args:
+            parent: The parent window/widget
+            launch_queue: The LaunchQueue to display
+        """
+        self.parent = parent
+        self.launch_queue = launch_queue
+        self.shown_version = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Launch Queue")
+        self.dialog.geometry("560x360")
+        self.dialog.transient(parent)
+        self.dialog.configure(bg=WOW_COLORS["bg_dark"])
+
+        main_frame = ttk.Frame(self.dialog, style="WoW.TFrame", padding=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        ttk.Label(main_frame, text="Launch Queue", style="Title.TLabel").grid(
+            row=0, column=0, columnspan=2, pady=(0, 10), sticky=tk.W
+        )
+
+        # Treeview listing running and queued launches
+        self.queue_tree = ttk.Treeview(
+            main_frame,
+            columns=("account", "server", "priority", "state"),
+            show="headings",
+            selectmode="browse"
+        )
+        self.queue_tree.heading("account", text="Account")
+        self.queue_tree.heading("server", text="Server / Expansion")
+        self.queue_tree.heading("priority", text="Priority")
+        self.queue_tree.heading("state", text="State")
+        self.queue_tree.column("account", width=140)
+        self.queue_tree.column("server", width=180)
+        self.queue_tree.column("priority", width=70)
+        self.queue_tree.column("state", width=80)
+        self.queue_tree.grid(row=1, column=0, sticky=tk.NSEW)
+
+        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.queue_tree.yview)
+        self.queue_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.grid(row=1, column=1, sticky=tk.NS)
+
+        # Queue action buttons
+        button_frame = ttk.Frame(main_frame, style="WoW.TFrame")
+        button_frame.grid(row=2, column=0, columnspan=2, pady=(10, 0), sticky=tk.EW)
+        for column in range(5):
+            button_frame.columnconfigure(column, weight=1)
+
+        ttk.Button(button_frame, text="Move Up", command=lambda: self.move_selected(-1)).grid(
+            row=0, column=0, padx=3, sticky=tk.EW
+        )
+        ttk.Button(button_frame, text="Move Down", command=lambda: self.move_selected(1)).grid(
+            row=0, column=1, padx=3, sticky=tk.EW
+        )
+        ttk.Button(button_frame, text="High Priority",
+                   command=lambda: self.prioritize_selected(PRIORITY_HIGH)).grid(
+            row=0, column=2, padx=3, sticky=tk.EW
+        )
+        ttk.Button(button_frame, text="Cancel Launch", command=self.cancel_selected).grid(
+            row=0, column=3, padx=3, sticky=tk.EW
+        )
+        ttk.Button(button_frame, text="Close", style="Gold.TButton", command=self.dialog.destroy).grid(
+            row=0, column=4, padx=3, sticky=tk.EW
+        )
+
+        self.refresh_job = None
+        self.dialog.bind("<Destroy>", self.on_destroy)
+        self.refresh()
+
+    def on_destroy(self, event):
+        """Stop refreshing once the window is gone"""
+        if event.widget is self.dialog and self.refresh_job:
+            self.dialog.after_cancel(self.refresh_job)
+            self.refresh_job = None
+
+    def selected_id(self):
+        """Return the request id of the selected row, or None"""
+        selection = self.queue_tree.selection()
+        if selection:
+            return int(selection[0])
+        return None
+
+    def move_selected(self, offset):
+        """Move the selected request up or down"""
+        request_id = self.selected_id()
+        if request_id is not None and not self.launch_queue.move(request_id, offset):
+            messagebox.showinfo("Launch Queue", "Only queued launches can be reordered.", parent=self.dialog)
+        self.refresh(reschedule=False)
+
+    def prioritize_selected(self, priority):
+        """Change the priority of the selected request"""
+        request_id = self.selected_id()
+        if request_id is not None:
+            self.launch_queue.set_priority(request_id, priority)
+        self.refresh(reschedule=False)
+
+    def cancel_selected(self):
+        """Cancel the selected request"""
+        request_id = self.selected_id()
+        if request_id is not None and not self.launch_queue.cancel(request_id):
+            messagebox.showinfo("Launch Queue", "This launch has already started.", parent=self.dialog)
+        self.refresh(reschedule=False)
+
+    def refresh(self, reschedule=True):
+        """Redraw the queue if it changed since the last refresh"""
+        if not self.dialog.winfo_exists():
+            return
+
+        if self.launch_queue.version != self.shown_version:
+            self.shown_version = self.launch_queue.version
+            selected = self.queue_tree.selection()
+
+            self.queue_tree.delete(*self.queue_tree.get_children())
+            for row in self.launch_queue.snapshot():
+                self.queue_tree.insert(
+                    "", "end", iid=str(row["id"]),
+                    values=(row["account"], f"{row['server']} - {row['expansion']}", row["priority"], row["state"])
+                )
+
+            if selected and self.queue_tree.exists(selected[0]):
+                self.queue_tree.selection_set(selected[0])
+
+        if reschedule:
+            self.refresh_job = self.dialog.after(self.REFRESH_MS, self.refresh)
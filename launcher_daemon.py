@@ -0,0 +1,420 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import socketserver
+
+from config_utils import ConfigManager
+from performance_profiles import launch_settings, placement_policy
+
+class AccountIndex:
+    """In-memory index of one expansion's accounts, reloaded when its file changes"""
+
+    def __init__(self, config_manager, server, expansion, expansion_data):
+        self.config_manager = config_manager
+        self.server = server
+        self.expansion = expansion
+        self.expansion_data = expansion_data
+        self.accounts_file = config_manager.get_accounts_file(server, expansion, expansion_data)
+        self.coords_file = config_manager.get_coords_file(server, expansion, expansion_data)
+        self.accounts = []
+        self.by_name = {}
+        self.coords = None
+        self.mtimes = None
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Reload accounts and coordinates if either file changed on disk"""
+        mtimes = (self._mtime(self.accounts_file), self._mtime(self.coords_file))
+        if mtimes == self.mtimes:
+            return
+        self.mtimes = mtimes
+
+        self.accounts = self.config_manager.load_accounts(self.accounts_file).get("accounts", [])
+        self.coords = self.config_manager.load_coordinates(self.coords_file)
+
+        # Usernames take precedence over aliases, like in the account manager
+        self.by_name = {}
+        for account in self.accounts:
+            if account.get("alias"):
+                self.by_name.setdefault(account["alias"], account)
+        for account in self.accounts:
+            self.by_name[account.get("username", "")] = account
+
+    def find(self, name):
+        """Return the account with this username or alias, or None"""
+        self.refresh()
+        return self.by_name.get(name)
+
+class LauncherDaemon:
+    """Long-running launcher keeping configuration and the launch engine in memory"""
+
+    def __init__(self, socket_path=None):
+        """
+        Initialize the daemon
+
+        Args:
+            socket_path: Unix socket to listen on (defaults to the "daemon_socket"
+                         setting in app_config.json)
+        """
+        # Imported here so the client half of this module stays lightweight
+        from login_automation import LoginAutomation
+        from cpu_placement import placement_engine
+        from launch_queue import LaunchQueue
+        from launch_metrics import LaunchMetrics
+        from process_supervisor import ProcessSupervisor
+        from warm_pool import WarmPoolManager
+        from memory_admission import MemoryAdmission
+        from page_cache import prewarmer
+
+        self.config_manager = ConfigManager(interactive=False)
+        self.config_manager.load_global_config()
+        self.socket_path = socket_path or self.config_manager.global_config.get("daemon_socket", "launcher.sock")
+
+        self.LoginAutomation = LoginAutomation
+        placement_engine.configure(self.config_manager.global_config.get("cpu_placement"))
+        prewarmer.configure(self.config_manager.global_config.get("page_cache_prewarm"))
+        self.prewarmer = prewarmer
+        self.supervisor = ProcessSupervisor(self.log)
+        self.metrics = LaunchMetrics()
+        self.warm_pools = WarmPoolManager(self.supervisor, self.log)
+        self.memory_admission = MemoryAdmission(
+            self.supervisor, self.config_manager.global_config.get("memory_admission")
+        )
+        self.launch_queue = LaunchQueue(
+            self.config_manager.get_launch_limits, self.log,
+            admission_callback=self.memory_admission.check
+        )
+
+        self.lock = threading.Lock()
+        self.servers = {}
+        self.indexes = {}
+        self.reload()
+
+        self.server = None
+
+    def log(self, message):
+        """Write a daemon log line to stderr"""
+        print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr)
+
+    def reload(self):
+        """Re-read the server configuration and rebuild the account indexes"""
+        with self.lock:
+            self.servers = self.config_manager.load_servers()
+            self.indexes = {}
+            for server_name, server_data in self.servers.items():
+                for expansion_name, expansion_data in server_data.get("expansions", {}).items():
+                    index = AccountIndex(self.config_manager, server_name, expansion_name, expansion_data)
+                    index.refresh()
+                    self.indexes[(server_name, expansion_name)] = index
+                    self.warm_pools.configure(
+                        server_name, expansion_name,
+                        expansion_data.get("path", ""), expansion_data.get("warm_pool")
+                    )
+
+    # Request handlers; each returns a response dict or yields progress events
+
+    def handle_list(self, request):
+        servers = []
+        with self.lock:
+            for server_name, server_data in self.servers.items():
+                expansions = []
+                for expansion_name in server_data.get("expansions", {}):
+                    index = self.indexes[(server_name, expansion_name)]
+                    index.refresh()
+                    expansions.append({
+                        "name": expansion_name,
+                        "path": index.expansion_data.get("path", ""),
+                        "accounts": [
+                            {"username": a.get("username", ""), "alias": a.get("alias", "")}
+                            for a in index.accounts
+                        ]
+                    })
+                servers.append({"name": server_name, "expansions": expansions})
+        return {"ok": True, "servers": servers}
+
+    def handle_status(self, request):
+        return {
+            "ok": True,
+            "queue": self.launch_queue.snapshot(),
+            "clients": self.supervisor.snapshot(),
+            "warm_pools": self.warm_pools.snapshot()
+        }
+
+    def handle_cancel(self, request):
+        return {"ok": self.launch_queue.cancel(int(request.get("id", 0)))}
+
+    def handle_reload(self, request):
+        self.reload()
+        return {"ok": True}
+
+    def handle_terminate(self, request):
+        key = tuple(request["key"]) if request.get("key") else None
+        group = tuple(request["group"]) if request.get("group") else None
+        self.supervisor.terminate_async(key=key, group=group, pid=request.get("pid"))
+        return {"ok": True}
+
+    def handle_shutdown(self, request):
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+        return {"ok": True}
+
+    def handle_launch(self, request):
+        """Queue a launch and yield progress events until it finishes"""
+        from launch_queue import LaunchRequest, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+        server = request.get("server", "")
+        expansion = request.get("expansion", "")
+        name = request.get("account", "")
+
+        with self.lock:
+            index = self.indexes.get((server, expansion))
+        if index is None:
+            yield {"ok": False, "event": "finished", "error": "Unknown server or expansion"}
+            return
+
+        account = index.find(name)
+        if account is None:
+            yield {"ok": False, "event": "finished", "error": "Account not found"}
+            return
+        account = dict(account, server=server, expansion=expansion)
+        game_path = index.expansion_data.get("path", "")
+        if not game_path or not os.path.exists(game_path):
+            yield {"ok": False, "event": "finished", "error": f"Game executable not found: {game_path}"}
+            return
+
+        # Progress from the login thread is handed to this connection through a queue
+        events = []
+        cond = threading.Condition()
+
+        def push(event):
+            with cond:
+                events.append(event)
+                cond.notify()
+
+        login_automation = self.LoginAutomation(
+            None,
+            lambda message: push({"event": "status", "message": message}),
+            self.supervisor,
+            self.metrics,
+            self.warm_pools,
+            input_mode=self.config_manager.global_config.get("input_mode"),
+            launch_queue=self.launch_queue
+        )
+
+        def launch_fn(on_complete):
+            def done(success):
+                try:
+                    key = login_automation.client_key(account)
+                    push({"event": "finished", "ok": success, "pid": self.supervisor.get_pid(key)})
+                finally:
+                    on_complete(success)
+            return login_automation.launch_game(game_path, account, index.coords, done,
+                                                config_wtf=index.expansion_data.get("config_wtf"),
+                                                profile=launch_settings(index.expansion_data, account),
+                                                placement=placement_policy(index.expansion_data, account))
+
+        priorities = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+        launch_request = LaunchRequest(
+            server, expansion, account.get("username", ""), name,
+            launch_fn,
+            priorities.get(str(request.get("priority", "normal")).lower(), PRIORITY_NORMAL)
+        )
+
+        if not self.launch_queue.submit(launch_request):
+            yield {"ok": False, "event": "finished", "error": "Account is already queued or launching"}
+            return
+        self.prewarmer.prewarm(game_path)
+        yield {
+            "ok": True,
+            "event": "queued",
+            "id": launch_request.id,
+            "position": self.launch_queue.position(launch_request.id)
+        }
+        if not request.get("stream", True):
+            return
+
+        shown_reason = None
+        while True:
+            event = None
+            with cond:
+                while not events and event is None:
+                    # Wake up periodically to notice cancellation and admission holds
+                    cond.wait(1.0)
+                    if events:
+                        break
+                    if launch_request.state == "cancelled":
+                        event = {"ok": False, "event": "finished", "error": "Cancelled"}
+                    elif launch_request.state == "refused":
+                        event = {"ok": False, "event": "finished", "error": launch_request.hold_reason}
+                    elif launch_request.state in ("failed", "done"):
+                        # The launch ended without reporting through done() (e.g. the
+                        # executable vanished or launch_game raised)
+                        event = {"ok": launch_request.state == "done", "event": "finished"}
+                        if launch_request.state == "failed":
+                            event["error"] = "Launch failed"
+                    elif launch_request.hold_reason != shown_reason:
+                        shown_reason = launch_request.hold_reason
+                        if shown_reason:
+                            event = {"event": "status", "message": shown_reason}
+                if event is None:
+                    event = events.pop(0)
+            # Sent with the lock released, so a slow reader never blocks the login thread's push()
+            yield event
+            if event["event"] == "finished":
+                return
+
+    def dispatch(self, request):
+        """Route a request to its handler, always producing an iterable of responses"""
+        handler = getattr(self, f"handle_{request.get('cmd', '')}", None)
+        if handler is None:
+            return [{"ok": False, "error": f"Unknown command: {request.get('cmd')}"}]
+        result = handler(request)
+        return [result] if isinstance(result, dict) else result
+
+    def serve_forever(self):
+        """Listen on the Unix socket until a shutdown request arrives"""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                # One JSON request per line; responses are streamed back as JSON lines
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        responses = daemon.dispatch(request)
+                        for response in responses:
+                            self.wfile.write(json.dumps(response).encode() + b"\n")
+                            self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+                    except Exception as e:
+                        self.wfile.write(json.dumps({"ok": False, "error": str(e)}).encode() + b"\n")
+                        self.wfile.flush()
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        if os.path.exists(self.socket_path):
+            if LauncherClient(self.socket_path).is_running():
+                raise RuntimeError(f"A launcher daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        # Only the current user may talk to the daemon
+        old_umask = os.umask(0o077)
+        try:
+            self.server = Server(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+
+        self.log(f"Launcher daemon listening on {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+class LauncherClient:
+    """Client for the launcher daemon's Unix socket API"""
+
+    def __init__(self, socket_path="launcher.sock", timeout=5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def is_running(self):
+        """True if a daemon accepts connections on the socket"""
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(self.socket_path):
+            return False
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+
+    def stream(self, request, timeout=None):
+        """Send a request and yield every response line until the exchange ends"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                for line in f:
+                    response = json.loads(line)
+                    yield response
+                    # A launch ends with a "finished" event (or "queued" when not streaming)
+                    if request.get("cmd") != "launch" or response.get("event") == "finished" \
+                            or not response.get("ok", True) \
+                            or (response.get("event") == "queued" and not request.get("stream", True)):
+                        return
+
+    def request(self, request):
+        """Send a request and return its single response"""
+        for response in self.stream(request, self.timeout):
+            return response
+        return {"ok": False, "error": "No response from daemon"}
+
+class RemoteSupervisor:
+    """Mirrors the daemon's client states so attached UIs can show them"""
+
+    def __init__(self, client, interval=1.0):
+        """
+        Initialize the mirror
+
+        Args:
+            client: LauncherClient connected to the daemon
+            interval: Seconds between status polls
+        """
+        self.client = client
+        self.interval = interval
+        self.clients = []
+        self.version = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+
+    def _poll_loop(self):
+        """Thread function fetching the daemon's client list"""
+        while not self._stop.is_set():
+            try:
+                clients = self.client.request({"cmd": "status"}).get("clients", [])
+                for client in clients:
+                    client["key"] = tuple(client["key"]) if isinstance(client["key"], list) else client["key"]
+                    client["group"] = tuple(client["group"]) if isinstance(client["group"], list) else client["group"]
+                if clients != self.clients:
+                    self.clients = clients
+                    self.version += 1
+            except (OSError, ValueError):
+                pass
+            self._stop.wait(self.interval)
+
+    def snapshot(self):
+        return list(self.clients)
+
+    def get_state(self, key):
+        """Return the state of the newest client for a key, or an empty string"""
+        matches = [c for c in self.clients if c["key"] == key]
+        return matches[-1]["state"] if matches else ""
+
+    def terminate_async(self, key=None, group=None, pid=None, grace_period=10.0):
+        """Ask the daemon to terminate clients"""
+        threading.Thread(
+            target=self.client.request,
+            args=({"cmd": "terminate", "key": key, "group": group, "pid": pid},),
+            daemon=True
+        ).start()
@@ -1,34 +1,93 @@
 import os
 import time
-import subprocess
-import threading
+import asyncio
+import contextlib
+import concurrent.futures
 import pyautogui
 import tkinter as tk
 from tkinter import messagebox, ttk
 from ui_components import WOW_COLORS
+from process_supervisor import ProcessSupervisor
+from launch_metrics import LaunchMetrics
+from launch_queue import LaunchRequest, PRIORITY_HIGH
+from async_engine import get_engine
+from profiling import profiled
+from window_input import X11WindowInput
+from wtf_config import wtf_manager
+from cpu_placement import placement_engine
+from window_geometry import (
+    geometry_cache, has_relative_coords, resolve_login_coords, window_under_cursor, pointer_button_down
+)
 
 class LoginAutomation:
     """Handles the automation of logging into WoW private servers"""
     
-    def __init__(self, parent, status_callback=None):
+    # Settle delay: seconds after pressing Enter the client has to stay alive
+    # for the login to count as successful (a fixed wait, not a timed phase)
+    confirm_delay = 5.0
+    
+    # Most seconds a cold-started client may take to open its window; without
+    # a way to look windows up (no xdotool) the full time is waited
+    startup_wait = 8
+    
+    # Seconds between looks for the client's window while it starts
+    window_poll_interval = 0.25
+    
+    def __init__(self, parent, status_callback=None, supervisor=None, metrics=None, warm_pools=None, engine=None,
+                 input_mode="global", launch_queue=None):
         """
         Initialize login automation
         
         Args:
-            parent: The parent window/widget
+            parent: The parent window/widget (None for headless use without message boxes)
             status_callback: Function to call to update status messages
+            supervisor: ProcessSupervisor owning the launched clients
+            metrics: LaunchMetrics store receiving per-phase login timings
+            warm_pools: Optional WarmPoolManager providing pre-launched clients
+            engine: AsyncLaunchEngine running the logins (defaults to the shared engine)
+            input_mode: "global" to type through the focused window with pyautogui, one
+                        client at a time, or "window" to send keys to each client's own
+                        window in parallel where supported (falls back to "global")
+            launch_queue: LaunchQueue that default crash restarts are submitted to, so
+                          they keep to the admission check and rate limits
         """
         self.parent = parent
         self.status_callback = status_callback
+        self.supervisor = supervisor or ProcessSupervisor(status_callback)
+        self.metrics = metrics or LaunchMetrics()
+        self.warm_pools = warm_pools
+        self.engine = engine or get_engine()
+        self.window_cache = geometry_cache
+        self.input_mode = input_mode or "global"
+        self.launch_queue = launch_queue
+        self.futures = set()
         self.process = None
-        self.login_thread = None
+        self.login_future = None
     
     def update_status(self, message):
         """Update status message via callback if available"""
         if self.status_callback:
             self.status_callback(message)
     
-    def launch_game(self, game_path, account_data, login_coords):
+    def show_message(self, kind, title, message):
+        """Show a message box, or only a status update when running headless"""
+        if self.parent is None:
+            self.update_status(f"{title}: {message}")
+        else:
+            # Message boxes must be shown from the Tk thread, never from the engine loop
+            self.parent.after(0, lambda: getattr(messagebox, kind)(title, message))
+    
+    @staticmethod
+    def client_key(account_data):
+        """Return the supervisor key for an account: (server, expansion, username)"""
+        return (
+            account_data.get("server", ""),
+            account_data.get("expansion", ""),
+            account_data.get("username", "")
+        )
+    
+    def launch_game(self, game_path, account_data, login_coords, on_complete=None, restart_fn=None,
+                    config_wtf=None, profile=None, placement=None):
         """
         Launch the game and attempt to log in
         
@@ -36,78 +95,253 @@ class LoginAutomation:
             game_path: Path to the game executable
             account_data: Dictionary with username and password
             login_coords: Dictionary with screen coordinates for login fields
+            on_complete: Optional function called with True/False when the login attempt ends
+            restart_fn: Optional function the supervisor calls to relaunch a crashed client
+                        (defaults to queueing the same launch again, see restart_launch)
+            config_wtf: Optional Config.wtf settings of the expansion ("enabled",
+                        "realmlist", "realm_name", "settings"); when enabled the
+                        account name is written there so it need not be typed
+            profile: Optional Config.wtf CVars of the account's performance profile
+                     (see performance_profiles.launch_settings); like the account
+                     name they only reach clients started cold, not pooled ones
+            placement: Optional CPU placement policy of the account's profile
+                       (see performance_profiles.placement_policy)
         """
         # Check if executable exists
         if not os.path.exists(game_path):
-            messagebox.showerror("Error", f"Game executable not found at: {game_path}")
+            self.show_message("showerror", "Error", f"Game executable not found at: {game_path}")
             return False
         
-        # Start a new thread for game launching and login
-        self.login_thread = threading.Thread(
-            target=self._login_thread,
-            args=(game_path, account_data, login_coords),
-            daemon=True
+        # Run the launch and login as a coroutine on the engine's event loop
+        self.login_future = self.engine.submit(
+            self._login_task(game_path, account_data, login_coords, on_complete, restart_fn, config_wtf,
+                             profile, placement)
         )
-        self.login_thread.start()
+        self.futures.add(self.login_future)
+        self.login_future.add_done_callback(self.futures.discard)
+        return True
+    
+    def restart_launch(self, game_path, account_data, login_coords, config_wtf=None, profile=None,
+                       placement=None):
+        """
+        Relaunch a crashed client with the same arguments
+
+        With a launch queue the restart is queued at high priority like any
+        other launch, so it waits for admission and the server's rate limits;
+        without one it is launched directly.
+        """
+        def launch_fn(on_complete=None):
+            return self.launch_game(game_path, account_data, login_coords, on_complete,
+                                    config_wtf=config_wtf, profile=profile, placement=placement)
+        
+        if self.launch_queue is None:
+            return launch_fn()
+        server, expansion, username = self.client_key(account_data)
+        self.launch_queue.submit(LaunchRequest(
+            server, expansion, username, account_data.get("alias") or username, launch_fn, PRIORITY_HIGH
+        ))
         return True
     
-    def _login_thread(self, game_path, account_data, login_coords):
-        """Thread function that handles the game launch and login process"""
+    def cancel(self):
+        """Cancel every login started by this instance that is still in progress"""
+        for future in list(self.futures):
+            future.cancel()
+    
+    async def _wait_for_login_screen(self, process, wait):
+        """
+        Wait for the client's window to appear, failing early if it exits
+
+        The window is looked up through the shared geometry cache (off the
+        event loop, since lookups may shell out to xdotool) and the wait ends
+        as soon as it is mapped; wait is only the upper bound.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("Game client exited before reaching the login screen")
+            geometry = await loop.run_in_executor(None, self.window_cache.get, process.pid)
+            if geometry is not None:
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(self.window_poll_interval, remaining))
+    
+    async def _resolve_coords(self, process, login_coords):
+        """Resolve window-relative login coordinates against the client's own window"""
+        if not has_relative_coords(login_coords):
+            return login_coords
+        
+        # Window lookups may shell out (xdotool), so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        geometry = await loop.run_in_executor(None, self.window_cache.get, process.pid)
+        return resolve_login_coords(login_coords, geometry)
+    
+    async def _enter_field(self, x, y, text):
+        """Click a login field, clear it and type text into it"""
+        run_input = self.engine.run_input
+        
+        # Enter the field - try multiple times with different approaches
+        for _ in range(3):
+            await run_input(pyautogui.click, x=x, y=y)
+            await asyncio.sleep(0.3)
+            await run_input(pyautogui.hotkey, 'ctrl', 'a')  # Select all
+            await asyncio.sleep(0.1)
+            await run_input(pyautogui.press, 'delete')      # Clear the field
+            await asyncio.sleep(0.1)
+        
+        # Type slowly
+        for char in text:
+            await run_input(pyautogui.typewrite, char)
+            await asyncio.sleep(0.05)
+    
+    async def _window_injector(self, process):
+        """Return an injector for the client's own window, or None to use global input"""
+        if self.input_mode != "window" or not X11WindowInput.available():
+            return None
+        loop = asyncio.get_running_loop()
+        geometry = await loop.run_in_executor(None, self.window_cache.get, process.pid)
+        return X11WindowInput(geometry.window_id) if geometry is not None else None
+    
+    async def _enter_credentials_global(self, process, login_coords, account_data, timer, prefilled=False):
+        """Click and type the credentials through the focused window with pyautogui"""
+        # Input goes through the global focus, so only one client
+        # at a time may have its credentials entered
+        async with self.engine.input_lock:
+            # Time spent behind other clients' logins shows up as its own phase
+            timer.mark("input_wait")
+            
+            # Positions are resolved against this client's window right
+            # before typing, so moved or differently placed clients work
+            coords = await self._resolve_coords(process, login_coords)
+            
+            # A username pre-filled through Config.wtf is already in place
+            if not prefilled:
+                await self._enter_field(coords["username_x"], coords["username_y"],
+                                        account_data["username"])
+                timer.mark("username_entered")
+                
+                await asyncio.sleep(0.5)
+            else:
+                timer.mark("username_entered")
+            
+            await self._enter_field(coords["password_x"], coords["password_y"],
+                                    account_data["password"])
+            timer.mark("password_entered")
+            
+            await asyncio.sleep(0.5)
+            
+            # Press Enter instead of clicking the login button
+            await self.engine.run_input(pyautogui.press, 'enter')
+            timer.mark("submitted")
+    
+    async def _enter_credentials_window(self, injector, account_data, timer, prefilled=False):
+        """Type the credentials into the client's own window without taking focus"""
+        # No shared lock: each client gets its keys directly, so logins run in parallel
+        # The login screen starts in the username field and Tab moves to the
+        # password; with a remembered account name it starts in the password
+        if not prefilled:
+            await injector.clear_field()
+            await injector.type_text(account_data["username"])
+            timer.mark("username_entered")
+            await injector.key("Tab")
+        else:
+            timer.mark("username_entered")
+        
+        await injector.clear_field()
+        await injector.type_text(account_data["password"])
+        timer.mark("password_entered")
+        
+        await injector.key("Return")
+        timer.mark("submitted")
+    
+    @staticmethod
+    def config_wtf_values(account_data, config_wtf):
+        """Return the account Config.wtf keys to write before a launch, or None if there are none"""
+        values = {}
+        if config_wtf and config_wtf.get("enabled"):
+            values["accountName"] = account_data["username"]
+            if config_wtf.get("realmlist"):
+                values["realmList"] = config_wtf["realmlist"]
+            if config_wtf.get("realm_name"):
+                values["realmName"] = config_wtf["realm_name"]
+            values.update(config_wtf.get("settings", {}))
+        return values or None
+    
+    @profiled("login")
+    async def _login_task(self, game_path, account_data, login_coords, on_complete=None, restart_fn=None,
+                          config_wtf=None, profile=None, placement=None):
+        """Coroutine that handles the game launch and login process"""
+        success = False
+        key = self.client_key(account_data)
+        timer = self.metrics.start(*key)
+        process = None
         try:
-            self.update_status("Launching game client...")
+            restart_fn = restart_fn or (
+                lambda: self.restart_launch(game_path, account_data, login_coords, config_wtf, profile, placement)
+            )
             
-            # Launch the game
-            self.process = subprocess.Popen(game_path)
+            # Use a client already parked at the login screen if the pool has one
+            wait = self.startup_wait
+            if self.warm_pools:
+                process, ready_in = self.warm_pools.acquire(key[0], key[1], game_path)
+                if process is not None:
+                    self.update_status("Using pre-launched game client...")
+                    self.supervisor.assign(process.pid, key, group=key[:2], restart_fn=restart_fn)
+                    wait = ready_in
             
-            # Wait for login screen
-            self.update_status("Waiting for login screen...")
-            time.sleep(8)  # Initial wait for the game to start
+            # Only a cold start reads Config.wtf, so pooled clients still get the
+            # username typed. Launches without a profile still patch when an
+            # earlier profile changed CVars of the install, to restore them
+            wtf_values = self.config_wtf_values(account_data, config_wtf) if process is None else None
+            patch_wtf = process is None and bool(wtf_values or profile or wtf_manager.has_baseline(game_path))
+            prefilled = False
+            
+            # The install stays locked from patching Config.wtf until the client
+            # has read it at its login screen, so simultaneous launches of the
+            # same install cannot pick up each other's account name or profile
+            install_lock = wtf_manager.launch_lock(game_path) if patch_wtf else contextlib.nullcontext()
+            async with install_lock:
+                if patch_wtf:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, wtf_manager.patch_launch, game_path, wtf_values or {}, profile or {})
+                    prefilled = "accountName" in (wtf_values or {})
+                
+                if process is None:
+                    self.update_status("Launching game client...")
+                    
+                    # Launch the game under the supervisor so exits and crashes are tracked
+                    process = await self.engine.spawn(game_path, self.supervisor, key, key[:2], restart_fn)
+                self.process = process
+                timer.mark("spawn")
+                
+                # Pin the client to its cores before it starts loading
+                if placement:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, placement_engine.place, process.pid, key, placement)
+                
+                # Wait for login screen
+                self.update_status("Waiting for login screen...")
+                await self._wait_for_login_screen(process, wait)
+                timer.mark("window_ready")
             
             # Try to find login fields
             max_attempts = 40
             attempt = 0
-            success = False
             
             while attempt < max_attempts and not success:
                 try:
                     # Take a short pause
-                    time.sleep(0.5)
+                    await asyncio.sleep(0.5)
                     self.update_status(f"Attempting to log in... ({attempt+1}/{max_attempts})")
                     
-                    # Enter username - try multiple times with different approaches
-                    for _ in range(3):
-                        pyautogui.click(x=login_coords["username_x"], y=login_coords["username_y"])
-                        time.sleep(0.3)
-                        pyautogui.hotkey('ctrl', 'a')  # Select all
-                        time.sleep(0.1)
-                        pyautogui.press('delete')      # Clear the field
-                        time.sleep(0.1)
-                        
-                    # Type username slowly
-                    for char in account_data["username"]:
-                        pyautogui.typewrite(char)
-                        time.sleep(0.05)
-                    
-                    time.sleep(0.5)
-                    
-                    # Enter password - try multiple times with different approaches
-                    for _ in range(3):
-                        pyautogui.click(x=login_coords["password_x"], y=login_coords["password_y"])
-                        time.sleep(0.3)
-                        pyautogui.hotkey('ctrl', 'a')  # Select all
-                        time.sleep(0.1)
-                        pyautogui.press('delete')      # Clear the field
-                        time.sleep(0.1)
-                    
-                    # Type password slowly
-                    for char in account_data["password"]:
-                        pyautogui.typewrite(char)
-                        time.sleep(0.05)
-                    
-                    time.sleep(0.5)
-                    
-                    # Press Enter instead of clicking the login button
-                    pyautogui.press('enter')
+                    injector = await self._window_injector(process)
+                    if injector is not None:
+                        await self._enter_credentials_window(injector, account_data, timer, prefilled)
+                    else:
+                        await self._enter_credentials_global(process, login_coords, account_data, timer,
+                                                             prefilled)
                     
                     self.update_status(f"Logged in as {account_data['username']}")
                     success = True
@@ -115,32 +349,78 @@ class LoginAutomation:
                     
                 except Exception as e:
                     attempt += 1
-                    time.sleep(1)
+                    # The window may have moved; look it up again next time
+                    self.window_cache.invalidate(process.pid)
+                    await asyncio.sleep(1)
                     self.update_status(f"Waiting for login screen... {attempt}/{max_attempts}")
             
             if not success:
                 self.update_status("Failed to log in automatically.")
-                messagebox.showwarning(
+                self.show_message(
+                    "showwarning",
                     "Login Failed",
                     "Automated login failed. You may need to configure login screen coordinates."
                 )
             
+        except asyncio.CancelledError:
+            # A cancelled launch should not leave a half-started client behind
+            self.update_status("Launch cancelled")
+            if process is not None:
+                self.supervisor.terminate_async(pid=process.pid)
+            self.metrics.record(timer, False)
+            raise
         except Exception as e:
             self.update_status(f"ERROR: {str(e)}")
-            messagebox.showerror("Error", f"An error occurred during login: {str(e)}")
+            self.show_message("showerror", "Error", f"An error occurred during login: {str(e)}")
+        finally:
+            if on_complete:
+                on_complete(success)
+        
+        await self._finish_metrics(timer, process, success)
+        return success
+    
+    async def _finish_metrics(self, timer, process, success):
+        """
+        Record the login timings once the client survived a settle delay
+
+        The client gives no signal when the server accepts a login, so a login
+        counts as successful if the client is still running confirm_delay
+        seconds after the submit. That fixed wait is not recorded as a phase.
+        """
+        if success and process is not None:
+            await asyncio.sleep(self.confirm_delay)
+            success = process.poll() is None
+        self.metrics.record(timer, success)
+    
+    def flush_metrics(self, timeout=None):
+        """Wait for logins and their in-game confirmations so the timings are recorded"""
+        concurrent.futures.wait(list(self.futures), timeout)
     
     def terminate(self):
         """Terminate the game process if it's running"""
         if self.process:
             try:
-                self.process.terminate()
+                self.supervisor.terminate_async(pid=self.process.pid)
                 self.update_status("Game process terminated")
             except:
                 pass
+    
+    def terminate_all(self, group=None):
+        """Gracefully terminate every supervised client, or only those in a group"""
+        self.supervisor.terminate_async(group=group)
 
 class CoordinatesTool:
     """Tool to help configure login screen coordinates in WoW style"""
     
+    # Cursor polling interval in milliseconds (about the display refresh rate)
+    poll_interval_ms = 16
+    
+    # Seconds the cursor has to rest on a field for it to be captured
+    dwell_time = 1.0
+    
+    # Seconds after which an unfinished capture is cancelled
+    capture_timeout = 30.0
+    
     def __init__(self, parent, coords_file, save_callback=None):
         """
         Initialize coordinate tool
@@ -156,6 +436,8 @@ class CoordinatesTool:
         self.parent = parent
         self.coords_file = coords_file
         self.save_callback = save_callback
+        self.capture = None
+        self.test_job = None
         
         # Create the dialog window in WoW style
         self.dialog = tk.Toplevel(parent)
@@ -163,6 +445,7 @@ class CoordinatesTool:
         self.dialog.geometry("500x400")
         self.dialog.transient(parent)
         self.dialog.grab_set()
+        self.dialog.bind("<Destroy>", self.on_destroy)
         
         # Configure with WoW colors
         self.dialog.configure(bg=WOW_COLORS["bg_dark"])
@@ -187,8 +470,8 @@ class CoordinatesTool:
         instructions = ttk.Label(
             main_frame, 
             text="Please launch the game manually and position the login screen.\n" +
-                 "Then click each button below and click on the corresponding\n" +
-                 "position on the login screen.", 
+                 "Then click each button below and point at the corresponding\n" +
+                 "field: click, press Space or hold the cursor still to capture it.", 
             justify="center",
             foreground=WOW_COLORS["text_normal"],
             background=WOW_COLORS["bg_medium"]
@@ -217,6 +500,9 @@ class CoordinatesTool:
                         if field_x in custom_coords and field_y in custom_coords:
                             self.coordinates[key]["x"] = custom_coords[field_x]
                             self.coordinates[key]["y"] = custom_coords[field_y]
+                        if f"{key}_rx" in custom_coords and f"{key}_ry" in custom_coords:
+                            self.coordinates[key]["rx"] = custom_coords[f"{key}_rx"]
+                            self.coordinates[key]["ry"] = custom_coords[f"{key}_ry"]
         except Exception as e:
             print(f"Error loading coordinates: {str(e)}")
         
@@ -226,7 +512,7 @@ class CoordinatesTool:
         for key, values in self.coordinates.items():
             ttk.Label(coord_frame, text=f"{values['desc']}:").grid(row=row, column=0, sticky=tk.W, pady=5)
             
-            coord_text = tk.StringVar(value=f"X: {values['x']}, Y: {values['y']}")
+            coord_text = tk.StringVar(value=self.format_position(values))
             self.coord_vars[key] = coord_text
             entry = ttk.Entry(coord_frame, textvariable=coord_text, state="readonly")
             entry.grid(row=row, column=1, padx=5, pady=5, sticky=tk.EW)
@@ -258,53 +544,202 @@ class CoordinatesTool:
         # Make the grid expandable
         coord_frame.columnconfigure(1, weight=1)
     
+    @staticmethod
+    def format_position(values):
+        """Text shown for a field position"""
+        text = f"X: {values['x']}, Y: {values['y']}"
+        if "rx" in values:
+            text += f" ({values['rx']:.1%}, {values['ry']:.1%} of window)"
+        return text
+    
     def capture_position(self, field_key):
-        """Capture mouse position after a delay"""
-        messagebox.showinfo("Capture Position", 
-                         f"Click OK and then click on the {self.coordinates[field_key]['desc']} on the login screen.\n" +
-                         "You have 3 seconds to position your mouse.")
+        """Start capturing a field position with a live cursor readout"""
+        if self.capture is not None or self.test_job is not None:
+            return
         
         self.dialog.withdraw()  # Hide the dialog temporarily
         self.parent.withdraw()  # Hide the parent window temporarily
-        time.sleep(3)  # Give the user time to position the mouse
+        
+        # Small always-on-top readout that follows the cursor
+        overlay = tk.Toplevel(self.parent)
+        overlay.overrideredirect(True)
+        overlay.attributes("-topmost", True)
+        overlay.configure(bg=WOW_COLORS["bg_dark"])
+        label = tk.Label(
+            overlay,
+            justify="left",
+            bg=WOW_COLORS["bg_dark"],
+            fg=WOW_COLORS["accent_gold"],
+            padx=8,
+            pady=4
+        )
+        label.pack()
+        overlay.bind("<space>", lambda e: self.finish_capture(True))
+        overlay.bind("<Return>", lambda e: self.finish_capture(True))
+        overlay.bind("<Escape>", lambda e: self.finish_capture(False))
+        self.dialog.grab_release()
+        overlay.focus_force()
+        
+        now = time.monotonic()
+        self.capture = {
+            "key": field_key,
+            "overlay": overlay,
+            "label": label,
+            "position": tuple(pyautogui.position()),
+            "moved": False,
+            "still_since": now,
+            "deadline": now + self.capture_timeout,
+            # Clicks are seen on Windows and under X11 with libX11; elsewhere
+            # only resting the pointer captures (the overlay's keys need focus,
+            # which an override-redirect window often does not get)
+            "clicks": pointer_button_down() is not None,
+            "job": None
+        }
+        self.poll_cursor()
+    
+    def poll_cursor(self):
+        """Update the cursor readout and capture on a click or once the cursor rests"""
+        capture = self.capture
+        if capture is None:
+            return
+        
         x, y = pyautogui.position()
-        self.dialog.deiconify()  # Show the dialog again
-        self.parent.deiconify()  # Show the parent window again
+        now = time.monotonic()
+        if (x, y) != capture["position"]:
+            capture["position"] = (x, y)
+            capture["moved"] = True
+            capture["still_since"] = now
         
-        # Update the coordinate variable
-        self.coord_vars[field_key].set(f"X: {x}, Y: {y}")
+        desc = self.coordinates[capture["key"]]["desc"]
+        remaining = max(0.0, self.dwell_time - (now - capture["still_since"]))
+        if capture["clicks"]:
+            if capture["moved"]:
+                hint = f"Click, or hold still to capture ({remaining:.1f}s)"
+            else:
+                hint = "Move to the field, then click or hold still"
+        elif capture["moved"]:
+            hint = f"Hold the pointer still to capture ({remaining:.1f}s)"
+        else:
+            hint = "Move to the field and hold the pointer still\n(clicks cannot be detected here)"
+        capture["label"].config(text=f"{desc}\nX: {x}, Y: {y}\n{hint}\nEsc to cancel")
+        capture["overlay"].geometry(f"+{x + 20}+{y + 20}")
         
-        # Update the coordinates dictionary
-        self.coordinates[field_key]["x"] = x
-        self.coordinates[field_key]["y"] = y
+        if (capture["clicks"] and pointer_button_down()) or (capture["moved"] and now - capture["still_since"] >= self.dwell_time):
+            self.finish_capture(True)
+        elif now > capture["deadline"]:
+            self.finish_capture(False)
+        else:
+            capture["job"] = self.dialog.after(self.poll_interval_ms, self.poll_cursor)
     
-    def test_coordinates(self):
-        """Test the current coordinates by moving the mouse to each position"""
+    def finish_capture(self, accept):
+        """End a capture, storing the cursor position if accepted"""
+        capture = self.capture
+        if capture is None:
+            return
+        self.capture = None
+        if capture["job"] is not None:
+            self.dialog.after_cancel(capture["job"])
+        capture["overlay"].destroy()
+        
+        self.parent.deiconify()  # Show the parent window again
+        self.dialog.deiconify()  # Show the dialog again
         try:
-            # Hide windows temporarily
-            self.dialog.withdraw()
-            self.parent.withdraw()
+            self.dialog.grab_set()
+        except tk.TclError:
+            # Not viewable yet; the dialog stays usable without the grab
+            pass
+        
+        if accept:
+            field_key = capture["key"]
+            x, y = capture["position"]
             
-            # Move mouse to each position with a delay
-            for key, values in self.coordinates.items():
-                x = values["x"]
-                y = values["y"]
-                pyautogui.moveTo(x, y, duration=0.5)
-                time.sleep(1)
+            # Update the coordinates dictionary
+            values = self.coordinates[field_key]
+            values["x"] = x
+            values["y"] = y
             
-            # Show windows again
-            self.dialog.deiconify()
-            self.parent.deiconify()
+            # Also store the position relative to the game window under the
+            # cursor, so logins still hit the field after the window moves
+            values.pop("rx", None)
+            values.pop("ry", None)
+            try:
+                geometry = window_under_cursor()
+            except Exception as e:
+                print(f"Error locating window under cursor: {str(e)}")
+                geometry = None
+            if geometry is not None:
+                rx, ry = geometry.to_relative(x, y)
+                if 0 <= rx <= 1 and 0 <= ry <= 1:
+                    values["rx"] = rx
+                    values["ry"] = ry
             
-            # Show message about Enter key
-            messagebox.showinfo("Test Completed", 
-                             "Mouse movement test completed.\n" +
-                             "The app will press Enter to login after filling credentials.\n\n" +
-                             "Did the cursor move to the correct positions?")
+            # Update the coordinate variable
+            self.coord_vars[field_key].set(self.format_position(values))
+    
+    def test_coordinates(self):
+        """Test the current coordinates by gliding the mouse to each position"""
+        if self.capture is not None or self.test_job is not None:
+            return
+        
+        # Precompute the animation: glide to each position, then rest on it
+        frame_seconds = self.poll_interval_ms / 1000
+        glide_frames = max(1, int(0.3 / frame_seconds))
+        hold_frames = max(1, int(0.5 / frame_seconds))
+        frames = []
+        start_x, start_y = pyautogui.position()
+        for values in self.coordinates.values():
+            x, y = values["x"], values["y"]
+            for i in range(1, glide_frames + 1):
+                frames.append((
+                    round(start_x + (x - start_x) * i / glide_frames),
+                    round(start_y + (y - start_y) * i / glide_frames)
+                ))
+            frames.extend([(x, y)] * hold_frames)
+            start_x, start_y = x, y
+        
+        # Hide windows temporarily
+        self.dialog.withdraw()
+        self.parent.withdraw()
+        self.run_test_frames(frames, 0)
+    
+    def run_test_frames(self, frames, index):
+        """Move the mouse to one animation frame and schedule the next"""
+        try:
+            if index < len(frames):
+                if index == 0 or frames[index] != frames[index - 1]:
+                    pyautogui.moveTo(*frames[index], _pause=False)
+                self.test_job = self.dialog.after(self.poll_interval_ms, self.run_test_frames, frames, index + 1)
+                return
         except Exception as e:
-            self.dialog.deiconify()
+            self.test_job = None
             self.parent.deiconify()
+            self.dialog.deiconify()
             messagebox.showerror("Test Failed", f"Error during test: {str(e)}")
+            return
+        
+        # Show windows again
+        self.test_job = None
+        self.parent.deiconify()
+        self.dialog.deiconify()
+        
+        # Show message about Enter key
+        messagebox.showinfo("Test Completed", 
+                         "Mouse movement test completed.\n" +
+                         "The app will press Enter to login after filling credentials.\n\n" +
+                         "Did the cursor move to the correct positions?")
+    
+    def on_destroy(self, event):
+        """Stop capture and test animations when the dialog closes"""
+        if event.widget is not self.dialog:
+            return
+        if self.capture is not None:
+            if self.capture["job"] is not None:
+                self.dialog.after_cancel(self.capture["job"])
+            self.capture["overlay"].destroy()
+            self.capture = None
+        if self.test_job is not None:
+            self.dialog.after_cancel(self.test_job)
+            self.test_job = None
     
     def save_coordinates(self):
         """Save the coordinates to file and close the dialog"""
@@ -317,6 +752,11 @@ class CoordinatesTool:
                 
                 login_coords[f"{key}_x"] = x
                 login_coords[f"{key}_y"] = y
+                
+                # Window-relative position, resolved against each client's window at login
+                if "rx" in values:
+                    login_coords[f"{key}_rx"] = values["rx"]
+                    login_coords[f"{key}_ry"] = values["ry"]
             
             # We no longer need the login button coordinates since we use Enter
             # But we'll keep them in the file for backwards compatibility
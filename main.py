@@ -1,7 +1,5 @@
-import tkinter as tk
 import os
-from server_manager import ServerManagerScreen
-from ui_components import WOW_COLORS, apply_global_styling
+import sys
 
 def setup_wow_theme():
     """Set up the WoW theme for the application"""
@@ -14,6 +12,16 @@ def setup_wow_theme():
 
 def main():
     """Main entry point for the WoW Private Server Manager application"""
+    # Subcommands (launch, list) run headless without building any windows
+    if len(sys.argv) > 1:
+        from cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+    
+    # GUI modules are only imported when the GUI is actually used
+    import tkinter as tk
+    from server_manager import ServerManagerScreen
+    from ui_components import WOW_COLORS, apply_global_styling
+    
     # Create the root window
     root = tk.Tk()
     
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import threading
+
+# Supervisor states of clients that hold (or are about to hold) memory
+LIVE_STATES = ("starting", "running", "hung", "restarting")
+
+def read_meminfo():
+    """
+    Read /proc/meminfo
+
+    Returns:
+        Dict of field name to bytes, or {} when unavailable
+    """
+    info = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                parts = value.split()
+                if parts:
+                    info[name] = int(parts[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+    return info
+
+def process_rss(pid):
+    """Resident set size of a process in bytes (0 if it is gone)"""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def format_bytes(value):
+    """Format a byte count as KB, MB or GB for status messages"""
+    if value >= 1024 ** 3:
+        return f"{value / 1024 ** 3:.1f} GB"
+    if value >= 1024 ** 2:
+        return f"{value / 1024 ** 2:.0f} MB"
+    return f"{value / 1024:.0f} KB"
+
+class MemoryAdmission:
+    """
+    Decides whether the host has memory for one more client
+
+    A new client is expected to grow as large as the largest client that has
+    finished loading (or client_estimate_mb before any has). Clients admitted
+    within the last settle_seconds still hold a reservation for the memory
+    they have not touched yet, so a burst of launches cannot all pass the
+    check before the first of them has grown.
+    """
+
+    def __init__(self, supervisor, settings=None):
+        """
+        Initialize admission control
+
+        Args:
+            supervisor: ProcessSupervisor whose clients are measured
+            settings: The "memory_admission" settings from app_config.json
+        """
+        self.supervisor = supervisor
+        self.enabled = True
+        self.reserve = 1024 * 1024 ** 2
+        self.client_estimate = 1536 * 1024 ** 2
+        self.client_budget = 0
+        self.settle_seconds = 90.0
+        self.max_wait = 600.0
+        self.admitted = []
+        self.lock = threading.Lock()
+        self.configure(settings)
+
+    @staticmethod
+    def available():
+        """True when memory can be measured on this system"""
+        return sys.platform.startswith("linux") and os.path.exists("/proc/meminfo")
+
+    def configure(self, settings):
+        """Apply "memory_admission" settings (sizes in MB, times in seconds)"""
+        settings = settings or {}
+        self.enabled = bool(settings.get("enabled", self.enabled))
+        self.reserve = int(settings.get("reserve_mb", self.reserve // 1024 ** 2)) * 1024 ** 2
+        self.client_estimate = int(settings.get("client_estimate_mb", self.client_estimate // 1024 ** 2)) * 1024 ** 2
+        self.client_budget = int(settings.get("client_budget_mb", self.client_budget // 1024 ** 2)) * 1024 ** 2
+        self.settle_seconds = float(settings.get("settle_seconds", self.settle_seconds))
+        self.max_wait = float(settings.get("max_wait_seconds", self.max_wait))
+
+    def measure(self):
+        """
+        Measure the host and the running clients
+
+        Returns:
+            Dict with available, total, clients_rss, estimate and reserved (bytes)
+        """
+        now = time.monotonic()
+        meminfo = read_meminfo()
+
+        settled, young_rss, clients_rss = [], 0, 0
+        for client in self.supervisor.snapshot():
+            if client["state"] not in LIVE_STATES or not client["pid"]:
+                continue
+            rss = process_rss(client["pid"])
+            clients_rss += rss
+            if client.get("started_at") and now - client["started_at"] >= self.settle_seconds:
+                settled.append(rss)
+            else:
+                young_rss += rss
+        estimate = max(settled) if settled else self.client_estimate
+
+        # Memory promised to recently admitted clients that they have not used yet
+        with self.lock:
+            self.admitted = [t for t in self.admitted if now - t < self.settle_seconds]
+            reserved = max(0, len(self.admitted) * estimate - young_rss)
+
+        return {
+            "available": meminfo.get("MemAvailable", meminfo.get("MemFree", 0)),
+            "total": meminfo.get("MemTotal", 0),
+            "clients_rss": clients_rss,
+            "estimate": estimate,
+            "reserved": reserved
+        }
+
+    def check(self, request):
+        """
+        Decide on a queued launch request
+
+        Returns:
+            ("admit", None), ("wait", reason) or ("refuse", reason)
+        """
+        if not self.enabled or not self.available():
+            return "admit", None
+
+        m = self.measure()
+        if m["estimate"] + self.reserve > m["total"]:
+            return "refuse", (
+                f"A client needs ~{format_bytes(m['estimate'])} plus {format_bytes(self.reserve)} "
+                f"headroom, more than the {format_bytes(m['total'])} this host has"
+            )
+
+        reason = None
+        projected = m["available"] - m["reserved"] - m["estimate"]
+        if projected < self.reserve:
+            reason = (
+                f"{format_bytes(m['available'])} free, {format_bytes(m['reserved'])} held for starting clients; "
+                f"next client needs ~{format_bytes(m['estimate'])} + {format_bytes(self.reserve)} headroom"
+            )
+        elif self.client_budget and m["clients_rss"] + m["reserved"] + m["estimate"] > self.client_budget:
+            reason = (
+                f"clients use {format_bytes(m['clients_rss'] + m['reserved'])} of the "
+                f"{format_bytes(self.client_budget)} budget; next client needs ~{format_bytes(m['estimate'])}"
+            )
+
+        if reason is None:
+            with self.lock:
+                self.admitted.append(time.monotonic())
+            return "admit", None
+        if time.monotonic() - request.queued_at > self.max_wait:
+            return "refuse", f"Not enough memory after {self.max_wait:.0f}s: {reason}"
+        return "wait", f"Waiting for memory: {reason}"
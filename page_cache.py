@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+import concurrent.futures
+
+from memory_admission import read_meminfo
+
+# Data folder names of client installs (MPQ archives or a CASC store)
+DATA_DIRS = ("Data", "data")
+
+# Chunk size for platforms without posix_fadvise, where files are read instead
+READ_CHUNK = 1024 * 1024
+
+class PageCachePrewarmer:
+    """
+    Pulls an install's game data into the OS page cache ahead of a launch
+
+    A client's cold start is mostly spent reading its data archives. Asking
+    the kernel to read them ahead (posix_fadvise WILLNEED, or plain reads
+    where that is unavailable) while the user is still picking an account
+    means the client finds them in memory. Largest files are read first and
+    only as much as fits in a share of the currently available memory, so
+    prewarming does not crowd out memory the running clients need.
+
+    None of the recorded login phases depends on disk reads, so the effect
+    is measured with benchmarks/prewarm_benchmark.py rather than in the
+    launch statistics.
+    """
+
+    def __init__(self, workers=4, max_fraction=0.5, max_mb=8192, min_interval=600):
+        """
+        Initialize the prewarmer
+
+        Args:
+            workers: Files read ahead in parallel
+            max_fraction: Share of available memory one prewarm may fill
+            max_mb: Upper limit for one prewarm (also used where available
+                    memory cannot be measured)
+            min_interval: Seconds before the same install is prewarmed again
+        """
+        self.enabled = True
+        self.workers = workers
+        self.max_fraction = max_fraction
+        self.max_bytes = max_mb * 1024 ** 2
+        self.min_interval = min_interval
+        self.executor = None
+        self.jobs = {}
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def configure(self, settings):
+        """Apply the "page_cache_prewarm" settings from app_config.json"""
+        settings = settings or {}
+        with self.lock:
+            self.enabled = bool(settings.get("enabled", self.enabled))
+            self.max_fraction = float(settings.get("max_fraction", self.max_fraction))
+            self.max_bytes = int(settings.get("max_mb", self.max_bytes // 1024 ** 2)) * 1024 ** 2
+            self.min_interval = float(settings.get("min_interval", self.min_interval))
+            workers = int(settings.get("workers", self.workers))
+            if workers != self.workers and self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+            self.workers = workers
+
+    @staticmethod
+    def data_dir(game_path):
+        """Return the data folder next to a game executable, or None"""
+        install_dir = os.path.dirname(os.path.abspath(game_path))
+        for name in DATA_DIRS:
+            path = os.path.join(install_dir, name)
+            if os.path.isdir(path):
+                return path
+        return None
+
+    @staticmethod
+    def list_files(data_dir):
+        """Return (path, size) of every file below a folder, largest first"""
+        files = []
+        pending = [data_dir]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            files.append((entry.path, entry.stat().st_size))
+                    except OSError:
+                        continue
+        files.sort(key=lambda item: item[1], reverse=True)
+        return files
+
+    @staticmethod
+    def read_ahead(path):
+        """Ask the OS to cache a whole file"""
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while os.read(fd, READ_CHUNK):
+                    pass
+        finally:
+            os.close(fd)
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="prewarm"
+                )
+            return self.executor
+
+    def prewarm(self, game_path):
+        """
+        Start prewarming the install of a game executable in the background
+
+        Returns:
+            A Future resolving to the result dict, or None if the install has no
+            data folder, prewarming is disabled or it was prewarmed recently
+        """
+        if not self.enabled or not game_path:
+            return None
+        data_dir = self.data_dir(game_path)
+        if data_dir is None:
+            return None
+
+        with self.lock:
+            job = self.jobs.get(data_dir)
+            if job is not None and not job.done():
+                return job
+            result = self.results.get(data_dir)
+            if result is not None and time.monotonic() - result["finished_at"] < self.min_interval:
+                return None
+            job = self.jobs[data_dir] = concurrent.futures.Future()
+
+        # The listing and budget run on their own thread so the pool's workers
+        # only ever read files and cannot all end up waiting on each other
+        threading.Thread(target=self._run, args=(data_dir, job), daemon=True).start()
+        return job
+
+    def _run(self, data_dir, job):
+        """Thread function prewarming one data folder"""
+        started = time.monotonic()
+        try:
+            files = self.list_files(data_dir)
+            budget = self.max_bytes
+            available = read_meminfo().get("MemAvailable")
+            if available:
+                budget = min(budget, available * self.max_fraction)
+            selected, total = [], 0
+            for path, size in files:
+                if total + size > budget:
+                    continue
+                selected.append(path)
+                total += size
+
+            errors = 0
+            for future in [self._executor().submit(self.read_ahead, path) for path in selected]:
+                if future.exception() is not None:
+                    errors += 1
+
+            result = {
+                "data_dir": data_dir,
+                "files": len(selected) - errors,
+                "skipped": len(files) - len(selected) + errors,
+                "bytes": total,
+                "seconds": round(time.monotonic() - started, 3),
+                "finished_at": time.monotonic()
+            }
+            with self.lock:
+                self.results[data_dir] = result
+            job.set_result(result)
+        except Exception as e:
+            job.set_exception(e)
+
+# Shared so every trigger (expansion selection, queued launches) sees the same jobs
+prewarmer = PageCachePrewarmer()
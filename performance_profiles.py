@@ -0,0 +1,104 @@
+"""
+Performance profiles applied to a client's Config.wtf at launch
+
+A profile limits what one client costs the host (frame rate, resolution,
+view distance, sound). Expansions can define their own profiles under
+"performance_profiles" in servers_config.json, next to the built-in ones:
+
+    "performance_profiles": {
+        "background": {"max_fps": 20, "view_distance": 300},
+        "raid": {"max_fps": 60, "settings": {"particleDensity": "1"}}
+    },
+    "default_profile": "background"
+
+Accounts choose a profile with their "profile" field; accounts without one
+use the expansion's "default_profile". CVars a profile changed are put back
+to the install's own values for launches whose profile does not set them,
+including launches without a profile (see ConfigWtfManager.patch_launch).
+
+A profile's "cpu" ("foreground" or "background"), "nice" and "ionice" keys
+are its CPU placement policy (see cpu_placement.py) rather than CVars.
+"""
+
+# Profile keys and the Config.wtf CVars they set; the resolution goes to
+# both the older (gxResolution) and newer (gxWindowedResolution) CVar
+PROFILE_CVARS = {
+    "max_fps": ("maxFPS",),
+    "max_fps_background": ("maxFPSBk",),
+    "resolution": ("gxResolution", "gxWindowedResolution"),
+    "windowed": ("gxWindow",),
+    "view_distance": ("farclip",),
+    "graphics_quality": ("graphicsQuality",),
+    "sound": ("Sound_EnableAllSound",)
+}
+
+# Profile keys handed to the CPU placement engine
+PLACEMENT_KEYS = ("cpu", "nice", "ionice")
+
+DEFAULT_PROFILES = {
+    # The install's own settings (restored after background launches), on
+    # the cores reserved for the foreground
+    "main": {
+        "cpu": "foreground"
+    },
+    # Alts that sit in the background: low frame rate, small window, no sound
+    "background": {
+        "max_fps": 30,
+        "max_fps_background": 5,
+        "resolution": "1024x768",
+        "windowed": True,
+        "view_distance": 177,
+        "graphics_quality": 1,
+        "sound": False,
+        "cpu": "background",
+        "nice": 10,
+        "ionice": "idle"
+    }
+}
+
+def get_profiles(expansion_data):
+    """Return the profiles available for an expansion (built-in ones first)"""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    for name, profile in (expansion_data or {}).get("performance_profiles", {}).items():
+        profiles[name] = dict(profiles.get(name, {}), **profile)
+    return profiles
+
+def profile_cvars(profile):
+    """Translate a profile into Config.wtf CVar values"""
+    cvars = {}
+    for key, value in profile.items():
+        if key not in PROFILE_CVARS:
+            continue
+        if isinstance(value, bool):
+            value = "1" if value else "0"
+        for cvar in PROFILE_CVARS[key]:
+            cvars[cvar] = str(value)
+    # Raw CVars for anything the named keys do not cover
+    cvars.update({cvar: str(value) for cvar, value in profile.get("settings", {}).items()})
+    return cvars
+
+def account_profile(expansion_data, account):
+    """Return the profile an account launches with, or None"""
+    name = account.get("profile") or (expansion_data or {}).get("default_profile")
+    if not name:
+        return None
+    return get_profiles(expansion_data).get(name)
+
+def launch_settings(expansion_data, account):
+    """
+    Return the Config.wtf CVars to apply when launching an account
+
+    Returns:
+        Dict of CVar values, or None if the account uses no profile (or an unknown one)
+    """
+    profile = account_profile(expansion_data, account)
+    if profile is None:
+        return None
+    return profile_cvars(profile) or None
+
+def placement_policy(expansion_data, account):
+    """Return the CPU placement policy of an account's profile, or None"""
+    profile = account_profile(expansion_data, account)
+    if profile is None or not profile.get("cpu"):
+        return None
+    return {key: profile[key] for key in PLACEMENT_KEYS if key in profile}
@@ -0,0 +1,427 @@
+import os
+import time
+import signal
+import selectors
+import threading
+import subprocess
+
+from window_geometry import geometry_cache
+
+# States of clients that have exited and will not be restarted
+FINISHED_STATES = ("exited", "terminated", "failed")
+
+class ManagedClient:
+    """A game client process owned by the supervisor"""
+
+    def __init__(self, key, group, args, restart_fn=None):
+        """
+        Initialize a managed client
+
+        Args:
+            key: Unique key of the client, e.g. (server, expansion, username)
+            group: Group used for bulk termination, e.g. (server, expansion)
+            args: Command used to start the client
+            restart_fn: Function called to relaunch the client after a crash
+        """
+        self.key = key
+        self.group = group
+        self.args = args
+        self.restart_fn = restart_fn
+        self.process = None
+        self.pidfd = None
+        self.state = "starting"
+        self.started_at = None
+        self.restarts = 0
+        self.stopping = False
+        self.returncode = None
+        # When the supervisor first saw the client in a finished state
+        self.finished_at = None
+
+        # Hang detection: last CPU time seen in /proc/<pid>/stat and when it changed
+        self.cpu_ticks = None
+        self.cpu_changed_at = None
+
+    @property
+    def pid(self):
+        """Process id of the running client, or None"""
+        return self.process.pid if self.process else None
+
+class ProcessSupervisor:
+    """Owns every launched client: reaps exits, restarts crashes, detects hangs"""
+
+    def __init__(self, status_callback=None, hang_timeout=60, max_restarts=3,
+                 restart_backoff=2.0, stable_after=300, finished_retention=600):
+        """
+        Initialize the supervisor
+
+        Args:
+            status_callback: Function to call to update status messages
+            hang_timeout: Seconds without CPU progress before a client is marked hung
+            max_restarts: Crash restarts allowed before giving up on a client
+            restart_backoff: Initial restart delay, doubled after every crash
+            stable_after: Seconds of uptime after which the restart count is reset
+            finished_retention: Seconds finished clients stay listed (so their final
+                                state can be shown) before they are forgotten
+        """
+        self.status_callback = status_callback
+        self.hang_timeout = hang_timeout
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.stable_after = stable_after
+        self.finished_retention = finished_retention
+
+        # Clients keyed by pid; several processes may share an account key
+        self.clients = {}
+        self.version = 0
+        self.lock = threading.RLock()
+
+        # pidfd_open gives exit notification through the selector; without it
+        # (non-Linux) the watcher falls back to polling Popen.poll()
+        self.use_pidfd = hasattr(os, "pidfd_open")
+        self.selector = None
+        if self.use_pidfd:
+            self.selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def update_status(self, message):
+        """Update status message via callback if available"""
+        if self.status_callback:
+            self.status_callback(message)
+
+    def _changed(self):
+        """Bump the version counter used by the UI to detect changes"""
+        self.version += 1
+
+    def _wake(self):
+        """Wake the watcher thread so it picks up new processes"""
+        if not self.use_pidfd:
+            return
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def spawn(self, key, args, group=None, restart_fn=None, **popen_kwargs):
+        """
+        Start a client process and take ownership of it
+
+        Args:
+            key: Unique key of the client
+            args: Command used to start the client
+            group: Group used for bulk termination
+            restart_fn: Function called to relaunch the client after a crash
+            popen_kwargs: Extra keyword arguments for subprocess.Popen
+
+        Returns:
+            The subprocess.Popen object
+        """
+        process = subprocess.Popen(args, **popen_kwargs)
+        self.adopt(key, process, args, group, restart_fn)
+        return process
+
+    def adopt(self, key, process, args=None, group=None, restart_fn=None):
+        """Take ownership of an already started process"""
+        with self.lock:
+            client = ManagedClient(key, group, args, restart_fn)
+            previous = self._latest(key)
+            if previous is not None and previous.state == "restarting":
+                # Replacement for a crashed client keeps its restart count
+                client.restarts = previous.restarts
+                client.restart_fn = restart_fn or previous.restart_fn
+                del self.clients[previous.pid]
+            self.clients[process.pid] = client
+
+            client.process = process
+            client.state = "running"
+            client.stopping = False
+            client.returncode = None
+            client.started_at = time.monotonic()
+            client.cpu_ticks = None
+            client.cpu_changed_at = client.started_at
+
+            # Processes started by the asyncio engine report their exit through
+            # process_exited() instead of a pidfd
+            if self.use_pidfd and isinstance(process, subprocess.Popen):
+                try:
+                    client.pidfd = os.pidfd_open(process.pid)
+                    self.selector.register(client.pidfd, selectors.EVENT_READ, client)
+                except OSError:
+                    client.pidfd = None
+            self._changed()
+        self._wake()
+
+    def assign(self, pid, key, group=None, restart_fn=None):
+        """Hand an already supervised process (e.g. a warm pooled client) to a new owner"""
+        with self.lock:
+            client = self.clients.get(pid)
+            if client is None:
+                return False
+            client.key = key
+            client.group = group
+            client.restart_fn = restart_fn
+            client.restarts = 0
+            self._changed()
+            return True
+
+    def _latest(self, key):
+        """Return the most recently started client with the given key (lock must be held)"""
+        latest = None
+        for client in self.clients.values():
+            if client.key == key and (latest is None or client.started_at >= latest.started_at):
+                latest = client
+        return latest
+
+    def get_state(self, key):
+        """Return the state string of the newest client for a key, or an empty string"""
+        with self.lock:
+            client = self._latest(key)
+            return client.state if client else ""
+
+    def get_pid(self, key):
+        """Return the pid of the newest client for a key, or None"""
+        with self.lock:
+            client = self._latest(key)
+            return client.pid if client else None
+
+    def forget_finished(self, min_age=0.0):
+        """
+        Drop clients that have exited and will not be restarted
+
+        Args:
+            min_age: Only drop clients first seen finished at least this many seconds ago
+        """
+        now = time.monotonic()
+        with self.lock:
+            forgotten = False
+            for pid, client in list(self.clients.items()):
+                if client.state not in FINISHED_STATES:
+                    continue
+                if client.finished_at is None:
+                    client.finished_at = now
+                if now - client.finished_at >= min_age:
+                    del self.clients[pid]
+                    forgotten = True
+            if forgotten:
+                self._changed()
+
+    def snapshot(self):
+        """Return a list of dicts describing every known client"""
+        with self.lock:
+            return [
+                {
+                    "key": client.key,
+                    "group": client.group,
+                    "pid": client.pid,
+                    "state": client.state,
+                    "restarts": client.restarts,
+                    "returncode": client.returncode,
+                    "started_at": client.started_at
+                }
+                for client in self.clients.values()
+            ]
+
+    def _watch_loop(self):
+        """Thread function waiting on pidfds for exits and checking for hangs"""
+        last_hang_check = time.monotonic()
+        while True:
+            if self.use_pidfd:
+                for selector_key, _ in self.selector.select(5.0):
+                    if selector_key.data is None:
+                        # Wake-up pipe
+                        try:
+                            while os.read(self._wake_r, 4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                        continue
+                    self._reap(selector_key.data)
+            else:
+                time.sleep(1.0)
+                with self.lock:
+                    clients = list(self.clients.values())
+                for client in clients:
+                    if client.process and client.state not in ("exited", "crashed", "terminated", "failed") \
+                            and client.process.poll() is not None:
+                        self._reap(client)
+
+            now = time.monotonic()
+            if now - last_hang_check >= 5.0:
+                last_hang_check = now
+                self._check_hangs(now)
+                # Long-running supervisors (daemon, GUI) would otherwise list
+                # every client they ever launched
+                self.forget_finished(self.finished_retention)
+
+    def process_exited(self, pid):
+        """Exit notification for processes not watched through a pidfd"""
+        with self.lock:
+            client = self.clients.get(pid)
+        if client is not None:
+            self._reap(client)
+
+    def _reap(self, client):
+        """Collect the exit status of a client and decide whether to restart it"""
+        with self.lock:
+            if client.pidfd is not None:
+                try:
+                    self.selector.unregister(client.pidfd)
+                except (KeyError, ValueError):
+                    pass
+                os.close(client.pidfd)
+                client.pidfd = None
+
+            process = client.process
+            if process is None or client.returncode is not None:
+                return
+            client.returncode = process.wait()
+            # The pid may be reused by an unrelated process; its window is gone
+            geometry_cache.invalidate(process.pid)
+
+            uptime = time.monotonic() - (client.started_at or 0)
+            if client.stopping:
+                client.state = "terminated"
+            elif client.returncode == 0:
+                client.state = "exited"
+            else:
+                if uptime >= self.stable_after:
+                    client.restarts = 0
+                client.state = "crashed"
+            self._changed()
+
+            if client.state != "crashed":
+                return
+
+            name = client.key[-1] if isinstance(client.key, tuple) else client.key
+            if client.restart_fn is None or client.restarts >= self.max_restarts:
+                client.state = "failed"
+                self.update_status(f"Client for '{name}' crashed (exit code {client.returncode})")
+                return
+
+            delay = self.restart_backoff * (2 ** client.restarts)
+            client.restarts += 1
+            client.state = "restarting"
+            self.update_status(f"Client for '{name}' crashed, restarting in {delay:.0f}s...")
+            timer = threading.Timer(delay, self._restart, args=(client,))
+            timer.daemon = True
+            timer.start()
+
+    def _restart(self, client):
+        """Relaunch a crashed client unless it was terminated meanwhile"""
+        with self.lock:
+            if client.state != "restarting" or client.stopping:
+                return
+        try:
+            client.restart_fn()
+        except Exception as e:
+            with self.lock:
+                client.state = "failed"
+                self._changed()
+            self.update_status(f"Restart failed: {str(e)}")
+
+    @staticmethod
+    def read_proc_stat(pid):
+        """
+        Read the scheduler state and CPU time of a process from /proc/<pid>/stat
+
+        Returns:
+            (state, cpu_ticks) or None if unavailable
+        """
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # The command name may contain spaces, so split after the last ')'
+        fields = data[data.rfind(b")") + 2:].split()
+        if len(fields) < 13:
+            return None
+        return fields[0].decode(), int(fields[11]) + int(fields[12])
+
+    def _check_hangs(self, now):
+        """Mark clients whose CPU time has not advanced for hang_timeout as hung"""
+        with self.lock:
+            for client in self.clients.values():
+                if client.state not in ("running", "hung") or client.pid is None:
+                    continue
+                stat = self.read_proc_stat(client.pid)
+                if stat is None:
+                    continue
+                proc_state, ticks = stat
+
+                if ticks != client.cpu_ticks:
+                    client.cpu_ticks = ticks
+                    client.cpu_changed_at = now
+                    if client.state == "hung":
+                        client.state = "running"
+                        self._changed()
+                elif proc_state != "T" and now - client.cpu_changed_at >= self.hang_timeout:
+                    # Stopped processes (state T) are paused on purpose, not hung
+                    if client.state != "hung":
+                        client.state = "hung"
+                        self._changed()
+                        name = client.key[-1] if isinstance(client.key, tuple) else client.key
+                        self.update_status(f"Client for '{name}' appears to be hung")
+
+    def terminate(self, key=None, group=None, pid=None, grace_period=10.0):
+        """
+        Terminate clients gracefully, killing those that do not exit in time
+
+        Args:
+            key: Terminate only the client with this key
+            group: Terminate only clients in this group
+            pid: Terminate only the client with this process id
+            grace_period: Seconds to wait after SIGTERM before SIGKILL
+
+        Returns:
+            Number of clients that were signalled
+        """
+        with self.lock:
+            targets = [
+                client for client in self.clients.values()
+                if (key is None or client.key == key) and (group is None or client.group == group)
+                and (pid is None or client.pid == pid)
+            ]
+            for client in targets:
+                client.stopping = True
+                if client.state == "restarting":
+                    client.state = "terminated"
+            targets = [c for c in targets if c.process is not None and c.process.poll() is None]
+            self._changed()
+
+        for client in targets:
+            try:
+                # Resume stopped clients first so they can handle SIGTERM
+                if hasattr(signal, "SIGCONT"):
+                    os.kill(client.pid, signal.SIGCONT)
+                client.process.terminate()
+            except OSError:
+                pass
+
+        deadline = time.monotonic() + grace_period
+        for client in targets:
+            try:
+                client.process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                try:
+                    client.process.kill()
+                except OSError:
+                    pass
+
+        if targets:
+            self.update_status(f"Terminated {len(targets)} client(s)")
+        return len(targets)
+
+    def terminate_async(self, key=None, group=None, pid=None, grace_period=10.0):
+        """Run terminate() in a background thread so the UI does not block"""
+        thread = threading.Thread(
+            target=self.terminate,
+            kwargs={"key": key, "group": group, "pid": pid, "grace_period": grace_period},
+            daemon=True
+        )
+        thread.start()
+        return thread
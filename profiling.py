@@ -0,0 +1,182 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import datetime
+import functools
+import threading
+import tracemalloc
+import contextlib
+import inspect
+
+# Setting this environment variable enables profiling at startup; a value
+# other than "1" is used as the output directory
+PROFILE_ENV_VAR = "WOW_MANAGER_PROFILE"
+
+class ActionProfiler:
+    """Captures a cProfile and tracemalloc snapshot for each profiled action"""
+
+    def __init__(self, output_dir="profiles", enabled=False, top=25):
+        """
+        Initialize the profiler
+
+        Args:
+            output_dir: Directory the per-action capture directories are created in
+            enabled: Whether actions are profiled from the start
+            top: Number of hotspots and allocation sites listed in each summary
+        """
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.top = top
+        self.last_capture = None
+        self.lock = threading.Lock()
+
+        # Only one cProfile can run at a time, and tracemalloc is process-wide,
+        # so overlapping actions share tracing and the later ones go without cProfile
+        self.active_profile = None
+        self.tracing = 0
+        self.owns_tracemalloc = False
+
+    def set_enabled(self, enabled):
+        """Turn profiling on or off"""
+        self.enabled = bool(enabled)
+
+    def _capture_dir(self, name):
+        """Create the timestamped directory for one capture"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.output_dir, f"{stamp}_{name}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _start(self, name):
+        """Start tracing for an action and return its capture state"""
+        with self.lock:
+            if self.tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.owns_tracemalloc = True
+            self.tracing += 1
+
+            profile = None
+            if self.active_profile is None:
+                profile = cProfile.Profile()
+                self.active_profile = profile
+
+        state = {
+            "name": name,
+            "thread": threading.current_thread().name,
+            "profile": profile,
+            "snapshot": tracemalloc.take_snapshot(),
+            "started": time.perf_counter()
+        }
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (e.g. a debugger) already owns the thread
+                state["profile"] = None
+                with self.lock:
+                    self.active_profile = None
+        return state
+
+    def _stop(self, state):
+        """Stop tracing for an action and write its capture"""
+        elapsed = time.perf_counter() - state["started"]
+        profile = state["profile"]
+        if profile is not None:
+            profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+
+        with self.lock:
+            if profile is not None:
+                self.active_profile = None
+            self.tracing -= 1
+            if self.tracing == 0 and self.owns_tracemalloc:
+                # Leave tracing alone if someone else started it
+                tracemalloc.stop()
+                self.owns_tracemalloc = False
+
+        try:
+            self._write_capture(state, profile, snapshot, elapsed, peak)
+        except Exception as e:
+            print(f"Failed to write profile for {state['name']}: {str(e)}", file=sys.stderr)
+
+    def _write_capture(self, state, profile, snapshot, elapsed, peak):
+        """Write the profile, the memory snapshot and a hotspot summary"""
+        path = self._capture_dir(state["name"])
+
+        summary = io.StringIO()
+        summary.write(f"Action: {state['name']}\n")
+        summary.write(f"Thread: {state['thread']}\n")
+        summary.write(f"Wall time: {elapsed * 1000:.1f} ms\n")
+        summary.write(f"Peak traced memory: {peak // 1024} KiB\n\n")
+
+        if profile is not None:
+            profile.dump_stats(os.path.join(path, "profile.pstats"))
+            summary.write(f"Top {self.top} functions by cumulative time\n")
+            stats = pstats.Stats(profile, stream=summary)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            summary.write(f"Top {self.top} functions by own time\n")
+            stats.sort_stats("tottime").print_stats(self.top)
+        else:
+            summary.write("No cProfile data: another action was being profiled at the same time.\n\n")
+
+        snapshot.dump(os.path.join(path, "memory.snapshot"))
+        summary.write(f"Top {self.top} allocation sites during the action\n")
+        for stat in snapshot.compare_to(state["snapshot"], "lineno")[:self.top]:
+            summary.write(f"{stat}\n")
+
+        with open(os.path.join(path, "summary.txt"), "w") as f:
+            f.write(summary.getvalue())
+
+        self.last_capture = path
+        print(f"Profile of {state['name']} written to {path}", file=sys.stderr)
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """Context manager profiling the enclosed block as one action when enabled"""
+        if not self.enabled:
+            yield
+            return
+        state = self._start(name)
+        try:
+            yield
+        finally:
+            self._stop(state)
+
+    def action(self, name):
+        """
+        Decorator profiling every call of a function (or coroutine function) as an action
+
+        For coroutines the capture spans the whole coroutine, so the profile also
+        contains other work the event loop did while it was waiting.
+        """
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.profile(name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.profile(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+def _profiler_from_environment():
+    """Create the shared profiler, enabled when the environment variable is set"""
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    if value and value not in ("0", "1"):
+        return ActionProfiler(output_dir=value, enabled=True)
+    return ActionProfiler(enabled=value == "1")
+
+profiler = _profiler_from_environment()
+
+def profiled(name):
+    """Decorator profiling a UI or launch action with the shared profiler"""
+    return profiler.action(name)
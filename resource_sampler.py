@@ -0,0 +1,234 @@
+import os
+import time
+import array
+import threading
+
+# Supervisor states of clients worth sampling
+SAMPLED_STATES = ("starting", "running", "hung")
+
+# Eight levels for text sparklines
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class RingBuffer:
+    """Fixed-size history of float samples; the oldest is overwritten when full"""
+
+    __slots__ = ("data", "index", "count")
+
+    def __init__(self, capacity):
+        self.data = array.array("d", bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % len(self.data)
+        self.count = min(self.count + 1, len(self.data))
+
+    def values(self):
+        """Samples from oldest to newest"""
+        if self.count < len(self.data):
+            return self.data[:self.count].tolist()
+        return (self.data[self.index:] + self.data[:self.index]).tolist()
+
+    def latest(self):
+        return self.data[self.index - 1] if self.count else None
+
+class ClientSamples:
+    """Sample history of one client process"""
+
+    __slots__ = ("pid", "key", "cpu", "rss", "read_rate", "write_rate", "last_time", "last_ticks", "last_io")
+
+    def __init__(self, pid, key, history):
+        self.pid = pid
+        self.key = key
+        self.cpu = RingBuffer(history)
+        self.rss = RingBuffer(history)
+        self.read_rate = RingBuffer(history)
+        self.write_rate = RingBuffer(history)
+        self.last_time = None
+        self.last_ticks = None
+        self.last_io = None
+
+def _read(path):
+    """Read a small /proc file in one system call, or None if it is gone"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+def read_cpu_ticks(pid):
+    """utime + stime of a process from /proc/<pid>/stat"""
+    data = _read(f"/proc/{pid}/stat")
+    if not data:
+        return None
+    # The command name may contain spaces, so split after the last ')'
+    fields = data[data.rfind(b")") + 2:].split()
+    return int(fields[11]) + int(fields[12]) if len(fields) > 12 else None
+
+def read_rss(pid):
+    """Resident set size of a process in bytes from /proc/<pid>/statm"""
+    data = _read(f"/proc/{pid}/statm")
+    if not data:
+        return None
+    fields = data.split()
+    return int(fields[1]) * PAGE_SIZE if len(fields) > 1 else None
+
+def read_io(pid):
+    """(read_bytes, write_bytes) of a process from /proc/<pid>/io"""
+    data = _read(f"/proc/{pid}/io")
+    if not data:
+        return None
+    values = {}
+    for line in data.splitlines():
+        name, _, value = line.partition(b":")
+        values[name] = value
+    try:
+        return int(values[b"read_bytes"]), int(values[b"write_bytes"])
+    except (KeyError, ValueError):
+        return None
+
+def sparkline(values, width=20):
+    """Render the last width values as a text sparkline scaled to their maximum"""
+    values = values[-width:]
+    if not values:
+        return ""
+    top = max(values)
+    if top <= 0:
+        return SPARK_CHARS[0] * len(values)
+    last = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(last, int(v / top * last + 0.5))] for v in values)
+
+class ResourceSampler:
+    """
+    Samples CPU, memory and disk I/O of every supervised client
+
+    A background thread reads /proc/<pid>/stat, statm and io of the live
+    clients every interval and keeps a fixed number of samples per client.
+    The thread's own CPU time is tracked so the sampling overhead is known.
+    """
+
+    def __init__(self, supervisor, interval=2.0, history=60):
+        """
+        Initialize the sampler
+
+        Args:
+            supervisor: ProcessSupervisor (or RemoteSupervisor) listing the clients
+            interval: Seconds between samples
+            history: Samples kept per client
+        """
+        self.supervisor = supervisor
+        self.interval = interval
+        self.history = history
+        self.clients = {}
+        self.version = 0
+        self.overhead = 0.0
+        self.cpu_time = 0.0
+        self.lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+
+    def _sample_loop(self):
+        """Thread function taking a sample every interval"""
+        while not self._stop.is_set():
+            started, cpu_started = time.monotonic(), time.thread_time()
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Resource sampling failed: {str(e)}")
+            # Share of one CPU spent sampling, smoothed over recent intervals
+            busy = time.thread_time() - cpu_started
+            self.cpu_time += busy
+            self.overhead = 0.8 * self.overhead + 0.2 * (100.0 * busy / self.interval)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def sample(self):
+        """Take one sample of every live client"""
+        now = time.monotonic()
+        live = {
+            client["pid"]: client["key"]
+            for client in self.supervisor.snapshot()
+            if client["pid"] and client["state"] in SAMPLED_STATES
+        }
+
+        with self.lock:
+            for pid in [pid for pid in self.clients if pid not in live]:
+                del self.clients[pid]
+
+            for pid, key in live.items():
+                samples = self.clients.get(pid)
+                if samples is None:
+                    samples = self.clients[pid] = ClientSamples(pid, key, self.history)
+
+                ticks = read_cpu_ticks(pid)
+                rss = read_rss(pid)
+                io = read_io(pid)
+                if ticks is None or rss is None:
+                    continue
+
+                # Rates need a previous sample, so the first one only sets the baseline
+                if samples.last_time is not None:
+                    elapsed = now - samples.last_time
+                    samples.cpu.append(100.0 * (ticks - samples.last_ticks) / CLOCK_TICKS / elapsed)
+                    samples.rss.append(float(rss))
+                    if io is not None and samples.last_io is not None:
+                        samples.read_rate.append((io[0] - samples.last_io[0]) / elapsed)
+                        samples.write_rate.append((io[1] - samples.last_io[1]) / elapsed)
+                samples.last_time, samples.last_ticks, samples.last_io = now, ticks, io
+            self.version += 1
+
+    def usage(self, key):
+        """
+        Return the latest usage of the newest sampled client with a key
+
+        Returns:
+            Dict with cpu (percent), rss (bytes), read_rate and write_rate
+            (bytes/second, None if unreadable) and cpu_history, or None
+        """
+        with self.lock:
+            matches = [s for s in self.clients.values() if s.key == key and s.cpu.count]
+            if not matches:
+                return None
+            # Clients are kept in the order they were first sampled
+            samples = matches[-1]
+            return {
+                "pid": samples.pid,
+                "cpu": samples.cpu.latest(),
+                "rss": samples.rss.latest(),
+                "read_rate": samples.read_rate.latest(),
+                "write_rate": samples.write_rate.latest(),
+                "cpu_history": samples.cpu.values()
+            }
+
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+def get_sampler(supervisor, interval=2.0, history=60):
+    """Return the sampler of a supervisor, starting it on first use"""
+    with _samplers_lock:
+        sampler = _samplers.get(id(supervisor))
+        if sampler is None or sampler.supervisor is not supervisor:
+            sampler = _samplers[id(supervisor)] = ResourceSampler(supervisor, interval, history)
+        return sampler
+
+def stop_sampler(supervisor):
+    """Stop and forget the sampler of a supervisor that is going away"""
+    with _samplers_lock:
+        sampler = _samplers.get(id(supervisor))
+        if sampler is not None and sampler.supervisor is supervisor:
+            sampler.stop()
+            del _samplers[id(supervisor)]
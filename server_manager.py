@@ -2,6 +2,7 @@ import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
+import threading
 
 from config_utils import ConfigManager
 from ui_components import (
@@ -9,6 +10,17 @@ from ui_components import (
     apply_global_styling, WOW_COLORS, WoWConfirmDialog
 )
 from account_manager import AccountManagerScreen
+from launch_queue import LaunchQueue
+from memory_admission import MemoryAdmission
+from page_cache import prewarmer
+from install_dedup import InstallDeduplicator, install_dirs, describe
+from client_version import client_versions
+from install_discovery import InstallIndex, default_roots, suggest_expansion
+from addon_sync import AddonSync, expansion_installs, describe as describe_sync
+from process_supervisor import ProcessSupervisor
+from warm_pool import WarmPoolManager
+from launcher_daemon import LauncherClient, RemoteSupervisor
+from profiling import profiler, profiled
 
 class ServerManagerScreen:
     """Main screen for managing different WoW private servers"""
@@ -34,10 +46,42 @@ class ServerManagerScreen:
         
         # Initialize config manager
         self.config_manager = ConfigManager()
+        self.config_manager.load_global_config()
         
         # Load servers from config file, but DON'T auto-detect
         self.servers = self.config_manager.load_servers()
         
+        # Supervisor owning every launched game client
+        self.supervisor = ProcessSupervisor()
+        
+        # Game data is read ahead as soon as an expansion is selected
+        prewarmer.configure(self.config_manager.global_config.get("page_cache_prewarm"))
+        
+        # Set while a deduplication scan or link pass runs in the background
+        self.dedup_running = False
+        
+        # One launch queue shared by every account manager window so the
+        # per-server rate limits and the memory check hold across windows
+        self.memory_admission = MemoryAdmission(
+            self.supervisor, self.config_manager.global_config.get("memory_admission")
+        )
+        self.launch_queue = LaunchQueue(
+            self.config_manager.get_launch_limits,
+            admission_callback=self.memory_admission.check
+        )
+        
+        # Pools of pre-launched clients, filled for expansions that enable them
+        self.warm_pools = WarmPoolManager(self.supervisor)
+        
+        # Attach to a running launcher daemon instead of launching in-process
+        self.daemon_client = LauncherClient(self.config_manager.global_config.get("daemon_socket", "launcher.sock"))
+        if not self.daemon_client.is_running():
+            self.daemon_client = None
+        
+        # One mirror of the daemon's client list (and so one poll thread and
+        # one resource sampler) shared by every account manager window
+        self.remote_supervisor = RemoteSupervisor(self.daemon_client) if self.daemon_client else None
+        
         # Apply global styling
         apply_global_styling()
         
@@ -50,6 +94,8 @@ class ServerManagerScreen:
         # Status bar
         self.status_bar = WoWStatusBar(self.root)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        if self.daemon_client:
+            self.status_bar.set_status("Attached to launcher daemon")
     
     def create_layout(self):
         """Create the main application layout"""
@@ -147,10 +193,26 @@ class ServerManagerScreen:
         
         # Double-click binding
         self.server_tree.bind("<Double-1>", lambda e: self.connect_to_server())
+        self.server_tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         
         # Populate server tree with data
         self.populate_server_tree()
     
+    def on_tree_select(self, event):
+        """Start reading the selected expansion's game data into the page cache"""
+        selection = self.server_tree.selection()
+        if not selection:
+            return
+        item = selection[0]
+        parent = self.server_tree.parent(item)
+        if not parent:
+            return
+        
+        server_name = self.server_tree.item(parent, "text")
+        expansion_name = self.server_tree.item(item, "text")
+        expansion_data = self.servers.get(server_name, {}).get("expansions", {}).get(expansion_name, {})
+        prewarmer.prewarm(expansion_data.get("path"))
+    
     def populate_server_tree(self):
         """Fill the server tree with server and expansion data"""
         # Clear existing items
@@ -193,15 +255,34 @@ class ServerManagerScreen:
         tools_menu = tk.Menu(menu_bar, tearoff=0)
         tools_menu.configure(bg=WOW_COLORS["bg_dark"], fg=WOW_COLORS["text_normal"], activebackground=WOW_COLORS["bg_light"], activeforeground=WOW_COLORS["accent_gold"])
         menu_bar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Find Installations", command=self.open_install_finder)
         tools_menu.add_command(label="Scan for Account Files", 
                               command=self.scan_for_accounts)
+        tools_menu.add_command(label="Deduplicate Installs", command=self.deduplicate_installs)
+        tools_menu.add_command(label="Sync Addons and Settings", command=self.open_sync_dialog)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Terminate All Clients", command=self.terminate_all_clients)
         
         # Help menu
         help_menu = tk.Menu(menu_bar, tearoff=0)
         help_menu.configure(bg=WOW_COLORS["bg_dark"], fg=WOW_COLORS["text_normal"], activebackground=WOW_COLORS["bg_light"], activeforeground=WOW_COLORS["accent_gold"])
         menu_bar.add_cascade(label="Help", menu=help_menu)
+        
+        # Diagnostics submenu
+        diagnostics_menu = tk.Menu(help_menu, tearoff=0)
+        diagnostics_menu.configure(bg=WOW_COLORS["bg_dark"], fg=WOW_COLORS["text_normal"], activebackground=WOW_COLORS["bg_light"], activeforeground=WOW_COLORS["accent_gold"])
+        help_menu.add_cascade(label="Diagnostics", menu=diagnostics_menu)
+        self.profiling_var = tk.BooleanVar(value=profiler.enabled)
+        diagnostics_menu.add_checkbutton(
+            label="Profile Actions",
+            variable=self.profiling_var,
+            command=self.toggle_profiling
+        )
+        diagnostics_menu.add_command(label="Show Last Profile", command=self.show_last_profile)
+        help_menu.add_separator()
         help_menu.add_command(label="About", command=self.show_about)
     
+    @profiled("scan_for_accounts")
     def scan_for_accounts(self):
         """Scan for account files and update the server list"""
         # Detect account files and update server configuration
@@ -213,6 +294,324 @@ class ServerManagerScreen:
         # Update status
         self.status_bar.set_status("Scanned for account files")
     
+    def open_install_finder(self):
+        """Open the window searching local disks for game client installs"""
+        settings = self.config_manager.global_config.setdefault("install_discovery", {})
+        index = InstallIndex(settings)
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Find Installations")
+        dialog.geometry("760x460")
+        dialog.transient(self.root)
+        dialog.configure(bg=WOW_COLORS["bg_dark"])
+        
+        frame = ttk.Frame(dialog, style="WoW.TFrame", padding="20")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(2, weight=1)
+        
+        ttk.Label(frame, text="Find Installations", style="Title.TLabel").grid(
+            row=0, column=0, columnspan=3, pady=(0, 15), sticky=tk.W
+        )
+        
+        # Search roots, separated by semicolons
+        ttk.Label(frame, text="Search In:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        roots_var = tk.StringVar(value="; ".join(settings.get("roots") or default_roots()))
+        ttk.Entry(frame, textvariable=roots_var).grid(row=1, column=1, sticky=tk.EW, pady=5, padx=5)
+        
+        install_tree = ttk.Treeview(
+            frame,
+            columns=("path", "client", "build", "data", "expansion"),
+            show="headings",
+            selectmode="browse"
+        )
+        for column, heading, width in (
+            ("path", "Executable", 300), ("client", "Client", 110), ("build", "Build", 60),
+            ("data", "Data", 45), ("expansion", "Expansion", 180)
+        ):
+            install_tree.heading(column, text=heading)
+            install_tree.column(column, width=width)
+        install_tree.grid(row=2, column=0, columnspan=3, sticky=tk.NSEW, pady=5)
+        
+        ttk.Label(frame, text="Assign To:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        targets = [
+            f"{server_name} / {expansion_name}"
+            for server_name, server_data in self.servers.items()
+            for expansion_name in server_data.get("expansions", {})
+        ]
+        target_var = tk.StringVar()
+        ttk.Combobox(frame, textvariable=target_var, values=targets, state="readonly").grid(
+            row=3, column=1, sticky=tk.EW, pady=5, padx=5
+        )
+        
+        status_var = tk.StringVar(value="Folders that did not change since the last search are not listed again.")
+        ttk.Label(frame, textvariable=status_var, wraplength=700).grid(row=4, column=0, columnspan=3, sticky=tk.W)
+        
+        installs = {}
+        
+        def row_expansion(install):
+            # Expansions already using the executable, else the suggested one
+            assigned = [
+                f"{server_name} / {expansion_name}"
+                for server_name, server_data in self.servers.items()
+                for expansion_name, expansion_data in server_data.get("expansions", {}).items()
+                if expansion_data.get("path") and os.path.normcase(os.path.abspath(expansion_data["path"])) ==
+                os.path.normcase(install["path"])
+            ]
+            if assigned:
+                return ", ".join(assigned)
+            suggestion = suggest_expansion(self.servers, install)
+            return f"Suggested: {' / '.join(suggestion)}" if suggestion else ""
+        
+        def show(results):
+            if not dialog.winfo_exists():
+                return
+            search_button.configure(state="normal")
+            installs.clear()
+            install_tree.delete(*install_tree.get_children())
+            for install in results:
+                installs[install["path"]] = install
+                install_tree.insert("", "end", iid=install["path"], values=(
+                    install["path"], install["client"]["label"], install["client"]["build"],
+                    "Yes" if install["has_data"] else "No", row_expansion(install)
+                ))
+            status_var.set(f"Found {len(results)} installation(s)")
+        
+        def search():
+            roots = [root.strip() for root in roots_var.get().split(";") if root.strip()]
+            if roots != settings.get("roots") and roots != default_roots():
+                settings["roots"] = roots
+                self.config_manager.save_global_config()
+            search_button.configure(state="disabled")
+            progress = lambda message: dialog.after(0, status_var.set, message)
+            
+            def worker():
+                try:
+                    results = index.crawl(roots, progress=progress)
+                except Exception as e:
+                    dialog.after(0, status_var.set, f"Search failed: {str(e)}")
+                    dialog.after(0, search_button.configure, {"state": "normal"})
+                    return
+                dialog.after(0, show, results)
+            
+            threading.Thread(target=worker, daemon=True).start()
+        
+        def on_select(event):
+            selection = install_tree.selection()
+            if selection:
+                suggestion = suggest_expansion(self.servers, installs[selection[0]])
+                if suggestion:
+                    target_var.set(" / ".join(suggestion))
+        
+        def assign(event=None):
+            selection = install_tree.selection()
+            if not selection or not target_var.get():
+                status_var.set("Select an installation and the expansion to assign it to.")
+                return
+            install = installs[selection[0]]
+            server_name, _, expansion_name = target_var.get().partition(" / ")
+            self.servers[server_name]["expansions"][expansion_name]["path"] = install["path"]
+            if self.config_manager.save_servers(self.servers):
+                self.populate_server_tree()
+                install_tree.set(selection[0], "expansion", row_expansion(install))
+                status_var.set(f"{target_var.get()} now uses {install['path']}")
+                self.status_bar.set_status(f"Assigned {install['client']['label']} to {target_var.get()}")
+        
+        install_tree.bind("<<TreeviewSelect>>", on_select)
+        # Double-click assigns to the suggested (or chosen) expansion in one go
+        install_tree.bind("<Double-1>", assign)
+        
+        button_frame = ttk.Frame(frame, style="WoW.TFrame")
+        button_frame.grid(row=5, column=0, columnspan=3, pady=(15, 0))
+        search_button = ttk.Button(button_frame, text="Search", style="Gold.TButton", command=search)
+        search_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Assign", command=assign).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
+        search()
+    
+    def deduplicate_installs(self):
+        """Find identical game files across installs and offer to link them"""
+        if self.dedup_running:
+            self.status_bar.set_status("Deduplication is already running")
+            return
+        self.dedup_running = True
+        deduplicator = InstallDeduplicator(self.config_manager.global_config.get("install_dedup"))
+        dirs = install_dirs(self.servers)
+        progress = lambda message: self.root.after(0, self.status_bar.set_status, message)
+        
+        def find_duplicates():
+            try:
+                plan = deduplicator.plan(dirs, progress)
+            except Exception as e:
+                self.root.after(0, self.on_dedup_failed, str(e))
+                return
+            self.root.after(0, self.confirm_deduplication, deduplicator, dirs, plan)
+        
+        threading.Thread(target=find_duplicates, daemon=True).start()
+    
+    def confirm_deduplication(self, deduplicator, dirs, plan):
+        """Ask before linking the duplicates a scan found"""
+        report = {
+            "installs": len(dirs),
+            "groups": len(plan["groups"]),
+            "files": sum(len(members) - 1 for members in plan["groups"]),
+            "bytes_saved": plan["bytes_saved"],
+            "dry_run": True
+        }
+        if not plan["groups"]:
+            self.dedup_running = False
+            self.status_bar.set_status(f"No duplicate files found in {len(dirs)} install(s)")
+            return
+        
+        confirm = WoWConfirmDialog(
+            self.root,
+            "Deduplicate Installs",
+            f"{describe(report)}.\n\nSettings, addons and other per-install files are left alone. Link them now?"
+        ).result
+        if not confirm:
+            self.dedup_running = False
+            self.status_bar.set_status("Deduplication cancelled")
+            return
+        
+        progress = lambda message: self.root.after(0, self.status_bar.set_status, message)
+        
+        def link_duplicates():
+            try:
+                result = deduplicator.apply(plan, progress)
+                deduplicator.hash_cache.save(prune=True)
+            except Exception as e:
+                self.root.after(0, self.on_dedup_failed, str(e))
+                return
+            report.update(result, dry_run=False)
+            self.root.after(0, self.on_dedup_finished, report)
+        
+        threading.Thread(target=link_duplicates, daemon=True).start()
+    
+    def on_dedup_finished(self, report):
+        """Show the outcome of linking duplicates"""
+        self.dedup_running = False
+        self.status_bar.set_status(describe(report))
+        if report["errors"]:
+            messagebox.showwarning(
+                "Deduplicate Installs",
+                f"{describe(report)}:\n\n" + "\n".join(report["errors"][:10])
+            )
+    
+    def on_dedup_failed(self, message):
+        """Report a deduplication that stopped with an error"""
+        self.dedup_running = False
+        self.status_bar.set_status("Deduplication failed")
+        messagebox.showerror("Deduplicate Installs", f"Deduplication failed: {message}")
+    
+    def open_sync_dialog(self):
+        """Open the dialog copying addons and settings between installs"""
+        installs = expansion_installs(self.servers)
+        if len(installs) < 2:
+            messagebox.showinfo("Sync Addons and Settings", "At least two expansions with an existing game path are needed.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Sync Addons and Settings")
+        dialog.geometry("500x460")
+        dialog.transient(self.root)
+        dialog.configure(bg=WOW_COLORS["bg_dark"])
+        
+        frame = ttk.Frame(dialog, style="WoW.TFrame", padding="20")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(3, weight=1)
+        
+        ttk.Label(frame, text="Sync Addons and Settings", style="Title.TLabel").grid(
+            row=0, column=0, columnspan=2, pady=(0, 15), sticky=tk.W
+        )
+        
+        # Source install, preselected from the server list
+        ttk.Label(frame, text="Copy From:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        labels = list(installs)
+        source_var = tk.StringVar(value=labels[0])
+        selection = self.server_tree.selection()
+        if selection and self.server_tree.parent(selection[0]):
+            label = f"{self.server_tree.item(self.server_tree.parent(selection[0]), 'text')} / {self.server_tree.item(selection[0], 'text')}"
+            if label in installs:
+                source_var.set(label)
+        ttk.Combobox(frame, textvariable=source_var, values=labels, state="readonly").grid(
+            row=1, column=1, sticky=tk.EW, pady=5, padx=5
+        )
+        
+        ttk.Label(frame, text="Copy To:").grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(10, 5))
+        target_list = tk.Listbox(
+            frame, selectmode=tk.MULTIPLE, exportselection=False,
+            bg=WOW_COLORS["bg_medium"], fg=WOW_COLORS["text_normal"],
+            selectbackground=WOW_COLORS["bg_light"], selectforeground=WOW_COLORS["accent_gold"]
+        )
+        target_list.grid(row=3, column=0, columnspan=2, sticky=tk.NSEW)
+        for label in labels:
+            target_list.insert(tk.END, label)
+        target_list.select_set(0, tk.END)
+        
+        folders = ", ".join(self.config_manager.global_config.get("addon_sync", {}).get("paths", []))
+        status_var = tk.StringVar(value=f"Changed files in {folders} are copied; Config.wtf stays per install.")
+        ttk.Label(frame, textvariable=status_var, wraplength=440).grid(
+            row=4, column=0, columnspan=2, sticky=tk.W, pady=(10, 0)
+        )
+        
+        def run(dry_run):
+            source = installs[source_var.get()]
+            targets = [installs[labels[i]] for i in target_list.curselection() if installs[labels[i]] != source]
+            if not targets:
+                status_var.set("Select at least one install other than the source.")
+                return
+            for button in buttons:
+                button.configure(state="disabled")
+            progress = lambda message: dialog.after(0, status_var.set, message)
+            
+            def worker():
+                try:
+                    sync = AddonSync(self.config_manager.global_config.get("addon_sync"))
+                    results = sync.sync(source, targets, dry_run, progress)
+                    message = describe_sync(results)
+                    if dry_run:
+                        message = "Preview: " + message.replace("copied", "to copy").replace("removed", "to remove")
+                except Exception as e:
+                    message = f"Sync failed: {str(e)}"
+                dialog.after(0, finish, message)
+            
+            threading.Thread(target=worker, daemon=True).start()
+        
+        def finish(message):
+            if not dialog.winfo_exists():
+                return
+            status_var.set(message)
+            self.status_bar.set_status(message)
+            for button in buttons:
+                button.configure(state="normal")
+        
+        button_frame = ttk.Frame(frame, style="WoW.TFrame")
+        button_frame.grid(row=5, column=0, columnspan=2, pady=(15, 0))
+        buttons = [
+            ttk.Button(button_frame, text="Preview", command=lambda: run(True)),
+            ttk.Button(button_frame, text="Sync", style="Gold.TButton", command=lambda: run(False))
+        ]
+        for button in buttons:
+            button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def terminate_all_clients(self):
+        """Gracefully close every game client launched by the manager"""
+        confirm = WoWConfirmDialog(
+            self.root,
+            "Terminate Clients",
+            "Close all running game clients?"
+        ).result
+        if confirm:
+            if self.daemon_client:
+                self.daemon_client.request({"cmd": "terminate"})
+            count = len([c for c in self.supervisor.snapshot() if c["state"] in ("running", "hung")])
+            self.supervisor.terminate_async()
+            self.status_bar.set_status(f"Terminating {count} client(s)...")
+    
+    @profiled("connect_to_server")
     def connect_to_server(self):
         """Connect to the selected server/expansion"""
         selection = self.server_tree.selection()
@@ -259,7 +658,12 @@ class ServerManagerScreen:
                     expansion_name, 
                     expansion_data, 
                     self.config_manager,
-                    self.on_account_manager_close
+                    self.on_account_manager_close,
+                    launch_queue=self.launch_queue,
+                    supervisor=self.supervisor,
+                    warm_pools=self.warm_pools,
+                    daemon_client=self.daemon_client,
+                    remote_supervisor=self.remote_supervisor
                 )
             else:
                 messagebox.showerror("Error", "Selected expansion not found in configuration.")
@@ -298,7 +702,12 @@ class ServerManagerScreen:
                             expansion_name, 
                             expansion_data, 
                             self.config_manager,
-                            self.on_account_manager_close
+                            self.on_account_manager_close,
+                            launch_queue=self.launch_queue,
+                            supervisor=self.supervisor,
+                            warm_pools=self.warm_pools,
+                            daemon_client=self.daemon_client,
+                            remote_supervisor=self.remote_supervisor
                         )
                     else:
                         # If multiple expansions, ask user to select one
@@ -468,7 +877,7 @@ class ServerManagerScreen:
         """Open dialog to add or edit an expansion"""
         dialog = tk.Toplevel(self.root)
         dialog.title(title)
-        dialog.geometry("500x350")
+        dialog.geometry("500x530")
         dialog.transient(self.root)
         dialog.grab_set()
         dialog.configure(bg=WOW_COLORS["bg_dark"])
@@ -521,15 +930,46 @@ class ServerManagerScreen:
         )
         browse_button.pack(side=tk.RIGHT, padx=(5, 0))
         
-        ttk.Label(frame, text="Accounts File:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        # Client build read from the executable's version resource
+        client_var = tk.StringVar()
+        ttk.Label(frame, textvariable=client_var, foreground=WOW_COLORS["accent_gold"]).grid(
+            row=5, column=1, sticky=tk.W, padx=5
+        )
+        
+        ttk.Label(frame, text="Accounts File:").grid(row=6, column=0, sticky=tk.W, pady=5)
         accounts_var = tk.StringVar()
         accounts_entry = ttk.Entry(frame, textvariable=accounts_var)
-        accounts_entry.grid(row=5, column=1, sticky=tk.EW, pady=5, padx=5)
+        accounts_entry.grid(row=6, column=1, sticky=tk.EW, pady=5, padx=5)
         
-        ttk.Label(frame, text="Coordinates File:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        ttk.Label(frame, text="Coordinates File:").grid(row=7, column=0, sticky=tk.W, pady=5)
         coords_var = tk.StringVar()
         coords_entry = ttk.Entry(frame, textvariable=coords_var)
-        coords_entry.grid(row=6, column=1, sticky=tk.EW, pady=5, padx=5)
+        coords_entry.grid(row=7, column=1, sticky=tk.EW, pady=5, padx=5)
+        
+        ttk.Label(frame, text="Warm Pool Size:").grid(row=8, column=0, sticky=tk.W, pady=5)
+        pool_size_var = tk.StringVar(value="0")
+        pool_size_spin = ttk.Spinbox(frame, from_=0, to=20, textvariable=pool_size_var, width=6)
+        pool_size_spin.grid(row=8, column=1, sticky=tk.W, pady=5, padx=5)
+        
+        ttk.Label(frame, text="Pool Idle Timeout (s):").grid(row=9, column=0, sticky=tk.W, pady=5)
+        pool_timeout_var = tk.StringVar(value="600")
+        pool_timeout_entry = ttk.Entry(frame, textvariable=pool_timeout_var, width=8)
+        pool_timeout_entry.grid(row=9, column=1, sticky=tk.W, pady=5, padx=5)
+        
+        # Writing the account name into WTF/Config.wtf lets the client start
+        # with it filled in, so only the password has to be typed
+        prefill_var = tk.BooleanVar(value=False)
+        prefill_check = ttk.Checkbutton(
+            frame,
+            text="Pre-fill account name in Config.wtf",
+            variable=prefill_var
+        )
+        prefill_check.grid(row=10, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        ttk.Label(frame, text="Realmlist (optional):").grid(row=11, column=0, sticky=tk.W, pady=5)
+        realmlist_var = tk.StringVar()
+        realmlist_entry = ttk.Entry(frame, textvariable=realmlist_var)
+        realmlist_entry.grid(row=11, column=1, sticky=tk.EW, pady=5, padx=5)
         
         # Set values if editing
         if existing_expansion and server_name in self.servers and "expansions" in self.servers[server_name]:
@@ -541,6 +981,12 @@ class ServerManagerScreen:
                 path_var.set(expansion_data.get("path", ""))
                 accounts_var.set(expansion_data.get("accounts_file", ""))
                 coords_var.set(expansion_data.get("coords_file", ""))
+                warm_pool = expansion_data.get("warm_pool", {})
+                pool_size_var.set(str(warm_pool.get("size", 0)))
+                pool_timeout_var.set(str(warm_pool.get("idle_timeout", 600)))
+                config_wtf = expansion_data.get("config_wtf", {})
+                prefill_var.set(bool(config_wtf.get("enabled", False)))
+                realmlist_var.set(config_wtf.get("realmlist", ""))
                 
                 # Make expansion name non-editable for existing expansions
                 expansion_entry.configure(state="disabled")
@@ -557,9 +1003,24 @@ class ServerManagerScreen:
             accounts_var.set(f"accounts_{server_part}_new.json")
             coords_var.set(f"login_coords_{server_part}_new.json")
         
+        # Label the selected executable and name new expansions after it
+        auto_name = {"value": ""}
+        def update_client(*args):
+            path = path_var.get().strip()
+            client = client_versions.identify(path)
+            if client:
+                client_var.set(f"Detected: {client['label']} (build {client['build']})")
+                if not existing_expansion and expansion_var.get() in ("", auto_name["value"]):
+                    auto_name["value"] = client["label"]
+                    expansion_var.set(client["label"])
+            else:
+                client_var.set("Unknown client build" if os.path.isfile(path) else "")
+        path_var.trace_add("write", update_client)
+        update_client()
+        
         # Buttons with WoW styling
         button_frame = ttk.Frame(frame, style="WoW.TFrame")
-        button_frame.grid(row=7, column=0, columnspan=2, pady=20)
+        button_frame.grid(row=12, column=0, columnspan=2, pady=20)
         
         save_button = ttk.Button(
             button_frame, 
@@ -572,7 +1033,9 @@ class ServerManagerScreen:
                 path_var.get(),
                 accounts_var.get(),
                 coords_var.get(),
-                existing_expansion
+                existing_expansion,
+                {"size": pool_size_var.get(), "idle_timeout": pool_timeout_var.get()},
+                {"enabled": prefill_var.get(), "realmlist": realmlist_var.get().strip()}
             )
         )
         save_button.pack(side=tk.LEFT, padx=5)
@@ -631,7 +1094,8 @@ class ServerManagerScreen:
         if not existing_server:
             self.open_expansion_dialog("Add Expansion for " + name, name)
     
-    def save_expansion(self, dialog, server_name, expansion_name, path, accounts_file, coords_file, existing_expansion=None):
+    def save_expansion(self, dialog, server_name, expansion_name, path, accounts_file, coords_file, existing_expansion=None,
+                       warm_pool=None, config_wtf=None):
         """Save the expansion to configuration"""
         # Validation
         if not expansion_name:
@@ -656,12 +1120,31 @@ class ServerManagerScreen:
                 f"The executable path does not exist: {path}\nYou will need to update it later."
             )
         
-        # Prepare expansion data
-        expansion_data = {
+        # Validate warm pool settings
+        if warm_pool:
+            try:
+                warm_pool = {
+                    "size": int(warm_pool.get("size") or 0),
+                    "idle_timeout": int(warm_pool.get("idle_timeout") or 0)
+                }
+            except ValueError:
+                messagebox.showerror("Error", "Warm pool size and idle timeout must be whole numbers.")
+                return
+        
+        # Prepare expansion data, keeping any settings this dialog does not edit
+        expansion_data = {}
+        if existing_expansion:
+            expansion_data.update(self.servers[server_name]["expansions"].get(existing_expansion, {}))
+        expansion_data.update({
             "path": path,
             "accounts_file": accounts_file,
             "coords_file": coords_file
-        }
+        })
+        if warm_pool is not None:
+            expansion_data["warm_pool"] = warm_pool
+        if config_wtf is not None:
+            # Keep keys set by hand in servers_config.json (realm_name, settings)
+            expansion_data["config_wtf"] = dict(expansion_data.get("config_wtf", {}), **config_wtf)
         
         # Add/update expansion
         if existing_expansion:
@@ -679,6 +1162,9 @@ class ServerManagerScreen:
         # Save configuration
         self.config_manager.save_servers(self.servers)
         
+        # Resize or disable an already running pool right away
+        self.warm_pools.configure(server_name, expansion_name, path, expansion_data.get("warm_pool"))
+        
         # Update UI
         self.populate_server_tree()
         self.status_bar.set_status(f"Expansion '{expansion_name}' saved for server '{server_name}'")
@@ -692,6 +1178,25 @@ class ServerManagerScreen:
         self.populate_server_tree()
         self.status_bar.set_status("Server list refreshed")
     
+    def toggle_profiling(self):
+        """Turn per-action profiling on or off from the Diagnostics menu"""
+        profiler.set_enabled(self.profiling_var.get())
+        if profiler.enabled:
+            self.status_bar.set_status(f"Profiling actions into {os.path.abspath(profiler.output_dir)}")
+        else:
+            self.status_bar.set_status("Profiling disabled")
+    
+    def show_last_profile(self):
+        """Show where the most recent profile capture was written"""
+        if profiler.last_capture:
+            messagebox.showinfo(
+                "Diagnostics",
+                f"The last profile was written to:\n{os.path.abspath(profiler.last_capture)}\n\n"
+                "summary.txt lists the top hotspots and allocation sites."
+            )
+        else:
+            messagebox.showinfo("Diagnostics", "No actions have been profiled yet.")
+    
     def show_about(self):
         """Show about dialog"""
         WoWAboutDialog(
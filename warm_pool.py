@@ -0,0 +1,207 @@
+import os
+import time
+import signal
+import threading
+
+class WarmClient:
+    """A pre-launched client parked at the login screen"""
+
+    def __init__(self, process):
+        self.process = process
+        self.started_at = time.monotonic()
+        self.parked = False
+
+class WarmPool:
+    """Pool of pre-launched clients for one server and expansion"""
+
+    def __init__(self, server, expansion, game_path, size=1, idle_timeout=600, startup_delay=8.0):
+        """
+        Initialize the pool
+
+        Args:
+            server: Server the pooled clients are launched for
+            expansion: Expansion the pooled clients are launched for
+            game_path: Path to the game executable
+            size: Number of clients to keep ready
+            idle_timeout: Seconds without a launch after which parked clients are closed
+            startup_delay: Seconds a client needs to reach the login screen
+        """
+        self.server = server
+        self.expansion = expansion
+        self.game_path = game_path
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.startup_delay = startup_delay
+        self.clients = []
+        self.last_used = time.monotonic()
+        self.sequence = 0
+
+    @property
+    def group(self):
+        """Supervisor group of the pooled clients"""
+        return ("warm_pool", self.server, self.expansion)
+
+    def is_idle(self, now):
+        """True once no launch has used the pool for idle_timeout seconds"""
+        return self.idle_timeout and now - self.last_used > self.idle_timeout
+
+class WarmPoolManager:
+    """Keeps warm pools filled in the background and hands out parked clients"""
+
+    def __init__(self, supervisor, status_callback=None, interval=1.0):
+        """
+        Initialize the pool manager
+
+        Args:
+            supervisor: ProcessSupervisor that owns the pooled clients
+            status_callback: Function to call to update status messages
+            interval: Seconds between maintenance passes
+        """
+        self.supervisor = supervisor
+        self.status_callback = status_callback
+        self.interval = interval
+        self.pools = {}
+        self.lock = threading.RLock()
+
+        self._thread = threading.Thread(target=self._maintain_loop, daemon=True)
+        self._thread.start()
+
+    def update_status(self, message):
+        """Update status message via callback if available"""
+        if self.status_callback:
+            self.status_callback(message)
+
+    def configure(self, server, expansion, game_path, settings):
+        """
+        Create, resize or disable the pool of an expansion
+
+        Args:
+            server: Server name
+            expansion: Expansion name
+            game_path: Path to the game executable
+            settings: Dict with "size" and "idle_timeout" (the expansion's
+                      "warm_pool" entry in servers_config.json), or None
+        """
+        settings = settings or {}
+        size = int(settings.get("size", 0) or 0)
+        with self.lock:
+            pool = self.pools.get((server, expansion))
+            if pool is None:
+                if size <= 0 or not game_path:
+                    return
+                pool = WarmPool(server, expansion, game_path)
+                self.pools[(server, expansion)] = pool
+
+            if pool.game_path != game_path:
+                # Clients started from the old install are useless now
+                self._close(pool, pool.clients)
+                pool.game_path = game_path
+
+            pool.size = max(0, size)
+            pool.idle_timeout = float(settings.get("idle_timeout", pool.idle_timeout) or 0)
+            pool.startup_delay = float(settings.get("startup_delay", pool.startup_delay))
+            pool.last_used = time.monotonic()
+
+    def acquire(self, server, expansion, game_path):
+        """
+        Take a pooled client for a launch
+
+        Returns:
+            (process, ready_in) where ready_in is the number of seconds until the
+            client reaches the login screen, or (None, None) if the pool is empty
+        """
+        with self.lock:
+            pool = self.pools.get((server, expansion))
+            if pool is None or pool.game_path != game_path:
+                return None, None
+            pool.last_used = time.monotonic()
+
+            # Prefer the client that has been warming up the longest
+            for client in sorted(pool.clients, key=lambda c: c.started_at):
+                if client.process.poll() is not None:
+                    continue
+                pool.clients.remove(client)
+                self._resume(client)
+                ready_in = max(0.0, pool.startup_delay - (time.monotonic() - client.started_at))
+                return client.process, ready_in
+        return None, None
+
+    def snapshot(self):
+        """Return a list of dicts describing each pool"""
+        with self.lock:
+            return [
+                {
+                    "server": pool.server,
+                    "expansion": pool.expansion,
+                    "size": pool.size,
+                    "ready": sum(1 for c in pool.clients if c.parked),
+                    "warming": sum(1 for c in pool.clients if not c.parked)
+                }
+                for pool in self.pools.values()
+            ]
+
+    def _suspend(self, client):
+        """Throttle a parked client to zero CPU by stopping it"""
+        if hasattr(signal, "SIGSTOP"):
+            try:
+                os.kill(client.process.pid, signal.SIGSTOP)
+            except OSError:
+                return
+        client.parked = True
+
+    def _resume(self, client):
+        """Let a parked client run again"""
+        if client.parked and hasattr(signal, "SIGCONT"):
+            try:
+                os.kill(client.process.pid, signal.SIGCONT)
+            except OSError:
+                pass
+        client.parked = False
+
+    def _close(self, pool, clients):
+        """Terminate pooled clients and remove them from the pool"""
+        for client in list(clients):
+            pool.clients.remove(client)
+            self.supervisor.terminate_async(pid=client.process.pid, grace_period=5.0)
+
+    def _maintain_loop(self):
+        """Thread function replenishing pools, parking warm clients and enforcing idle timeouts"""
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self.lock:
+                for pool in list(self.pools.values()):
+                    try:
+                        self._maintain(pool, now)
+                    except Exception as e:
+                        print(f"Warm pool maintenance failed: {str(e)}")
+
+    def _maintain(self, pool, now):
+        """Bring one pool to its target state (lock must be held)"""
+        # Drop clients that exited or were terminated elsewhere
+        pool.clients = [c for c in pool.clients if c.process.poll() is None]
+
+        if pool.is_idle(now) or pool.size == 0:
+            if pool.clients:
+                self._close(pool, pool.clients)
+                self.update_status(f"Closed idle warm clients for {pool.expansion}")
+            return
+
+        # Surplus after the pool was shrunk
+        if len(pool.clients) > pool.size:
+            self._close(pool, pool.clients[pool.size:])
+
+        # Park clients that have reached the login screen
+        for client in pool.clients:
+            if not client.parked and now - client.started_at >= pool.startup_delay:
+                self._suspend(client)
+
+        # Replenish one client per pass so warm-up I/O is staggered
+        if len(pool.clients) < pool.size and os.path.exists(pool.game_path):
+            pool.sequence += 1
+            process = self.supervisor.spawn(
+                ("warm_pool", pool.server, pool.expansion, pool.sequence),
+                pool.game_path,
+                group=pool.group
+            )
+            pool.clients.append(WarmClient(process))
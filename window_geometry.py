@@ -0,0 +1,293 @@
+import os
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+# Login fields whose positions can be stored relative to the client window
+LOGIN_FIELDS = ("username", "password")
+
+class WindowGeometry:
+    """Screen position and size of a window's client area"""
+
+    __slots__ = ("window_id", "x", "y", "width", "height")
+
+    def __init__(self, window_id, x, y, width, height):
+        self.window_id = window_id
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def to_relative(self, x, y):
+        """Convert a screen position to fractions of the client area"""
+        return (
+            round((x - self.x) / self.width, 4),
+            round((y - self.y) / self.height, 4)
+        )
+
+    def to_screen(self, rx, ry):
+        """Convert fractions of the client area to a screen position"""
+        return (
+            self.x + round(rx * self.width),
+            self.y + round(ry * self.height)
+        )
+
+    def __repr__(self):
+        return f"WindowGeometry({self.window_id}, {self.x}, {self.y}, {self.width}x{self.height})"
+
+# Windows: the Win32 API through ctypes
+
+def _win32_client_geometry(hwnd):
+    """Client-area geometry of a window handle"""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    rect = wintypes.RECT()
+    if not user32.GetClientRect(hwnd, ctypes.byref(rect)):
+        return None
+    origin = wintypes.POINT(0, 0)
+    user32.ClientToScreen(hwnd, ctypes.byref(origin))
+    width, height = rect.right - rect.left, rect.bottom - rect.top
+    if width <= 0 or height <= 0:
+        return None
+    return WindowGeometry(hwnd, origin.x, origin.y, width, height)
+
+def _win32_find_window(pid):
+    """Largest visible top-level window owned by a process"""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    found = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, lparam):
+        owner = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+        if owner.value == pid and user32.IsWindowVisible(hwnd):
+            geometry = _win32_client_geometry(hwnd)
+            if geometry is not None:
+                found.append(geometry)
+        return True
+
+    user32.EnumWindows(callback, 0)
+    return max(found, key=lambda g: g.width * g.height) if found else None
+
+def _win32_window_under_cursor():
+    """Top-level window under the mouse cursor"""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    point = wintypes.POINT()
+    user32.GetCursorPos(ctypes.byref(point))
+    hwnd = user32.WindowFromPoint(point)
+    if not hwnd:
+        return None
+    # GA_ROOT: the top-level window, not the child control under the cursor
+    return _win32_client_geometry(user32.GetAncestor(hwnd, 2))
+
+def _win32_button_down():
+    """True while the left mouse button is held"""
+    import ctypes
+
+    # VK_LBUTTON; the high bit is set while the key is down
+    return bool(ctypes.windll.user32.GetAsyncKeyState(0x01) & 0x8000)
+
+# X11: xdotool, when it is installed
+
+def _xdotool(*args):
+    """Run xdotool and return its output lines, or [] if it failed"""
+    try:
+        result = subprocess.run(
+            ["xdotool", *args], capture_output=True, text=True, timeout=2
+        )
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return result.stdout.splitlines() if result.returncode == 0 else []
+
+def _shell_values(lines):
+    """Parse xdotool --shell output (KEY=value lines)"""
+    values = {}
+    for line in lines:
+        key, _, value = line.partition("=")
+        values[key] = value
+    return values
+
+def _x11_geometry(window_id):
+    """Geometry of an X11 window"""
+    values = _shell_values(_xdotool("getwindowgeometry", "--shell", str(window_id)))
+    try:
+        geometry = WindowGeometry(
+            int(window_id), int(values["X"]), int(values["Y"]), int(values["WIDTH"]), int(values["HEIGHT"])
+        )
+    except (KeyError, ValueError):
+        return None
+    return geometry if geometry.width > 0 and geometry.height > 0 else None
+
+def _x11_find_window(pid):
+    """Largest visible window carrying a process's _NET_WM_PID"""
+    found = []
+    for line in _xdotool("search", "--onlyvisible", "--pid", str(pid)):
+        if line.strip().isdigit():
+            geometry = _x11_geometry(line.strip())
+            if geometry is not None:
+                found.append(geometry)
+    return max(found, key=lambda g: g.width * g.height) if found else None
+
+def _x11_window_under_cursor():
+    """Window under the mouse cursor"""
+    window_id = _shell_values(_xdotool("getmouselocation", "--shell")).get("WINDOW")
+    return _x11_geometry(window_id) if window_id and window_id.isdigit() else None
+
+# X11: libX11 through ctypes, for the pointer's button state (xdotool cannot report it)
+
+# Button1Mask in the state returned by XQueryPointer
+_X11_BUTTON1_MASK = 1 << 8
+
+# (library, display, root window) once opened; None if there is no X display
+_x11_display = []
+
+def _x11_open_display():
+    """Open the X display for pointer queries, once"""
+    if not _x11_display:
+        opened = None
+        try:
+            import ctypes
+            import ctypes.util
+
+            name = ctypes.util.find_library("X11")
+            if name and os.environ.get("DISPLAY"):
+                xlib = ctypes.CDLL(name)
+                xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+                xlib.XOpenDisplay.restype = ctypes.c_void_p
+                xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+                xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+                xlib.XQueryPointer.argtypes = [
+                    ctypes.c_void_p, ctypes.c_ulong,
+                    ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+                    ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                    ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                    ctypes.POINTER(ctypes.c_uint)
+                ]
+                display = xlib.XOpenDisplay(None)
+                if display:
+                    opened = (xlib, display, xlib.XDefaultRootWindow(display))
+        except (OSError, AttributeError):
+            opened = None
+        _x11_display.append(opened)
+    return _x11_display[0]
+
+def _x11_button_down():
+    """True while the left mouse button is held, or None without an X display"""
+    import ctypes
+
+    opened = _x11_open_display()
+    if opened is None:
+        return None
+    xlib, display, root = opened
+    window, child = ctypes.c_ulong(), ctypes.c_ulong()
+    root_x, root_y, win_x, win_y = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+    mask = ctypes.c_uint()
+    # The root window sees the pointer wherever it is, whichever window has focus
+    xlib.XQueryPointer(
+        display, root, ctypes.byref(window), ctypes.byref(child),
+        ctypes.byref(root_x), ctypes.byref(root_y), ctypes.byref(win_x), ctypes.byref(win_y),
+        ctypes.byref(mask)
+    )
+    return bool(mask.value & _X11_BUTTON1_MASK)
+
+def pointer_button_down():
+    """
+    Check the left mouse button, whichever window has focus
+
+    Returns:
+        True while the button is held, False otherwise, or None if the
+        platform gives no way to see it (no X display or libX11)
+    """
+    if sys.platform == "win32":
+        return _win32_button_down()
+    return _x11_button_down()
+
+def find_client_window(pid):
+    """
+    Locate the main window of a launched client
+
+    Returns:
+        WindowGeometry of the largest visible window owned by the process, or
+        None if it has no window yet or the platform is not supported
+    """
+    if sys.platform == "win32":
+        return _win32_find_window(pid)
+    if shutil.which("xdotool"):
+        return _x11_find_window(pid)
+    return None
+
+def window_under_cursor():
+    """Return the WindowGeometry of the window under the mouse cursor, or None"""
+    if sys.platform == "win32":
+        return _win32_window_under_cursor()
+    if shutil.which("xdotool"):
+        return _x11_window_under_cursor()
+    return None
+
+class WindowGeometryCache:
+    """Caches the window geometry of launched clients by PID"""
+
+    def __init__(self, ttl=5.0):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Seconds a looked-up geometry is reused before asking the window system again
+        """
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, pid):
+        """Return the client window geometry of a PID, or None if it has no window"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(pid)
+            if entry is not None and now - entry[1] < self.ttl:
+                return entry[0]
+
+        geometry = find_client_window(pid)
+        with self.lock:
+            if geometry is None:
+                self.entries.pop(pid, None)
+            else:
+                self.entries[pid] = (geometry, now)
+        return geometry
+
+    def invalidate(self, pid):
+        """Forget a PID's geometry (after a failed attempt, when the window moved or the client exited)"""
+        with self.lock:
+            self.entries.pop(pid, None)
+
+# Shared by every LoginAutomation so repeated attempts reuse lookups
+geometry_cache = WindowGeometryCache()
+
+def has_relative_coords(login_coords):
+    """True if the coordinates include window-relative positions"""
+    return all(f"{field}_rx" in login_coords and f"{field}_ry" in login_coords for field in LOGIN_FIELDS)
+
+def resolve_login_coords(login_coords, geometry):
+    """
+    Turn window-relative login coordinates into screen positions for one window
+
+    Absolute positions are returned unchanged when there is no geometry or the
+    coordinates were captured without a window.
+    """
+    if geometry is None or not has_relative_coords(login_coords):
+        return login_coords
+    resolved = dict(login_coords)
+    for field in LOGIN_FIELDS:
+        resolved[f"{field}_x"], resolved[f"{field}_y"] = geometry.to_screen(
+            login_coords[f"{field}_rx"], login_coords[f"{field}_ry"]
+        )
+    return resolved
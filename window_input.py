@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+import asyncio
+
+class X11WindowInput:
+    """
+    Sends synthetic key events to one X11 window without giving it focus
+
+    Uses xdotool's --window mode (XSendEvent), so several clients can receive
+    credentials at the same time while the user keeps working in other windows.
+    Only the keyboard is used: the login screen focuses the username field and
+    Tab moves to the password field, so no pointer movement is needed.
+    """
+
+    def __init__(self, window_id, key_delay_ms=30):
+        """
+        Initialize the injector
+
+        Args:
+            window_id: X11 window ID of the client
+            key_delay_ms: Delay between typed characters in milliseconds
+        """
+        self.window_id = str(window_id)
+        self.key_delay_ms = key_delay_ms
+
+    @staticmethod
+    def available():
+        """True when per-window injection can be used on this system"""
+        return (
+            sys.platform.startswith("linux")
+            and bool(os.environ.get("DISPLAY"))
+            and shutil.which("xdotool") is not None
+        )
+
+    async def _run(self, *args, stdin_text=None):
+        """
+        Run one xdotool command without blocking the event loop
+
+        Args:
+            args: xdotool arguments
+            stdin_text: Text written to the command's standard input
+        """
+        process = await asyncio.create_subprocess_exec(
+            "xdotool", *args,
+            stdin=asyncio.subprocess.PIPE if stdin_text is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate(stdin_text.encode() if stdin_text is not None else None)
+        if process.returncode != 0:
+            raise RuntimeError(f"xdotool {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+
+    async def key(self, *keys):
+        """Send key presses (xdotool key names, e.g. "Tab" or "ctrl+a")"""
+        await self._run("key", "--window", self.window_id, *keys)
+
+    async def type_text(self, text):
+        """
+        Type text into the window's focused field
+
+        The text is read by xdotool from its standard input, never from its
+        command line, which other local users can see in ps and /proc while
+        a password is being typed.
+        """
+        await self._run(
+            "type", "--window", self.window_id, "--delay", str(self.key_delay_ms), "--file", "-",
+            stdin_text=text
+        )
+
+    async def clear_field(self):
+        """Clear the window's focused field"""
+        await self.key("ctrl+a", "BackSpace")
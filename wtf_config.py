@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import contextlib
+
+# SET lines in Config.wtf, e.g.  SET accountName "player"
+SET_LINE = re.compile(r'^\s*SET\s+(\S+)\s+"(.*)"\s*$', re.IGNORECASE)
+
+class ConfigWtfManager:
+    """Patches a client install's WTF/Config.wtf right before a launch"""
+
+    def __init__(self, lock_timeout=120.0):
+        """
+        Initialize the manager
+
+        Args:
+            lock_timeout: Seconds to wait for another launch of the same install
+        """
+        self.lock_timeout = lock_timeout
+        self.locks = {}
+        self.locks_guard = threading.Lock()
+
+    @staticmethod
+    def wtf_path(game_path):
+        """Path of the Config.wtf that belongs to a game executable"""
+        return os.path.join(os.path.dirname(os.path.abspath(game_path)), "WTF", "Config.wtf")
+
+    def read(self, game_path):
+        """Return the SET values of an install's Config.wtf as a dict"""
+        values = {}
+        try:
+            with open(self.wtf_path(game_path), "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    match = SET_LINE.match(line)
+                    if match:
+                        values[match.group(1)] = match.group(2)
+        except FileNotFoundError:
+            pass
+        return values
+
+    @staticmethod
+    def baseline_path(game_path):
+        """Path of the file holding the install's own values of profile CVars"""
+        return ConfigWtfManager.wtf_path(game_path) + ".launcher.json"
+
+    def has_baseline(self, game_path):
+        """True if a profile has changed CVars of this install that may need restoring"""
+        return os.path.exists(self.baseline_path(game_path))
+
+    def patch(self, game_path, values, remove=()):
+        """
+        Set keys in an install's Config.wtf, replacing the file atomically
+
+        Existing lines for the keys are replaced in place (keys match without
+        regard to case, like the client does); missing keys are appended. All
+        other lines and the file's line endings are kept.
+
+        Args:
+            game_path: The install's game executable
+            values: Keys to set
+            remove: Keys whose SET lines are dropped
+        """
+        path = self.wtf_path(game_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = ""
+        newline = "\r\n" if "\r\n" in content else "\n"
+
+        pending = {key.lower(): (key, str(value).replace('"', "")) for key, value in values.items()}
+        removed = {key.lower() for key in remove}
+        lines = []
+        for line in content.splitlines():
+            match = SET_LINE.match(line)
+            if match and match.group(1).lower() in removed:
+                continue
+            if match and match.group(1).lower() in pending:
+                key, value = pending.pop(match.group(1).lower())
+                line = f'SET {match.group(1)} "{value}"'
+            lines.append(line)
+        for key, value in pending.values():
+            lines.append(f'SET {key} "{value}"')
+
+        # Write a temporary file next to the original and swap it in, so a
+        # client starting at the same moment never sees a half-written file
+        fd, temp_path = tempfile.mkstemp(prefix=".Config.wtf.", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(newline.join(lines) + newline)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+    def patch_launch(self, game_path, values, profile):
+        """
+        Patch Config.wtf for one launch, restoring CVars other profiles changed
+
+        Config.wtf is shared by every client of an install, so a profile's
+        CVars would otherwise stay in effect for later launches. The first
+        time a profile sets a CVar, the install's own value is saved next to
+        Config.wtf; launches whose profile does not set that CVar (including
+        launches without a profile) get the saved value back.
+
+        A value that differs from what the launcher last wrote normally means
+        the user changed it in game, and it becomes the install's own value.
+        Clients also write their live CVars back when they exit, though, so a
+        profile client closing after a later launch restored the originals
+        leaves its profile's values behind; values a profile has written are
+        therefore never adopted.
+
+        Args:
+            game_path: The install's game executable
+            values: Keys to set regardless of profile (account name, realmlist)
+            profile: CVars of the account's performance profile ({} for none)
+        """
+        baseline_path = self.baseline_path(game_path)
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        try:
+            with open(baseline_path, "r") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            baseline = {}
+        current = {key.lower(): value for key, value in self.read(game_path).items()}
+        profile = {key.lower(): (key, str(value)) for key, value in profile.items()}
+
+        updates, remove = dict(values), []
+        for lower, (key, value) in profile.items():
+            if lower not in baseline:
+                baseline[lower] = {"key": key, "original": current.get(lower), "applied": None}
+        for lower, entry in baseline.items():
+            profile_values = entry.setdefault("profile_values", [])
+            value = current.get(lower)
+            if value != entry["applied"] and value not in profile_values:
+                entry["original"] = value
+            if lower in profile:
+                entry["applied"] = profile[lower][1]
+                if entry["applied"] not in profile_values:
+                    profile_values.append(entry["applied"])
+                updates[entry["key"]] = entry["applied"]
+            else:
+                entry["applied"] = entry["original"]
+                if entry["original"] is None:
+                    remove.append(entry["key"])
+                else:
+                    updates[entry["key"]] = entry["original"]
+
+        if baseline:
+            # Saved first: if patching fails, the originals are still known
+            fd, temp_path = tempfile.mkstemp(prefix=".Config.wtf.launcher.", dir=os.path.dirname(baseline_path))
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(baseline, f, indent=2)
+                os.replace(temp_path, baseline_path)
+            except Exception:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+                raise
+        if updates or remove:
+            self.patch(game_path, updates, remove)
+
+    def _install_lock(self, game_path):
+        """asyncio lock serializing launches of one install within this process"""
+        key = os.path.normcase(os.path.abspath(game_path))
+        with self.locks_guard:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = asyncio.Lock()
+            return lock
+
+    @staticmethod
+    def _try_file_lock(f):
+        """Take an exclusive lock on an open file without blocking (OSError if held)"""
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _unlock_file(f):
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @contextlib.asynccontextmanager
+    async def launch_lock(self, game_path):
+        """
+        Hold an install exclusively from patching Config.wtf until the client has read it
+
+        Launches in this process queue on an asyncio lock; other processes (the
+        GUI and the launcher daemon) are kept out by a lock file in the WTF folder.
+        """
+        lock_path = self.wtf_path(game_path) + ".lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+        async with self._install_lock(game_path):
+            deadline = time.monotonic() + self.lock_timeout
+            with open(lock_path, "a+") as lock_file:
+                while True:
+                    try:
+                        self._try_file_lock(lock_file)
+                        break
+                    except OSError:
+                        if time.monotonic() > deadline:
+                            raise RuntimeError(f"Timed out waiting for another launch of {game_path}")
+                        await asyncio.sleep(0.2)
+                try:
+                    yield
+                finally:
+                    self._unlock_file(lock_file)
+
+# Shared by every LoginAutomation so launches of one install queue on the same lock
+wtf_manager = ConfigWtfManager()